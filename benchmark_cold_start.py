@@ -0,0 +1,90 @@
+"""
+Cold-start benchmark: time from "nothing running" to the first /api/health response.
+
+Local (default): starts server.py in a fresh process and polls until it answers,
+once per mode, with EAGER_IMPORTS=true (everything imported at boot) and with
+lazy imports.
+
+Deployed: --url <modal web endpoint> sends --samples requests, sleeping --wait
+seconds between them. Use a wait longer than the container scaledown window (and
+WEB_MIN_CONTAINERS=0) to hit a cold or snapshot-restored container every time.
+The endpoint's uptime_seconds tells a cold start (small uptime) from a warm one.
+
+Usage:
+    python benchmark_cold_start.py --runs 5
+    python benchmark_cold_start.py --url https://<workspace>--personal-ai-assistant-web-app.modal.run --samples 3 --wait 1300
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import requests
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def local_cold_start(eager, timeout=60):
+    """Seconds from process spawn to the first successful /api/health response."""
+    port = free_port()
+    env = dict(os.environ, EAGER_IMPORTS="true" if eager else "false")
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", f"import server; server.app.run(port={port})"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with code {proc.returncode}")
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/api/health", timeout=1).ok:
+                    return time.perf_counter() - started
+            except requests.RequestException:
+                time.sleep(0.02)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def run_local(runs):
+    results = {}
+    for label, eager in (("eager", True), ("lazy", False)):
+        samples = [local_cold_start(eager) for _ in range(runs)]
+        results[label] = statistics.median(samples)
+        print(f"{label:>5}: median {results[label] * 1000:.0f} ms, min {min(samples) * 1000:.0f} ms over {runs} runs")
+    print(f"lazy imports save {(results['eager'] - results['lazy']) * 1000:.0f} ms to first response")
+
+def run_remote(url, samples, wait):
+    url = url.rstrip("/") + "/api/health"
+    for i in range(samples):
+        if i and wait:
+            time.sleep(wait)
+        started = time.perf_counter()
+        response = requests.get(url, timeout=120)
+        elapsed = time.perf_counter() - started
+        uptime = response.json().get("uptime_seconds") if response.ok else None
+        kind = "cold/restored" if uptime is not None and uptime < elapsed + 5 else "warm"
+        print(f"#{i + 1}: {response.status_code} in {elapsed * 1000:.0f} ms (container uptime {uptime}s, {kind})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first response on a cold start.")
+    parser.add_argument("--url", help="Deployed web endpoint; omit to benchmark a local server.py")
+    parser.add_argument("--runs", type=int, default=3, help="Local cold starts per mode.")
+    parser.add_argument("--samples", type=int, default=3, help="Requests to send to --url.")
+    parser.add_argument("--wait", type=float, default=0, help="Seconds between --url requests.")
+    args = parser.parse_args()
+
+    if args.url:
+        run_remote(args.url, args.samples, args.wait)
+    else:
+        run_local(args.runs)
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,86 @@
 import os
 import json
-import requests
-from tavily import TavilyClient
-from openai import OpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
+import research_cache
+import telegram_client
 
-# Initialize clients
-tavily_api_key = os.getenv("TAVILY_API_KEY")
-tavily_client = TavilyClient(api_key=tavily_api_key) if tavily_api_key else None
+# Clients are created on first use, not at import
+_tavily_client = None
+_openai_client = None
 
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+def get_tavily_client():
+    global _tavily_client
+    if _tavily_client is None and os.getenv("TAVILY_API_KEY"):
+        from tavily import TavilyClient
+        _tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+    return _tavily_client
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None and os.getenv("OPENAI_API_KEY"):
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+TELEGRAM_CHUNK_SIZE = 4000
 
 def generate_blog_workflow(topic, audience, chat_id=None):
     """
-    Orchestrates the blog post workflow:
+    Orchestrates the blog post workflow as a pipeline:
     1. Research topic using Tavily
-    2. Write blog post using OpenAI
-    3. Generate image prompt using OpenAI
-    4. Generate image using OpenAI (DALL-E 3)
-    5. Send to Telegram (if chat_id is provided)
+    2. In the background: generate an image prompt from the topic and research,
+       then the image using OpenAI (DALL-E 3)
+    3. Meanwhile, stream the blog post from OpenAI and send it to Telegram in
+       4000-char chunks as soon as each chunk is complete (if chat_id is provided)
+    4. Send the image after the last chunk, so it never lands mid-article
     """
     try:
+        started = time.time()
+        timings = {}
+
         # 1. Research
         print(f"Researching topic: {topic}")
         research_data = research_topic(topic)
-        
-        # 2. Write Blog Post
-        print("Writing blog post...")
-        blog_post = write_blog_post(topic, audience, research_data)
-        
-        # 3. Generate Image Prompt
-        print("Generating image prompt...")
-        image_prompt_data = create_image_prompt(blog_post)
-        image_title = image_prompt_data.get("title", "Blog Image")
-        image_prompt = image_prompt_data.get("prompt", f"A professional image representing {topic}")
-
-        # 4. Generate Image
-        print(f"Generating image with prompt: {image_prompt}")
-        image_url = generate_image(image_prompt)
-
-        # 5. Send to Telegram
+        timings["research"] = round(time.time() - started, 2)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # 2. Image prompt + image, overlapped with article writing
+            image_future = executor.submit(create_blog_image, topic, audience, research_data)
+
+            # 3. Stream the blog post, delivering chunks as they fill up
+            print("Writing blog post...")
+            pieces = []
+            sent_chunks = []
+
+            def collect():
+                for piece in stream_blog_post(topic, audience, research_data):
+                    pieces.append(piece)
+                    yield piece
+
+            for chunk in chunk_text_stream(collect(), TELEGRAM_CHUNK_SIZE):
+                if chat_id:
+                    if not timings.get("first_chunk"):
+                        timings["first_chunk"] = round(time.time() - started, 2)
+                    sent_chunks.append(send_text_chunk(chat_id, chunk))
+            blog_post = "".join(pieces)
+            timings["article"] = round(time.time() - started, 2)
+
+            image_title, image_prompt, image_url = image_future.result()
+
+        photo_sent = True
+        if chat_id:
+            print(f"Sending image to Telegram chat ID: {chat_id}")
+            photo_sent = send_photo(chat_id, image_url)
+        timings["total"] = round(time.time() - started, 2)
+        print(f"Blog workflow timings (s): {timings}")
+
         telegram_status = "Skipped (No Chat ID)"
         if chat_id:
-            print(f"Sending to Telegram chat ID: {chat_id}")
-            telegram_status = send_to_telegram(chat_id, blog_post, image_url)
+            if photo_sent and all(sent_chunks):
+                telegram_status = "Sent successfully"
+            else:
+                telegram_status = "Error sending to Telegram (see logs)"
 
         return {
             "status": "success",
@@ -53,7 +90,8 @@ def generate_blog_workflow(topic, audience, chat_id=None):
             "image_title": image_title,
             "image_prompt": image_prompt,
             "image_url": image_url,
-            "telegram_status": telegram_status
+            "telegram_status": telegram_status,
+            "timings": timings
         }
 
     except Exception as e:
@@ -63,13 +101,28 @@ def generate_blog_workflow(topic, audience, chat_id=None):
             "message": str(e)
         }
 
+def create_blog_image(topic, audience, research_data):
+    """
+    Image branch of the pipeline: prompt -> DALL-E.
+    Returns (image_title, image_prompt, image_url).
+    """
+    print("Generating image prompt...")
+    image_prompt_data = create_image_prompt(topic, audience, research_data)
+    image_title = image_prompt_data.get("title", "Blog Image")
+    image_prompt = image_prompt_data.get("prompt", f"A professional image representing {topic}")
+
+    print(f"Generating image with prompt: {image_prompt}")
+    image_url = generate_image(image_prompt)
+    return image_title, image_prompt, image_url
+
 def research_topic(topic):
     """Uses Tavily to research the topic."""
+    tavily_client = get_tavily_client()
     if not tavily_client:
         return "Tavily API key not found. Using mock research."
     
     try:
-        response = tavily_client.search(query=topic, search_depth="advanced", max_results=3)
+        response = research_cache.cached_search(tavily_client, topic, search_depth="advanced", max_results=3)
         results = response.get("results", [])
         context = "\n".join([f"- {r['title']}: {r['content']}" for r in results])
         return context
@@ -77,11 +130,7 @@ def research_topic(topic):
         print(f"Tavily search error: {e}")
         return f"Could not research topic due to error: {e}"
 
-def write_blog_post(topic, audience, research_data):
-    """Uses OpenAI to write the blog post."""
-    if not openai_client:
-        return "OpenAI API key not found. Mock blog post."
-
+def _blog_post_messages(topic, audience, research_data):
     system_prompt = """
     You are an AI agent specialized in creating professional, educational, and engaging blog articles.
     
@@ -103,27 +152,46 @@ def write_blog_post(topic, audience, research_data):
     
     Please write the blog post now.
     """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def stream_blog_post(topic, audience, research_data):
+    """Uses OpenAI to write the blog post, yielding text as tokens arrive."""
+    openai_client = get_openai_client()
+    if not openai_client:
+        yield "OpenAI API key not found. Mock blog post."
+        return
 
     try:
-        response = openai_client.chat.completions.create(
+        stream = openai_client.chat.completions.create(
             model="gpt-4o",  # or gpt-4-turbo
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            messages=_blog_post_messages(topic, audience, research_data),
+            stream=True
         )
-        return response.choices[0].message.content
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
     except Exception as e:
         print(f"OpenAI chat error: {e}")
-        return f"Error writing blog post: {e}"
+        yield f"Error writing blog post: {e}"
+
+def write_blog_post(topic, audience, research_data):
+    """Uses OpenAI to write the blog post."""
+    return "".join(stream_blog_post(topic, audience, research_data))
 
-def create_image_prompt(blog_post):
-    """Generates an image prompt based on the blog post."""
+def create_image_prompt(topic, audience, research_data):
+    """
+    Generates an image prompt from the topic and research.
+    Does not need the finished blog post, so it can run while the post is written.
+    """
+    openai_client = get_openai_client()
     if not openai_client:
         return {"title": "Mock Title", "prompt": "Mock Prompt"}
 
     system_prompt = """
-    You are an AI agent that transforms blog posts into visual prompt descriptions for generating graphic marketing materials.
+    You are an AI agent that transforms blog topics and research notes into visual prompt descriptions for generating graphic marketing materials.
     
     Output JSON with two fields:
     1) title (2-4 words)
@@ -131,8 +199,11 @@ def create_image_prompt(blog_post):
     """
 
     user_prompt = f"""
-    Blog Post:
-    {blog_post[:2000]}... (truncated)
+    Blog Topic: {topic}
+    Target Audience: {audience}
+    
+    Research Notes:
+    {research_data[:2000]}... (truncated)
     
     Generate the JSON for the image prompt.
     """
@@ -153,6 +224,7 @@ def create_image_prompt(blog_post):
 
 def generate_image(prompt):
     """Generates an image using OpenAI DALL-E 3."""
+    openai_client = get_openai_client()
     if not openai_client:
         return "https://via.placeholder.com/1024"
 
@@ -169,34 +241,65 @@ def generate_image(prompt):
         print(f"OpenAI image generation error: {e}")
         return "https://via.placeholder.com/1024?text=Error+Generating+Image"
 
+def split_chunk(text, size=TELEGRAM_CHUNK_SIZE):
+    """
+    Splits off the first chunk of at most `size` chars, preferring a paragraph,
+    line or word boundary so Markdown is not cut mid-line.
+    Returns (chunk, rest).
+    """
+    if len(text) <= size:
+        return text, ""
+    for sep in ("\n\n", "\n", " "):
+        cut = text.rfind(sep, 0, size)
+        if cut >= size // 2:
+            return text[:cut], text[cut + len(sep):]
+    return text[:size], text[size:]
+
+def chunk_text_stream(pieces, size=TELEGRAM_CHUNK_SIZE):
+    """Regroups streamed text pieces into chunks of at most `size` chars, yielding each as soon as it is full."""
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) > size:
+            chunk, buffer = split_chunk(buffer, size)
+            yield chunk
+    if buffer.strip():
+        yield buffer
+
+def send_photo(chat_id, image_url, caption="Here is the generated image for your blog post."):
+    """Sends a photo by URL to Telegram. Returns True on success."""
+    if not os.getenv("TELEGRAM_BOT_TOKEN"):
+        print("Telegram Bot Token not configured.")
+        return False
+
+    result = telegram_client.get_client().send_photo(chat_id, image_url, caption=caption)
+    if not result.get("ok"):
+        print(f"Telegram error: {result.get('description')}")
+    return bool(result.get("ok"))
+
+def send_text_chunk(chat_id, chunk):
+    """Sends one chunk of text (max 4096 chars) to Telegram. Returns True on success."""
+    if not os.getenv("TELEGRAM_BOT_TOKEN"):
+        print("Telegram Bot Token not configured.")
+        return False
+
+    telegram = telegram_client.get_client()
+    result = telegram.send_message(chat_id, chunk, parse_mode="Markdown")
+    if not result.get("ok"):
+        # A chunk boundary can leave unbalanced Markdown; retry as plain text
+        result = telegram.send_message(chat_id, chunk, parse_mode=None)
+    if not result.get("ok"):
+        print(f"Telegram error: {result.get('description')}")
+    return bool(result.get("ok"))
+
 def send_to_telegram(chat_id, text, image_url):
     """Sends the blog post and image to Telegram."""
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not bot_token:
+    if not os.getenv("TELEGRAM_BOT_TOKEN"):
         return "Telegram Bot Token not configured."
 
-    try:
-        # 1. Send Photo
-        photo_url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-        photo_payload = {
-            "chat_id": chat_id,
-            "photo": image_url,
-            "caption": "Here is the generated image for your blog post."
-        }
-        requests.post(photo_url, json=photo_payload)
-
-        # 2. Send Text (Blog Post)
-        # Telegram has a message limit (4096 chars). We might need to split.
-        # For simplicity, we'll send the first 4000 characters or split logic.
-        message_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-        
-        # Simple chunking
-        chunk_size = 4000
-        for i in range(0, len(text), chunk_size):
-            chunk = text[i:i+chunk_size]
-            requests.post(message_url, json={"chat_id": chat_id, "text": chunk, "parse_mode": "Markdown"})
-            
+    photo_sent = send_photo(chat_id, image_url)
+    # Telegram has a message limit (4096 chars), so the text goes out in chunks
+    chunks_sent = [send_text_chunk(chat_id, chunk) for chunk in chunk_text_stream([text])]
+    if photo_sent and all(chunks_sent):
         return "Sent successfully"
-    except Exception as e:
-        print(f"Telegram error: {e}")
-        return f"Error sending to Telegram: {e}"
+    return "Error sending to Telegram (see logs)"
@@ -13,15 +13,27 @@ def get_openai_client():
         return None
     return OpenAI(api_key=api_key)
 
-def chat_openai(messages, model="gpt-4o-mini"):
+def chat_openai(messages, model="gpt-4o-mini", on_token=None):
     """
     Chat with OpenAI API.
+    If `on_token` is given, the reply is streamed and on_token(text_so_far) is
+    called as tokens arrive; the return value has the same shape either way.
     """
     client = get_openai_client()
     if not client:
         return {"error": "OpenAI API key not configured"}
     
     try:
+        if on_token:
+            content = ""
+            for delta in _stream_completion(client, messages, model):
+                content += delta
+                on_token(content)
+            return {
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]
+            }
+
         completion = client.chat.completions.create(
             model=model,
             messages=messages
@@ -35,3 +47,23 @@ def chat_openai(messages, model="gpt-4o-mini"):
     except Exception as e:
         logger.error(f"Error calling OpenAI API: {e}")
         return {"error": str(e)}
+
+def stream_chat_openai(messages, model="gpt-4o-mini"):
+    """
+    Chat with OpenAI API, yielding the reply text piece by piece as tokens arrive.
+    Raises on configuration or API errors so the caller can report them mid-stream.
+    """
+    client = get_openai_client()
+    if not client:
+        raise RuntimeError("OpenAI API key not configured")
+    yield from _stream_completion(client, messages, model)
+
+def _stream_completion(client, messages, model):
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
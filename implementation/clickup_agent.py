@@ -1,11 +1,15 @@
 import os
-import requests
 import json
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import clickup_mirror
+from clickup_client import ClickUpClient, BASE_URL
 
 load_dotenv()
 
-BASE_URL = "https://api.clickup.com/api/v2"
+# Pooled, rate-limit-aware client shared by every call (and by the task mirror)
+_client = ClickUpClient()
+BULK_CREATE_WORKERS = 4
 
 def get_headers():
     token = os.getenv("CLICKUP_PERSONAL_TOKEN")
@@ -20,10 +24,8 @@ def get_task(task_id):
     if not headers:
         return {"status": "error", "message": "ClickUp Personal API Token not configured."}
         
-    url = f"{BASE_URL}/task/{task_id}"
-    
     try:
-        response = requests.get(url, headers=headers)
+        response = _client.get(f"/task/{task_id}", headers=headers)
         if response.status_code == 200:
             return {"status": "success", "task": response.json()}
         else:
@@ -39,14 +41,13 @@ def create_task(list_id, name, description=""):
         return {"status": "error", "message": "ClickUp Personal API Token not configured."}
     
     headers["Content-Type"] = "application/json"
-    url = f"{BASE_URL}/list/{list_id}/task"
     payload = {
         "name": name,
         "description": description
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
+        response = _client.post(f"/list/{list_id}/task", headers=headers, json=payload)
         if response.status_code == 200:
             return {"status": "success", "task": response.json()}
         else:
@@ -55,43 +56,97 @@ def create_task(list_id, name, description=""):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def list_tasks(list_id):
-    """List tasks in a ClickUp list."""
-    headers = get_headers()
-    if not headers:
+def create_tasks(list_id, tasks, max_workers=BULK_CREATE_WORKERS):
+    """
+    Create many tasks (e.g. CRM leads) in one call. `tasks` is a list of
+    {"name", "description"} dicts. Requests fan out over a few workers and the
+    shared client keeps them under ClickUp's rate limit. Results keep input order.
+    """
+    if not get_headers():
         return {"status": "error", "message": "ClickUp Personal API Token not configured."}
-        
-    url = f"{BASE_URL}/list/{list_id}/task"
-    
-    try:
-        print(f"Calling ClickUp list_tasks for ID: {list_id}")
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            return {"status": "success", "tasks": response.json().get('tasks', [])}
-        else:
-            print(f"ClickUp API Error (list_tasks): {response.status_code} - {response.text}")
-            return {"status": "error", "message": f"ClickUp error: {response.status_code} - {response.text}"}
-    except Exception as e:
-        print(f"Exception in list_tasks: {e}")
-        return {"status": "error", "message": str(e)}
 
-def search_tasks(list_id, query):
-    """Search for tasks by name in a ClickUp list."""
+    def create(task):
+        if not task.get("name"):
+            return {"status": "error", "message": "Task name is required."}
+        return create_task(list_id, task["name"], task.get("description", ""))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks) or 1))) as executor:
+        results = list(executor.map(create, tasks))
+
+    created = sum(1 for r in results if r["status"] == "success")
+    status = "success" if created == len(results) else ("partial" if created else "error")
+    return {"status": status, "created": created, "failed": len(results) - created, "results": results}
+
+def fetch_list_tasks(list_id, date_updated_gt=None):
+    """
+    Every task in a list, following pagination (ClickUp returns 100 per page),
+    including closed tasks and subtasks. With date_updated_gt (ms), only tasks
+    updated after it. Raises on API errors.
+    """
     headers = get_headers()
     if not headers:
+        raise ValueError("ClickUp Personal API Token not configured.")
+
+    path = f"/list/{list_id}/task"
+    params = {"include_closed": "true", "subtasks": "true", "order_by": "updated"}
+    if date_updated_gt:
+        params["date_updated_gt"] = date_updated_gt
+
+    tasks = []
+    page = 0
+    while True:
+        response = _client.get(path, headers=headers, params={**params, "page": page})
+        if response.status_code != 200:
+            print(f"ClickUp API Error (fetch_list_tasks): {response.status_code} - {response.text}")
+            raise RuntimeError(f"ClickUp error: {response.status_code} - {response.text}")
+        data = response.json()
+        batch = data.get("tasks", [])
+        tasks.extend(batch)
+        if data.get("last_page", True) or not batch:
+            return tasks
+        page += 1
+
+_mirror = None
+
+def get_mirror():
+    """Local task mirror, created on first use."""
+    global _mirror
+    if _mirror is None:
+        _mirror = clickup_mirror.TaskMirror(fetch_tasks=fetch_list_tasks)
+    return _mirror
+
+def _from_mirror(list_id, read, refresh=False):
+    if not get_headers():
         return {"status": "error", "message": "ClickUp Personal API Token not configured."}
-        
-    url = f"{BASE_URL}/list/{list_id}/task"
-    params = {"search": query}
-    
     try:
-        print(f"Searching ClickUp tasks in list {list_id} for: {query}")
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            return {"status": "success", "tasks": response.json().get('tasks', [])}
+        mirror = get_mirror()
+        warning = None
+        if refresh:
+            mirror.sync(list_id, full=True)
         else:
-            print(f"ClickUp API Error (search_tasks): {response.status_code} - {response.text}")
-            return {"status": "error", "message": f"ClickUp error: {response.status_code} - {response.text}"}
+            warning = mirror.ensure_fresh(list_id)
+        result = {"status": "success", "tasks": read(mirror), "synced_at": mirror.last_sync(list_id)}
+        if warning:
+            result["stale"] = True
+            result["message"] = f"Showing cached tasks, sync failed: {warning}"
+        return result
     except Exception as e:
-        print(f"Exception in search_tasks: {e}")
+        print(f"Exception reading ClickUp list {list_id}: {e}")
         return {"status": "error", "message": str(e)}
+
+def list_tasks(list_id, status=None, refresh=False, include_closed=False, include_subtasks=False):
+    """List tasks in a ClickUp list, served from the local mirror. Closed tasks and subtasks only on request."""
+    print(f"Calling ClickUp list_tasks for ID: {list_id}")
+    return _from_mirror(
+        list_id,
+        lambda mirror: mirror.list_tasks(list_id, status=status, include_closed=include_closed, include_subtasks=include_subtasks),
+        refresh
+    )
+
+def search_tasks(list_id, query, status=None, include_closed=False, include_subtasks=False):
+    """Fuzzy search for tasks by name in a ClickUp list, served from the local mirror."""
+    print(f"Searching ClickUp tasks in list {list_id} for: {query}")
+    return _from_mirror(
+        list_id,
+        lambda mirror: mirror.search(list_id, query, status=status, include_closed=include_closed, include_subtasks=include_subtasks)
+    )
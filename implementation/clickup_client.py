@@ -0,0 +1,101 @@
+import time
+import random
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://api.clickup.com/api/v2"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class ClickUpClient:
+    """
+    Shared HTTP layer for the ClickUp API:
+    - one pooled, keep-alive Session with connect/read timeouts on every call
+    - adaptive throttling from X-RateLimit-Remaining / X-RateLimit-Reset: requests
+      are spread over the rest of the window once the budget runs low, and held
+      until the reset when it is exhausted
+    - retries with exponential backoff and jitter on 429 and 5xx
+    Safe to share between threads.
+    """
+
+    def __init__(self, base_url=BASE_URL, pool_size=10, timeout=(5, 15), max_retries=4, slow_down_below=0.2):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.slow_down_below = slow_down_below
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._limit = None
+        self._remaining = None
+        self._reset_at = None
+
+    def _throttle(self):
+        """Waits as long as the last seen rate-limit headers say, and reserves one request."""
+        with self._lock:
+            if self._remaining is None or self._reset_at is None:
+                return
+            now = time.time()
+            if now >= self._reset_at:
+                self._remaining, self._reset_at = None, None
+                return
+            window = self._reset_at - now
+            if self._remaining <= 0:
+                wait = window
+            elif self._limit and self._remaining < self._limit * self.slow_down_below:
+                wait = window / self._remaining
+            else:
+                wait = 0
+            # Count this request now so concurrent callers don't all spend the same budget
+            self._remaining -= 1
+        if wait > 0:
+            print(f"ClickUp rate limit low, waiting {wait:.1f}s")
+            time.sleep(wait)
+
+    def _record(self, headers):
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_at = float(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self._lock:
+            self._remaining = remaining
+            self._reset_at = reset_at
+            if headers.get("X-RateLimit-Limit"):
+                self._limit = int(headers["X-RateLimit-Limit"])
+
+    def _backoff(self, attempt, response):
+        if response is not None and response.status_code == 429:
+            try:
+                return max(0.0, float(response.headers["X-RateLimit-Reset"]) - time.time()) + random.uniform(0, 1)
+            except (KeyError, TypeError, ValueError):
+                pass
+        return random.uniform(0, min(30, 2 ** attempt))
+
+    def request(self, method, path, headers=None, **kwargs):
+        """Returns the final requests.Response (retries exhausted or not); raises on network errors."""
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        kwargs.setdefault("timeout", self.timeout)
+        for attempt in range(self.max_retries + 1):
+            self._throttle()
+            try:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt, None))
+                continue
+            self._record(response.headers)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            delay = self._backoff(attempt, response)
+            print(f"ClickUp {response.status_code} on {method} {path}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def get(self, path, headers=None, **kwargs):
+        return self.request("GET", path, headers=headers, **kwargs)
+
+    def post(self, path, headers=None, **kwargs):
+        return self.request("POST", path, headers=headers, **kwargs)
@@ -0,0 +1,191 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from difflib import SequenceMatcher
+
+# Lives next to the rest of the bot memory (mounted as a volume on Modal)
+MIRROR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../memory/clickup_mirror.sqlite3")
+
+# Reads within MAX_AGE seconds of the last sync never touch the API; after that an
+# incremental sync (one request for small lists) runs first. A full resync every
+# FULL_RESYNC_INTERVAL catches deletions, which date_updated_gt can't see.
+MIRROR_MAX_AGE = int(os.getenv("CLICKUP_MIRROR_MAX_AGE", 60))
+FULL_RESYNC_INTERVAL = int(os.getenv("CLICKUP_FULL_RESYNC_INTERVAL", 6 * 3600))
+FUZZY_CUTOFF = 0.6
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    list_id TEXT NOT NULL,
+    name TEXT,
+    name_norm TEXT,
+    status TEXT,
+    date_updated INTEGER,
+    data TEXT,
+    closed INTEGER NOT NULL DEFAULT 0,
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_list_status ON tasks (list_id, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_list_updated ON tasks (list_id, date_updated DESC);
+CREATE TABLE IF NOT EXISTS sync_state (
+    list_id TEXT PRIMARY KEY,
+    last_updated INTEGER,
+    last_sync REAL,
+    last_full_sync REAL
+);
+"""
+
+def normalize(text):
+    text = re.sub(r"[^\w\s]", " ", str(text or "").casefold())
+    return " ".join(text.split())
+
+def match_score(query, name):
+    """
+    0..1 similarity of a search query to a task name: substring and all-token
+    matches score high, otherwise the best fuzzy match of the query against the
+    whole name or any same-length window of its words (so typos still match).
+    """
+    if not query or not name:
+        return 0.0
+    if query in name:
+        return 1.0
+    q_tokens, n_tokens = query.split(), name.split()
+    if all(any(t in n for n in n_tokens) for t in q_tokens):
+        return 0.95
+    best = SequenceMatcher(None, query, name).ratio()
+    width = len(q_tokens)
+    for i in range(max(1, len(n_tokens) - width + 1)):
+        window = " ".join(n_tokens[i:i + width])
+        best = max(best, SequenceMatcher(None, query, window).ratio())
+    return best
+
+class TaskMirror:
+    """
+    Local SQLite copy of ClickUp lists. `fetch_tasks(list_id, date_updated_gt=None)`
+    must return every task (all pages) updated after the given ms timestamp.
+    """
+
+    def __init__(self, fetch_tasks, path=MIRROR_PATH, max_age=MIRROR_MAX_AGE, full_resync_interval=FULL_RESYNC_INTERVAL):
+        self.fetch_tasks = fetch_tasks
+        self.path = path
+        self.max_age = max_age
+        self.full_resync_interval = full_resync_interval
+        self._sync_locks = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "closed" not in columns:
+                # Mirrors from before the closed/parent columns: add them and force a full resync to fill them in
+                conn.execute("ALTER TABLE tasks ADD COLUMN closed INTEGER NOT NULL DEFAULT 0")
+                conn.execute("ALTER TABLE tasks ADD COLUMN parent TEXT")
+                conn.execute("DELETE FROM sync_state")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _state(self, conn, list_id):
+        row = conn.execute("SELECT last_updated, last_sync, last_full_sync FROM sync_state WHERE list_id = ?", (list_id,)).fetchone()
+        return row or (None, None, None)
+
+    def sync(self, list_id, full=False):
+        """
+        Brings one list up to date. Incremental syncs ask only for tasks with
+        date_updated after the newest one stored; a full sync also drops tasks
+        that no longer exist. Returns the number of tasks written.
+        """
+        with self._lock:
+            lock = self._sync_locks.setdefault(list_id, threading.Lock())
+        with lock:
+            with self._connect() as conn:
+                last_updated, _, last_full_sync = self._state(conn, list_id)
+            now = time.time()
+            full = full or last_full_sync is None or now - last_full_sync >= self.full_resync_interval
+
+            tasks = self.fetch_tasks(list_id) if full else self.fetch_tasks(list_id, date_updated_gt=last_updated)
+
+            rows = [(
+                str(task["id"]),
+                str(list_id),
+                task.get("name"),
+                normalize(task.get("name")),
+                normalize((task.get("status") or {}).get("status")),
+                int(task.get("date_updated") or 0),
+                json.dumps(task),
+                int((task.get("status") or {}).get("type") == "closed"),
+                task.get("parent")
+            ) for task in tasks]
+            newest = max([r[5] for r in rows] + [last_updated or 0])
+
+            with self._connect() as conn:
+                if full:
+                    conn.execute("DELETE FROM tasks WHERE list_id = ?", (list_id,))
+                conn.executemany("INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+                    (list_id, newest, now, now if full else last_full_sync)
+                )
+            print(f"ClickUp mirror: {'full' if full else 'incremental'} sync of list {list_id}, {len(rows)} tasks")
+            return len(rows)
+
+    def ensure_fresh(self, list_id):
+        """
+        Syncs if the list is older than max_age. Returns None, or an error message
+        when the sync failed but (stale) local data can still be served.
+        """
+        with self._connect() as conn:
+            _, last_sync, _ = self._state(conn, list_id)
+        if last_sync and time.time() - last_sync < self.max_age:
+            return None
+        try:
+            self.sync(list_id)
+            return None
+        except Exception as e:
+            if last_sync is None:
+                raise
+            print(f"ClickUp mirror: sync failed, serving cached list {list_id}: {e}")
+            return str(e)
+
+    def _where(self, list_id, status, include_closed, include_subtasks):
+        # The mirror holds closed tasks and subtasks too; like ClickUp's own list
+        # view, leave them out unless asked for (or a status is named)
+        sql = " WHERE list_id = ?"
+        args = [list_id]
+        if status:
+            sql += " AND status = ?"
+            args.append(normalize(status))
+        elif not include_closed:
+            sql += " AND closed = 0"
+        if not include_subtasks:
+            sql += " AND parent IS NULL"
+        return sql, args
+
+    def list_tasks(self, list_id, status=None, include_closed=False, include_subtasks=False):
+        """Tasks in the list, most recently updated first, optionally filtered by status."""
+        where, args = self._where(list_id, status, include_closed, include_subtasks)
+        sql = "SELECT data FROM tasks" + where + " ORDER BY date_updated DESC"
+        with self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, args)]
+
+    def search(self, list_id, query, status=None, limit=20, include_closed=False, include_subtasks=False):
+        """Fuzzy name search, best match first."""
+        query = normalize(query)
+        where, args = self._where(list_id, status, include_closed, include_subtasks)
+        sql = "SELECT name_norm, data FROM tasks" + where
+        with self._connect() as conn:
+            candidates = conn.execute(sql, args).fetchall()
+
+        scored = [(match_score(query, name), data) for name, data in candidates]
+        scored = [s for s in scored if s[0] >= FUZZY_CUTOFF]
+        scored.sort(key=lambda s: s[0], reverse=True)
+        return [json.loads(data) for _, data in scored[:limit]]
+
+    def last_sync(self, list_id):
+        with self._connect() as conn:
+            return self._state(conn, list_id)[1]
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+# Persistent cache lives next to the rest of the bot memory (mounted as a volume on Modal)
+CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../memory/cache")
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file and rename it over `path`, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class DiskCache:
+    """
+    Key/value cache stored as one JSON file per entry.
+    - Entries expire `ttl` seconds after they were fetched.
+    - When the directory grows past `max_bytes`, least recently used entries
+      (by file mtime, refreshed on every hit) are evicted.
+    Keys can be any JSON-serializable value.
+    """
+
+    def __init__(self, name, ttl, max_bytes, root=CACHE_ROOT):
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory = os.path.join(root, name)
+
+    def _path(self, key):
+        key_str = json.dumps(key, sort_keys=True, default=str)
+        digest = hashlib.sha256(key_str.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get_entry(self, key):
+        """Returns {"key", "fetched_at", "value"} for a fresh entry, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            self._remove(path)
+            return None
+
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(path, None)
+        except FileNotFoundError:
+            pass
+        return entry
+
+    def get(self, key, default=None):
+        entry = self.get_entry(key)
+        return entry["value"] if entry else default
+
+    def set(self, key, value):
+        entry = {"key": key, "fetched_at": time.time(), "value": value}
+        atomic_write_json(self._path(key), entry)
+        self.evict()
+        return entry
+
+    def delete(self, key):
+        self._remove(self._path(key))
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            self._remove(path)
+
+    def evict(self):
+        """Drop expired entries, then LRU entries until the cache fits in max_bytes."""
+        now = time.time()
+        live = []
+        total = 0
+        for path, size, mtime in self._entries():
+            # Files untouched for longer than the TTL are necessarily expired
+            if now - mtime > self.ttl:
+                self._remove(path)
+                continue
+            live.append((mtime, size, path))
+            total += size
+
+        if total <= self.max_bytes:
+            return
+        live.sort()
+        for _, size, path in live:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".json") or name.startswith(".tmp-"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -2,14 +2,32 @@ import json
 import argparse
 import sys
 import os
-from openai import OpenAI
+import time
+import random
+import hashlib
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, RateLimitError, InternalServerError
 from dotenv import load_dotenv
+import lead_io
+import lead_store
 
 load_dotenv()
 
-def generate_icebreaker(lead_data, client):
+MODEL = "gpt-4o"
+MAX_TOKENS = 300
+ERROR_ICEBREAKER = "ERROR_GENERATING_ICEBREAKER"
+
+# Budgets for the account's gpt-4o tier; override to match your limits
+ENRICH_RPM = int(os.getenv("ENRICH_RPM", 500))
+ENRICH_TPM = int(os.getenv("ENRICH_TPM", 30000))
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", 8))
+
+def build_icebreaker_messages(lead_data):
     """
-    Generates a Spartan-style icebreaker using OpenAI.
+    Chat messages for a Spartan-style icebreaker.
     """
     # Updated to check for first_name (snake_case) as seen in Apify raw output
     name = lead_data.get("first_name") or lead_data.get("firstName") or lead_data.get("name") or "there"
@@ -40,62 +58,423 @@ def generate_icebreaker(lead_data, client):
       "icebreaker": "Hey John,..."
     }}
     """
-    
+    return [
+        {"role": "system", "content": "You are a concise, elite sales copywriter. Output validation-ready JSON."},
+        {"role": "user", "content": prompt}
+    ]
+
+def parse_icebreaker(content):
+    return json.loads(content.strip()).get("icebreaker", "")
+
+def estimate_tokens(messages):
+    """Rough prompt size (~4 chars per token) plus the completion budget."""
+    return sum(len(m["content"]) for m in messages) // 4 + MAX_TOKENS
+
+class RateLimiter:
+    """
+    Sliding one-minute window over requests and tokens, shared by all workers.
+    acquire() blocks until one more request of `tokens` fits in both budgets.
+    """
+
+    def __init__(self, rpm=ENRICH_RPM, tpm=ENRICH_TPM, window=60.0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window = window
+        self._calls = deque()  # (timestamp, tokens)
+        self._tokens = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens):
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0][0] >= self.window:
+                    self._tokens -= self._calls.popleft()[1]
+                if len(self._calls) < self.rpm and self._tokens + tokens <= self.tpm:
+                    self._calls.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                wait = self.window - (now - self._calls[0][0])
+            time.sleep(max(0.01, wait))
+
+def _retry_after(error):
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o", 
-            messages=[
-                {"role": "system", "content": "You are a concise, elite sales copywriter. Output validation-ready JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=300,
-            temperature=0.7
-        )
-        content = response.choices[0].message.content.strip()
-        return json.loads(content).get("icebreaker", "")
-    except Exception as e:
-        print(f"Error generating for {name}: {e}")
-        return "ERROR_GENERATING_ICEBREAKER"
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def generate_icebreaker(lead_data, client, limiter=None, max_retries=5):
+    """
+    Generates a Spartan-style icebreaker using OpenAI.
+    429s and 5xx responses are retried with exponential backoff and full jitter,
+    honouring Retry-After when the API sends it.
+    """
+    name = lead_data.get("first_name") or lead_data.get("firstName") or lead_data.get("name") or "there"
+    messages = build_icebreaker_messages(lead_data)
+
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire(estimate_tokens(messages))
+        try:
+            response = client.chat.completions.create(
+                model=MODEL, 
+                messages=messages,
+                response_format={"type": "json_object"},
+                max_tokens=MAX_TOKENS,
+                temperature=0.7
+            )
+            return parse_icebreaker(response.choices[0].message.content)
+        except (RateLimitError, InternalServerError) as e:
+            if attempt == max_retries:
+                print(f"Error generating for {name}: giving up after {attempt + 1} attempts: {e}")
+                return ERROR_ICEBREAKER
+            delay = _retry_after(e) or random.uniform(0, min(60, 2 ** attempt))
+            print(f"Rate limited generating for {name}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        except Exception as e:
+            print(f"Error generating for {name}: {e}")
+            return ERROR_ICEBREAKER
+
+def lead_key(lead):
+    """Stable identity for a lead so checkpoints survive re-scrapes and reordering."""
+    for field in ("id", "email", "linkedInUrl", "linkedin_url", "publicIdentifier"):
+        if lead.get(field):
+            return f"{field}:{str(lead[field]).strip().lower()}"
+    raw = json.dumps(lead, sort_keys=True, default=str)
+    return "hash:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+def load_checkpoint(path):
+    """Icebreakers from an earlier, possibly interrupted run: {lead_key: icebreaker}."""
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # half-written last line from a crash
+            done[record["key"]] = record["icebreaker"]
+    return done
+
+def known_icebreaker(lead, done, store=None):
+    """
+    Icebreaker from this run's checkpoint (`done`) or, across runs, from the lead
+    store. Also tags the lead with its store lead_id. None if it must be generated.
+    """
+    if store:
+        store.assign_id(lead)
+    key = lead_key(lead)
+    if key in done:
+        return done[key]
+    if store:
+        record = store.get(lead)
+        if record and record.get("icebreaker") and record["icebreaker"] != ERROR_ICEBREAKER:
+            return record["icebreaker"]
+    return None
+
+def has_icebreaker(lead):
+    """True if the lead already carries a usable icebreaker (a failed one is retried)."""
+    return lead.get("icebreaker") not in (None, "", ERROR_ICEBREAKER)
+
+def pending_leads(leads, checkpoint_path=None, store=None):
+    """
+    Fills icebreakers already in the checkpoint or lead store and returns
+    [(lead_key, lead)] for the leads that still need one.
+    """
+    done = load_checkpoint(checkpoint_path)
+    pending = []
+    for lead in leads:
+        if has_icebreaker(lead):
+            continue
+        icebreaker = known_icebreaker(lead, done, store)
+        if icebreaker:
+            lead["icebreaker"] = icebreaker
+        else:
+            pending.append((lead_key(lead), lead))
+    return pending
+
+def enrich_stream(leads, client, workers=ENRICH_WORKERS, limiter=None, checkpoint_path=None, max_pending=None, store=None):
+    """
+    Streaming form of enrich_leads(): consumes any iterable of leads and yields
+    each one as soon as it has an icebreaker (completion order, not input order).
+    At most `max_pending` leads (default 2x workers) are in flight, so memory
+    stays bounded however long the input is.
+    Each success is appended to `checkpoint_path` (JSONL) so a rerun skips it,
+    and recorded in `store` (a LeadStore) so later runs skip the lead entirely.
+    """
+    limiter = limiter or RateLimiter()
+    done = load_checkpoint(checkpoint_path)
+    max_pending = max_pending or max(1, workers) * 2
+    slots = threading.Semaphore(max_pending)
+    results = queue.Queue(maxsize=max_pending)
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def feed():
+        # Reads input on its own thread so finished leads are yielded even while
+        # the upstream stage is still producing.
+        try:
+            for lead in leads:
+                if not has_icebreaker(lead):
+                    icebreaker = known_icebreaker(lead, done, store)
+                    if icebreaker:
+                        lead["icebreaker"] = icebreaker
+                    else:
+                        key = lead_key(lead)
+                        slots.acquire()
+                        future = executor.submit(generate_icebreaker, lead, client, limiter)
+                        future.add_done_callback(lambda f, key=key, lead=lead: results.put(("generated", (key, lead, f))))
+                        continue
+                results.put(("ready", lead))
+            # All slots back means every submitted lead has been handed over
+            for _ in range(max_pending):
+                slots.acquire()
+            results.put(("end", None))
+        except Exception as e:
+            results.put(("error", e))
+
+    threading.Thread(target=feed, daemon=True).start()
+    checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+    count = 0
+    try:
+        while True:
+            kind, payload = results.get()
+            if kind == "end":
+                return
+            if kind == "error":
+                raise payload
+            if kind == "ready":
+                yield payload
+                continue
+
+            key, lead, future = payload
+            slots.release()
+            lead["icebreaker"] = future.result()
+            count += 1
+            print(f"[{count}] Generated for {lead.get('name', 'Lead')}")
+            if lead["icebreaker"] != ERROR_ICEBREAKER:
+                if checkpoint:
+                    checkpoint.write(json.dumps({"key": key, "icebreaker": lead["icebreaker"]}) + "\n")
+                    checkpoint.flush()
+                if store:
+                    store.record(lead, icebreaker=lead["icebreaker"])
+            yield lead
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if checkpoint:
+            checkpoint.close()
+        if store:
+            store.save()
+
+def enrich_leads(leads, client, workers=ENRICH_WORKERS, limiter=None, checkpoint_path=None, store=None):
+    """
+    Adds an "icebreaker" to every lead using a bounded worker pool.
+    Each success is appended to `checkpoint_path` (JSONL) so a rerun skips it.
+    Returns the leads in their original order.
+    """
+    pending = pending_leads(leads, checkpoint_path, store)
+
+    print(f"{len(leads) - len(pending)} leads already have icebreakers, generating {len(pending)} with {workers} workers...")
+    for _ in enrich_stream([lead for _, lead in pending], client, workers, limiter, checkpoint_path, store=store):
+        pass
+    return leads
+
+# --- BATCH MODE ---
+# Half the price of synchronous calls and no rate-limit juggling, at the cost of
+# latency (up to the 24h completion window). Meant for overnight runs.
+
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+def build_batch_request(key, lead):
+    """One line of the Batch API input file; custom_id is the lead key."""
+    return {
+        "custom_id": key,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": MODEL,
+            "messages": build_icebreaker_messages(lead),
+            "response_format": {"type": "json_object"},
+            "max_tokens": MAX_TOKENS,
+            "temperature": 0.7
+        }
+    }
+
+def submit_batch(client, pending, requests_path):
+    """Writes the JSONL request file, uploads it and creates the batch. Returns the batch ID."""
+    seen = set()
+    with open(requests_path, "w") as f:
+        for key, lead in pending:
+            if key in seen:
+                continue  # custom_id must be unique within a batch
+            seen.add(key)
+            f.write(json.dumps(build_batch_request(key, lead)) + "\n")
+
+    with open(requests_path, "rb") as f:
+        input_file = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+        metadata={"job": "enrich_leads"}
+    )
+    print(f"Submitted batch {batch.id} with {len(seen)} requests")
+    return batch.id
+
+def wait_for_batch(client, batch_id, poll_interval=60, timeout=None):
+    """Polls until the batch reaches a terminal status and returns it."""
+    started = time.time()
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = getattr(batch, "request_counts", None)
+        progress = f" ({counts.completed}/{counts.total})" if counts else ""
+        print(f"Batch {batch_id}: {batch.status}{progress}")
+        if batch.status in BATCH_TERMINAL_STATUSES:
+            return batch
+        if timeout and time.time() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+
+def read_batch_results(client, batch):
+    """Maps custom_id -> icebreaker for every successful line of the output file."""
+    results = {}
+    if not batch.output_file_id:
+        return results
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"Batch request {record.get('custom_id')} failed: {record.get('error') or response.get('status_code')}")
+            continue
+        try:
+            results[record["custom_id"]] = parse_icebreaker(response["body"]["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, ValueError) as e:
+            print(f"Unparseable batch result for {record.get('custom_id')}: {e}")
+    return results
+
+def enrich_leads_batch(leads, client, state_path, checkpoint_path=None, poll_interval=60, timeout=None, store=None):
+    """
+    Batch API version of enrich_leads(). The batch ID is saved to `state_path`
+    so a rerun after an interruption resumes polling the same batch instead of
+    paying for a new one. Results are merged back by lead key.
+    """
+    pending = pending_leads(leads, checkpoint_path, store)
+    print(f"{len(leads) - len(pending)} leads already have icebreakers, {len(pending)} to batch...")
+    if not pending:
+        return leads
+
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    batch_id = state.get("batch_id")
+    if batch_id:
+        print(f"Resuming batch {batch_id}")
+    else:
+        batch_id = submit_batch(client, pending, state_path + ".requests.jsonl")
+        with open(state_path, "w") as f:
+            json.dump({"batch_id": batch_id, "submitted_at": time.time()}, f)
+
+    batch = wait_for_batch(client, batch_id, poll_interval=poll_interval, timeout=timeout)
+    results = read_batch_results(client, batch)
+
+    checkpoint = open(checkpoint_path, "a") if checkpoint_path else None
+    try:
+        for key, lead in pending:
+            if key in results:
+                lead["icebreaker"] = results[key]
+                if checkpoint:
+                    checkpoint.write(json.dumps({"key": key, "icebreaker": results[key]}) + "\n")
+                if store:
+                    store.record(lead, icebreaker=results[key])
+            else:
+                lead["icebreaker"] = ERROR_ICEBREAKER
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        if store:
+            store.save()
+
+    # Finished (whatever the outcome): a rerun should batch the failures afresh
+    for path in (state_path, state_path + ".requests.jsonl"):
+        if os.path.exists(path):
+            os.remove(path)
+    generated = sum(1 for key, _ in pending if key in results)
+    print(f"Batch {batch_id} {batch.status}: {generated}/{len(pending)} icebreakers generated")
+    return leads
 
 def main():
     parser = argparse.ArgumentParser(description="Enrich leads with icebreakers using OpenAI.")
-    parser.add_argument("--input", required=True, help="Input JSON file path")
-    parser.add_argument("--output", required=True, help="Output JSON file path")
+    parser.add_argument("--input", required=True, help="Input JSON/JSONL file path, or '-' for JSONL on stdin")
+    parser.add_argument("--output", required=True, help="Output JSON/JSONL file path, or '-' for JSONL on stdout")
+    parser.add_argument("--workers", type=int, default=ENRICH_WORKERS, help="Concurrent OpenAI requests.")
+    parser.add_argument("--rpm", type=int, default=ENRICH_RPM, help="Requests-per-minute budget.")
+    parser.add_argument("--tpm", type=int, default=ENRICH_TPM, help="Tokens-per-minute budget.")
+    parser.add_argument("--checkpoint", default=None, help="Progress file (default: <output>.checkpoint.jsonl)")
+    parser.add_argument("--batch", action="store_true", help="Use the OpenAI Batch API (cheaper, up to 24h).")
+    parser.add_argument("--poll-interval", type=int, default=60, help="Seconds between batch status checks.")
+    parser.add_argument("--no-store", action="store_true", help="Don't reuse or record icebreakers in the cross-run lead store.")
     args = parser.parse_args()
     
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        print("Error: OPENAI_API_KEY not found in .env")
+    if args.batch and os.getenv("OPENAI_FAKE_BATCH", "false").lower() == "true":
+        import fake_openai_batch
+        client = fake_openai_batch.FakeBatchClient()
+    elif not api_key:
+        print("Error: OPENAI_API_KEY not found in .env", file=sys.stderr)
         sys.exit(1)
-        
-    client = OpenAI(api_key=api_key)
+    else:
+        client = OpenAI(api_key=api_key)
+
+    output_base = ".tmp/leads_stream" if args.output == "-" else args.output
+    checkpoint_path = args.checkpoint or output_base + ".checkpoint.jsonl"
+    streaming = not args.batch and (lead_io.is_stream(args.input) or lead_io.is_stream(args.output))
 
+    writer = lead_io.LeadWriter(args.output)
     try:
-        with open(args.input, "r") as f:
-            leads = json.load(f)
-            
-        print(f"Loaded {len(leads)} leads. Generating icebreakers...")
-        
-        enriched_leads = []
-        for lead in leads:
-            if "icebreaker" in lead:
-                enriched_leads.append(lead)
-                continue
-                
-            icebreaker = generate_icebreaker(lead, client)
-            lead["icebreaker"] = icebreaker
-            enriched_leads.append(lead)
-            print(f"Generated for {lead.get('name', 'Lead')}")
-            
-        os.makedirs(os.path.dirname(args.output), exist_ok=True)
-        with open(args.output, "w") as f:
-            json.dump(enriched_leads, f, indent=2)
-            
-        print(f"Success: Enriched leads saved to {args.output}")
+        with lead_io.logs_to_stderr(args.output == "-"):
+            os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+            limiter = RateLimiter(rpm=args.rpm, tpm=args.tpm)
+            store = None if args.no_store else lead_store.open_store()
+
+            with writer:
+                if streaming:
+                    # Each lead is written as soon as its icebreaker is ready
+                    print(f"Streaming leads from {args.input}. Generating icebreakers...")
+                    for lead in enrich_stream(lead_io.read_leads(args.input), client, args.workers, limiter, checkpoint_path, store=store):
+                        writer.write(lead)
+                else:
+                    leads = list(lead_io.read_leads(args.input))
+                    print(f"Loaded {len(leads)} leads. Generating icebreakers...")
+
+                    if args.batch:
+                        enriched_leads = enrich_leads_batch(
+                            leads,
+                            client,
+                            state_path=output_base + ".batch.json",
+                            checkpoint_path=checkpoint_path,
+                            poll_interval=args.poll_interval,
+                            store=store
+                        )
+                    else:
+                        enriched_leads = enrich_leads(
+                            leads,
+                            client,
+                            workers=args.workers,
+                            limiter=limiter,
+                            checkpoint_path=checkpoint_path,
+                            store=store
+                        )
+                    for lead in enriched_leads:
+                        writer.write(lead)
+
+            print(f"Success: Enriched {writer.count} leads saved to {args.output}")
 
     except Exception as e:
-        print(f"Fatal error during enrichment: {e}")
+        print(f"Fatal error during enrichment: {e}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
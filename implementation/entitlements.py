@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+# Lives next to the rest of the bot memory (mounted as a volume on Modal)
+ENTITLEMENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../memory/entitlements.sqlite3")
+
+# Webhooks keep the table current; the sweep repairs anything they missed
+RECONCILE_INTERVAL = int(os.getenv("ENTITLEMENT_RECONCILE_INTERVAL", 6 * 3600))
+ENTITLED_STATUSES = ("active", "trialing")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    email TEXT,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_customers_email ON customers (email);
+CREATE TABLE IF NOT EXISTS subscriptions (
+    subscription_id TEXT PRIMARY KEY,
+    customer_id TEXT,
+    status TEXT,
+    products TEXT,
+    current_period_end INTEGER,
+    updated_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_customer ON subscriptions (customer_id);
+CREATE TABLE IF NOT EXISTS processed_events (
+    event_id TEXT PRIMARY KEY,
+    received_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+def normalize_email(email):
+    return str(email or "").strip().lower()
+
+def _id(value):
+    """Stripe expands some fields into objects; we only store IDs."""
+    if isinstance(value, dict):
+        return value.get("id")
+    return value
+
+def _as_dict(obj):
+    return obj.to_dict() if hasattr(obj, "to_dict") else obj
+
+def subscription_products(subscription):
+    items = (subscription.get("items") or {}).get("data") or []
+    return sorted({_id((item.get("price") or {}).get("product")) for item in items if item.get("price")} - {None})
+
+def _period_end(subscription):
+    end = subscription.get("current_period_end")
+    if end is None:
+        # Newer API versions moved the period onto the items
+        items = (subscription.get("items") or {}).get("data") or []
+        ends = [item.get("current_period_end") for item in items if item.get("current_period_end")]
+        end = max(ends) if ends else None
+    return int(end) if end else None
+
+class EntitlementStore:
+    """
+    Local copy of Stripe customers and subscriptions, kept current by webhook
+    events and a periodic reconciliation sweep. is_entitled() is an indexed
+    lookup, so checks never call Stripe.
+    Events older than what is stored for an object are ignored, and each event
+    ID is applied once, so retries and out-of-order delivery are safe.
+    """
+
+    def __init__(self, path=ENTITLEMENTS_PATH):
+        self.path = path
+        self._reconcile_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # --- writes ---
+
+    def upsert_customer(self, conn, customer, ts):
+        conn.execute(
+            """INSERT INTO customers VALUES (?, ?, ?)
+               ON CONFLICT(customer_id) DO UPDATE SET email = excluded.email, updated_at = excluded.updated_at
+               WHERE excluded.updated_at >= customers.updated_at""",
+            (customer["id"], normalize_email(customer.get("email")), ts)
+        )
+
+    def upsert_subscription(self, conn, subscription, ts):
+        conn.execute(
+            """INSERT INTO subscriptions VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(subscription_id) DO UPDATE SET
+                   customer_id = excluded.customer_id, status = excluded.status, products = excluded.products,
+                   current_period_end = excluded.current_period_end, updated_at = excluded.updated_at
+               WHERE excluded.updated_at >= subscriptions.updated_at""",
+            (
+                subscription["id"],
+                _id(subscription.get("customer")),
+                subscription.get("status"),
+                json.dumps(subscription_products(subscription)),
+                _period_end(subscription),
+                ts
+            )
+        )
+        customer = subscription.get("customer")
+        if isinstance(customer, dict) and customer.get("email"):
+            self.upsert_customer(conn, customer, ts)
+
+    def apply_event(self, event):
+        """
+        Applies one verified Stripe event. Returns False if it was a duplicate.
+        """
+        event_type = event["type"]
+        obj = event["data"]["object"]
+        ts = int(event.get("created") or time.time())
+
+        with self._connect() as conn:
+            try:
+                conn.execute("INSERT INTO processed_events VALUES (?, ?)", (event["id"], time.time()))
+            except sqlite3.IntegrityError:
+                return False
+
+            if event_type in ("customer.created", "customer.updated"):
+                self.upsert_customer(conn, obj, ts)
+            elif event_type == "customer.deleted":
+                conn.execute("DELETE FROM customers WHERE customer_id = ?", (obj["id"],))
+                conn.execute("DELETE FROM subscriptions WHERE customer_id = ?", (obj["id"],))
+            elif event_type.startswith("customer.subscription."):
+                # .deleted carries the final object with status "canceled"
+                self.upsert_subscription(conn, obj, ts)
+            elif event_type == "checkout.session.completed" and obj.get("customer"):
+                email = (obj.get("customer_details") or {}).get("email") or obj.get("customer_email")
+                if email:
+                    self.upsert_customer(conn, {"id": _id(obj["customer"]), "email": email}, ts)
+        return True
+
+    # --- reads ---
+
+    def is_entitled(self, email, product_id, now=None):
+        now = now or time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""SELECT s.products, s.current_period_end FROM customers c
+                    JOIN subscriptions s ON s.customer_id = c.customer_id
+                    WHERE c.email = ? AND s.status IN ({",".join("?" * len(ENTITLED_STATUSES))})""",
+                (normalize_email(email), *ENTITLED_STATUSES)
+            ).fetchall()
+        for products, period_end in rows:
+            if product_id in json.loads(products) and (period_end is None or period_end > now):
+                return True
+        return False
+
+    def customer_id_for(self, email):
+        with self._connect() as conn:
+            row = conn.execute("SELECT customer_id FROM customers WHERE email = ? ORDER BY updated_at DESC LIMIT 1", (normalize_email(email),)).fetchone()
+        return row[0] if row else None
+
+    # --- reconciliation ---
+
+    def last_reconciled(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'last_reconciled'").fetchone()
+        return float(row[0]) if row else None
+
+    def reconcile(self, stripe_api):
+        """
+        Full sweep of Stripe customers and subscriptions. Rows written by events
+        newer than the sweep's start are kept.
+        """
+        with self._reconcile_lock:
+            started = int(time.time())
+            # StripeObjects aren't dicts; convert them like webhook events
+            customers = [_as_dict(c) for c in stripe_api.Customer.list(limit=100).auto_paging_iter()]
+            subscriptions = [_as_dict(s) for s in stripe_api.Subscription.list(status="all", limit=100).auto_paging_iter()]
+            with self._connect() as conn:
+                for customer in customers:
+                    self.upsert_customer(conn, customer, started)
+                for subscription in subscriptions:
+                    self.upsert_subscription(conn, subscription, started)
+                seen = [s["id"] for s in subscriptions]
+                # Subscriptions Stripe no longer returns (deleted test data etc.)
+                conn.execute(
+                    f"DELETE FROM subscriptions WHERE updated_at <= ? AND subscription_id NOT IN ({','.join('?' * len(seen))})",
+                    (started, *seen)
+                )
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_reconciled', ?)", (str(time.time()),))
+                # Event IDs are only needed while Stripe may still retry them (3 days)
+                conn.execute("DELETE FROM processed_events WHERE received_at < ?", (time.time() - 7 * 86400,))
+            print(f"Entitlements reconciled: {len(customers)} customers, {len(subscriptions)} subscriptions")
+            return {"customers": len(customers), "subscriptions": len(subscriptions)}
+
+    def reconcile_due(self, interval=RECONCILE_INTERVAL):
+        last = self.last_reconciled()
+        return last is None or time.time() - last >= interval
@@ -4,11 +4,16 @@ import requests
 import time
 import gspread
 from google.oauth2.service_account import Credentials
-from openai import OpenAI
 
-# Initialize clients
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+# Initialize clients (OpenAI on first use)
+_openai_client = None
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None and os.getenv("OPENAI_API_KEY"):
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
 
 json2video_api_key = os.getenv("JSON2VIDEO_API_KEY")
 SHEET_ID = os.getenv("JSON2VIDEO_SHEET_ID")
@@ -30,7 +35,7 @@ def generate_video_workflow(subject=None):
     Orchestrates the Faceless Video workflow.
     Reads/Writes to Google Sheet.
     """
-    if not openai_client or not json2video_api_key:
+    if not get_openai_client() or not json2video_api_key:
         return {"status": "error", "message": "Missing API keys"}
 
     current_subject = subject
@@ -155,6 +160,7 @@ def generate_video_for_subject(subject):
     return generate_video_workflow(subject=subject)
 
 def generate_scripts(subject):
+    openai_client = get_openai_client()
     system_prompt = """
     You are a creative assistant for simple Top 10 videos.
     Output JSON with: introVoiceoverText, introImagePrompt, outroVoiceoverText, outroImagePrompt.
@@ -169,6 +175,7 @@ def generate_scripts(subject):
     return json.loads(response.choices[0].message.content)
 
 def generate_rankings(subject):
+    openai_client = get_openai_client()
     system_prompt = """
     Generate a Top 10 list for the subject. Count down from 10 to 1.
     Output JSON array of objects with keys: voiceoverText, imagePrompt, lowerThirdText.
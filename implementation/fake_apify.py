@@ -0,0 +1,87 @@
+import uuid
+import threading
+from types import SimpleNamespace
+import generate_mock_leads
+
+# Runs are shared across client instances, like the real platform,
+# so a run started in one request can be polled from another.
+_runs = {}
+_lock = threading.Lock()
+
+class FakeApifyClient:
+    """
+    Local stand-in for ApifyClient covering the calls scrape_apify makes:
+    actor().start(), run().get() and dataset().list_items().
+    Each run().get() "runs" the actor a step further, publishing `batch_size`
+    more mock leads until the run SUCCEEDED (or FAILED if fail=True).
+    """
+
+    def __init__(self, items=None, batch_size=3, fail=False):
+        self.items = items
+        self.batch_size = batch_size
+        self.fail = fail
+
+    def actor(self, actor_id):
+        return _FakeActor(self)
+
+    def run(self, run_id):
+        return _FakeRun(run_id)
+
+    def dataset(self, dataset_id):
+        return _FakeDataset(dataset_id)
+
+class _FakeActor:
+    def __init__(self, client):
+        self.client = client
+
+    def start(self, run_input=None):
+        run_input = run_input or {}
+        items = self.client.items
+        if items is None:
+            items = generate_mock_leads.get_mock_leads(limit=run_input.get("fetch_count", 10))
+        run_id = uuid.uuid4().hex[:17]
+        run = {
+            "id": run_id,
+            "defaultDatasetId": f"ds_{run_id}",
+            "status": "READY",
+            "_pending": list(items),
+            "_published": [],
+            "_batch_size": self.client.batch_size,
+            "_fail": self.client.fail
+        }
+        with _lock:
+            _runs[run_id] = run
+        return _public(run)
+
+class _FakeRun:
+    def __init__(self, run_id):
+        self.run_id = run_id
+
+    def get(self):
+        with _lock:
+            run = _runs.get(self.run_id)
+            if run is None:
+                return None
+            if run["status"] not in ("SUCCEEDED", "FAILED"):
+                if run["_fail"]:
+                    run["status"] = "FAILED"
+                else:
+                    batch, run["_pending"] = run["_pending"][:run["_batch_size"]], run["_pending"][run["_batch_size"]:]
+                    run["_published"].extend(batch)
+                    run["status"] = "RUNNING" if run["_pending"] else "SUCCEEDED"
+            return _public(run)
+
+class _FakeDataset:
+    def __init__(self, dataset_id):
+        self.dataset_id = dataset_id
+
+    def list_items(self, offset=0, limit=None):
+        with _lock:
+            run = next((r for r in _runs.values() if r["defaultDatasetId"] == self.dataset_id), None)
+            published = list(run["_published"]) if run else []
+        end = len(published) if limit is None else offset + limit
+        items = published[offset:end]
+        return SimpleNamespace(items=items, offset=offset, count=len(items), total=len(published))
+
+def _public(run):
+    return {k: v for k, v in run.items() if not k.startswith("_")}
@@ -0,0 +1,100 @@
+import io
+import json
+import uuid
+import threading
+from types import SimpleNamespace
+
+# Shared across client instances so a resumed run can poll a batch created earlier
+_files = {}
+_batches = {}
+_lock = threading.Lock()
+
+def default_responder(body):
+    """Returns a chat completion body with a canned icebreaker built from the prompt."""
+    prompt = body["messages"][-1]["content"]
+    company = prompt.split("business called ", 1)[-1].split(".", 1)[0].strip()
+    content = json.dumps({"icebreaker": f"Hey, love what {company} is doing."})
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}]}
+
+class FakeBatchClient:
+    """
+    Offline stand-in for the OpenAI client's files/batches endpoints used by
+    enrich_leads --batch. A batch moves validating -> in_progress -> completed,
+    one step per retrieve(); custom_ids in `fail_ids` come back as 500s.
+    """
+
+    def __init__(self, responder=default_responder, fail_ids=()):
+        self.files = _FakeFiles()
+        self.batches = _FakeBatches(responder, set(fail_ids))
+
+class _FakeFiles:
+    def create(self, file, purpose):
+        data = file.read()
+        file_id = "file-" + uuid.uuid4().hex[:12]
+        with _lock:
+            _files[file_id] = data.decode("utf-8") if isinstance(data, bytes) else data
+        return SimpleNamespace(id=file_id, purpose=purpose, bytes=len(data))
+
+    def content(self, file_id):
+        with _lock:
+            text = _files[file_id]
+        return SimpleNamespace(text=text, content=text.encode("utf-8"), read=lambda: text.encode("utf-8"))
+
+class _FakeBatches:
+    def __init__(self, responder, fail_ids):
+        self.responder = responder
+        self.fail_ids = fail_ids
+
+    def create(self, input_file_id, endpoint, completion_window, metadata=None):
+        batch_id = "batch_" + uuid.uuid4().hex[:12]
+        with _lock:
+            lines = [json.loads(l) for l in _files[input_file_id].splitlines() if l.strip()]
+            _batches[batch_id] = {
+                "id": batch_id,
+                "status": "validating",
+                "endpoint": endpoint,
+                "input_file_id": input_file_id,
+                "output_file_id": None,
+                "error_file_id": None,
+                "requests": lines,
+                "responder": self.responder,
+                "fail_ids": self.fail_ids
+            }
+        return self._view(batch_id)
+
+    def retrieve(self, batch_id):
+        with _lock:
+            batch = _batches[batch_id]
+            if batch["status"] == "validating":
+                batch["status"] = "in_progress"
+            elif batch["status"] == "in_progress":
+                self._complete(batch)
+        return self._view(batch_id)
+
+    def _complete(self, batch):
+        out = io.StringIO()
+        for req in batch["requests"]:
+            if req["custom_id"] in batch["fail_ids"]:
+                response = {"status_code": 500, "request_id": uuid.uuid4().hex, "body": {"error": {"message": "server error"}}}
+            else:
+                response = {"status_code": 200, "request_id": uuid.uuid4().hex, "body": batch["responder"](req["body"])}
+            record = {"id": "batch_req_" + uuid.uuid4().hex[:12], "custom_id": req["custom_id"], "response": response, "error": None}
+            out.write(json.dumps(record) + "\n")
+        output_file_id = "file-" + uuid.uuid4().hex[:12]
+        _files[output_file_id] = out.getvalue()
+        batch["output_file_id"] = output_file_id
+        batch["status"] = "completed"
+
+    def _view(self, batch_id):
+        with _lock:
+            batch = _batches[batch_id]
+            total = len(batch["requests"])
+            done = total if batch["status"] == "completed" else 0
+            failed = len([r for r in batch["requests"] if r["custom_id"] in batch["fail_ids"]]) if done else 0
+            return SimpleNamespace(
+                id=batch["id"],
+                status=batch["status"],
+                output_file_id=batch["output_file_id"],
+                error_file_id=batch["error_file_id"],
+                request_counts=SimpleNamespace(total=total, completed=done - failed, failed=failed)
+            )
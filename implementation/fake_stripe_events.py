@@ -0,0 +1,127 @@
+import os
+import sys
+import hmac
+import json
+import time
+import uuid
+import hashlib
+import argparse
+from types import SimpleNamespace
+
+# Local stand-in for Stripe's webhook deliveries: builds events shaped like the
+# real ones, signs them the way Stripe does and posts them to the endpoint.
+
+def _id(prefix):
+    return f"{prefix}_{uuid.uuid4().hex[:14]}"
+
+def make_customer(email, customer_id=None):
+    return {"id": customer_id or _id("cus"), "object": "customer", "email": email}
+
+def make_subscription(customer_id, product_id, status="active", subscription_id=None, period_days=30):
+    return {
+        "id": subscription_id or _id("sub"),
+        "object": "subscription",
+        "customer": customer_id,
+        "status": status,
+        "current_period_end": int(time.time()) + period_days * 86400,
+        "items": {"object": "list", "data": [
+            {"id": _id("si"), "price": {"id": _id("price"), "product": product_id}}
+        ]}
+    }
+
+def make_event(event_type, obj, created=None, event_id=None):
+    return {
+        "id": event_id or _id("evt"),
+        "object": "event",
+        "type": event_type,
+        "created": int(created if created is not None else time.time()),
+        "livemode": False,
+        "data": {"object": obj}
+    }
+
+def subscribe_events(email, product_id, customer_id=None):
+    """Events Stripe sends for a new customer completing a subscription checkout."""
+    customer = make_customer(email, customer_id)
+    subscription = make_subscription(customer["id"], product_id)
+    now = int(time.time())
+    return [
+        make_event("customer.created", customer, now),
+        make_event("customer.subscription.created", subscription, now),
+        make_event("checkout.session.completed", {
+            "id": _id("cs"), "object": "checkout.session", "customer": customer["id"],
+            "customer_details": {"email": email}, "subscription": subscription["id"]
+        }, now)
+    ]
+
+def cancel_event(subscription, created=None):
+    canceled = dict(subscription, status="canceled")
+    return make_event("customer.subscription.deleted", canceled, created)
+
+def sign(payload, secret, timestamp=None):
+    """Stripe-Signature header for a raw payload: t=<ts>,v1=<HMAC-SHA256 of "<ts>.<payload>">."""
+    timestamp = int(timestamp if timestamp is not None else time.time())
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), f"{timestamp}.{payload}".encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+def replay(events, secret, client=None, url="/api/stripe/webhook"):
+    """
+    Posts each event, signed, to the webhook. `client` is a Flask test client;
+    without one, `url` must be absolute and events are sent over HTTP.
+    Returns the status codes.
+    """
+    codes = []
+    for event in events:
+        payload = json.dumps(event)
+        headers = {"Stripe-Signature": sign(payload, secret), "Content-Type": "application/json"}
+        if client is not None:
+            codes.append(client.post(url, data=payload, headers=headers).status_code)
+        else:
+            import requests
+            codes.append(requests.post(url, data=payload, headers=headers, timeout=10).status_code)
+    return codes
+
+class _FakeList:
+    def __init__(self, items):
+        self.data = items
+
+    def auto_paging_iter(self):
+        return iter(self.data)
+
+class FakeStripe:
+    """
+    The slice of the stripe module EntitlementStore.reconcile() uses:
+    Customer.list() and Subscription.list(), both paged with auto_paging_iter().
+    Items come back as StripeObjects, like the real client returns.
+    """
+
+    def __init__(self, customers=(), subscriptions=()):
+        import stripe
+        self.customers = [stripe.Customer.construct_from(c, "sk_test_fake") for c in customers]
+        self.subscriptions = [stripe.Subscription.construct_from(s, "sk_test_fake") for s in subscriptions]
+        self.Customer = SimpleNamespace(list=lambda **kwargs: _FakeList(self.customers))
+        self.Subscription = SimpleNamespace(list=lambda **kwargs: _FakeList(self.subscriptions))
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay fake Stripe subscription events to a webhook endpoint.")
+    parser.add_argument("--url", default="http://localhost:5000/api/stripe/webhook")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--product", default="prod_TqhJhf7EuIDrfQ")
+    parser.add_argument("--cancel", action="store_true", help="Cancel the subscription afterwards.")
+    args = parser.parse_args()
+
+    secret = os.getenv("STRIPE_WEBHOOK_SECRET")
+    if not secret:
+        print("STRIPE_WEBHOOK_SECRET must match the server's.")
+        sys.exit(1)
+
+    events = subscribe_events(args.email, args.product)
+    if args.cancel:
+        subscription = events[1]["data"]["object"]
+        events.append(cancel_event(subscription, created=events[1]["created"] + 1))
+    for event, code in zip(events, replay(events, secret, url=args.url)):
+        print(f"{event['type']}: {code}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,498 @@
+import re
+import difflib
+
+# Compact bundled gazetteer: "Name|CountryCode|alias;alias"
+# Covers capitals and major cities; the weather agent falls back to the LLM for anything else.
+CITY_DATA = """
+Yangon|MM|rangoon;ygn
+Mandalay|MM
+Naypyidaw|MM|nay pyi taw;naypyitaw
+Bago|MM|pegu
+Mawlamyine|MM|moulmein
+Taunggyi|MM
+Pathein|MM|bassein
+Myitkyina|MM
+Sittwe|MM
+Monywa|MM
+Meiktila|MM
+Lashio|MM
+Pyay|MM|prome
+Dawei|MM|tavoy
+Hpa-An|MM|hpa an
+Magway|MM
+Bangkok|TH|krung thep
+Chiang Mai|TH
+Phuket|TH
+Pattaya|TH
+Hanoi|VN|ha noi
+Ho Chi Minh City|VN|saigon;hcmc;ho chi minh
+Da Nang|VN|danang
+Phnom Penh|KH
+Siem Reap|KH
+Vientiane|LA
+Luang Prabang|LA
+Kuala Lumpur|MY|kl
+Penang|MY
+Johor Bahru|MY
+Singapore|SG
+Jakarta|ID
+Bali|ID|denpasar
+Surabaya|ID
+Bandung|ID
+Manila|PH
+Cebu|PH|cebu city
+Davao|PH|davao city
+Quezon City|PH
+Bandar Seri Begawan|BN
+Dili|TL
+Beijing|CN|peking
+Shanghai|CN
+Guangzhou|CN|canton
+Shenzhen|CN
+Chengdu|CN
+Chongqing|CN
+Wuhan|CN
+Xi'an|CN|xian
+Hangzhou|CN
+Nanjing|CN
+Tianjin|CN
+Kunming|CN
+Harbin|CN
+Hong Kong|HK|hk
+Macau|MO|macao
+Taipei|TW
+Kaohsiung|TW
+Tokyo|JP
+Osaka|JP
+Kyoto|JP
+Yokohama|JP
+Nagoya|JP
+Sapporo|JP
+Fukuoka|JP
+Hiroshima|JP
+Okinawa|JP|naha
+Seoul|KR
+Busan|KR|pusan
+Incheon|KR
+Pyongyang|KP
+Ulaanbaatar|MN|ulan bator
+Delhi|IN|new delhi
+Mumbai|IN|bombay
+Bangalore|IN|bengaluru
+Chennai|IN|madras
+Kolkata|IN|calcutta
+Hyderabad|IN
+Pune|IN
+Ahmedabad|IN
+Jaipur|IN
+Goa|IN
+Kathmandu|NP
+Pokhara|NP
+Thimphu|BT
+Dhaka|BD|dacca
+Chittagong|BD
+Colombo|LK
+Male|MV
+Karachi|PK
+Lahore|PK
+Islamabad|PK
+Kabul|AF
+Tashkent|UZ
+Samarkand|UZ
+Almaty|KZ
+Astana|KZ|nur sultan
+Bishkek|KG
+Dushanbe|TJ
+Ashgabat|TM
+Tehran|IR
+Isfahan|IR
+Baghdad|IQ
+Erbil|IQ
+Riyadh|SA
+Jeddah|SA
+Mecca|SA|makkah
+Medina|SA
+Dubai|AE
+Abu Dhabi|AE
+Sharjah|AE
+Doha|QA
+Manama|BH
+Kuwait City|KW|kuwait
+Muscat|OM
+Sanaa|YE
+Amman|JO
+Beirut|LB
+Damascus|SY
+Jerusalem|IL
+Tel Aviv|IL
+Istanbul|TR|constantinople
+Ankara|TR
+Izmir|TR
+Antalya|TR
+Baku|AZ
+Tbilisi|GE
+Yerevan|AM
+Nicosia|CY
+Cairo|EG
+Alexandria|EG
+Luxor|EG
+Tripoli|LY
+Tunis|TN
+Algiers|DZ
+Casablanca|MA
+Rabat|MA
+Marrakesh|MA|marrakech
+Khartoum|SD
+Addis Ababa|ET
+Nairobi|KE
+Mombasa|KE
+Kampala|UG
+Kigali|RW
+Dar es Salaam|TZ
+Zanzibar|TZ
+Dodoma|TZ
+Lagos|NG
+Abuja|NG
+Accra|GH
+Dakar|SN
+Abidjan|CI
+Bamako|ML
+Kinshasa|CD
+Luanda|AO
+Lusaka|ZM
+Harare|ZW
+Maputo|MZ
+Windhoek|NA
+Gaborone|BW
+Johannesburg|ZA|joburg;jozi
+Cape Town|ZA
+Durban|ZA
+Pretoria|ZA
+Antananarivo|MG
+Port Louis|MU
+London|GB
+Manchester|GB
+Birmingham|GB
+Liverpool|GB
+Leeds|GB
+Glasgow|GB
+Edinburgh|GB
+Bristol|GB
+Cardiff|GB
+Belfast|GB
+Oxford|GB
+Cambridge|GB
+Dublin|IE
+Cork|IE
+Paris|FR
+Marseille|FR|marseilles
+Lyon|FR|lyons
+Toulouse|FR
+Nice|FR
+Bordeaux|FR
+Strasbourg|FR
+Lille|FR
+Brussels|BE|bruxelles
+Antwerp|BE
+Amsterdam|NL
+Rotterdam|NL
+The Hague|NL|den haag
+Utrecht|NL
+Luxembourg|LU
+Berlin|DE
+Hamburg|DE
+Munich|DE|munchen;münchen
+Cologne|DE|koln;köln
+Frankfurt|DE
+Stuttgart|DE
+Dusseldorf|DE|düsseldorf
+Leipzig|DE
+Dresden|DE
+Zurich|CH|zürich
+Geneva|CH|geneve;genève
+Basel|CH
+Bern|CH|berne
+Vienna|AT|wien
+Salzburg|AT
+Innsbruck|AT
+Prague|CZ|praha
+Brno|CZ
+Bratislava|SK
+Budapest|HU
+Warsaw|PL|warszawa
+Krakow|PL|kraków;cracow
+Gdansk|PL
+Wroclaw|PL
+Copenhagen|DK|kobenhavn
+Aarhus|DK
+Oslo|NO
+Bergen|NO
+Stockholm|SE
+Gothenburg|SE|goteborg
+Malmo|SE|malmö
+Helsinki|FI
+Reykjavik|IS
+Tallinn|EE
+Riga|LV
+Vilnius|LT
+Minsk|BY
+Kyiv|UA|kiev
+Lviv|UA
+Odesa|UA|odessa
+Kharkiv|UA
+Chisinau|MD
+Moscow|RU|moskva
+Saint Petersburg|RU|st petersburg;petersburg
+Novosibirsk|RU
+Yekaterinburg|RU
+Kazan|RU
+Vladivostok|RU
+Madrid|ES
+Barcelona|ES
+Valencia|ES
+Seville|ES|sevilla
+Malaga|ES
+Bilbao|ES
+Palma|ES|palma de mallorca
+Ibiza|ES
+Lisbon|PT|lisboa
+Porto|PT|oporto
+Rome|IT|roma
+Milan|IT|milano
+Naples|IT|napoli
+Turin|IT|torino
+Florence|IT|firenze
+Venice|IT|venezia
+Bologna|IT
+Palermo|IT
+Athens|GR
+Thessaloniki|GR
+Sofia|BG
+Bucharest|RO
+Belgrade|RS
+Zagreb|HR
+Dubrovnik|HR
+Ljubljana|SI
+Sarajevo|BA
+Skopje|MK
+Tirana|AL
+Podgorica|ME
+Valletta|MT
+Monaco|MC
+Andorra la Vella|AD
+New York|US|new york city;nyc;manhattan;brooklyn
+Los Angeles|US
+Chicago|US
+Houston|US
+Phoenix|US
+Philadelphia|US|philly
+San Antonio|US
+San Diego|US
+Dallas|US
+Austin|US
+San Jose|US
+San Francisco|US|sf;frisco
+Seattle|US
+Portland|US
+Denver|US
+Boston|US
+Washington|US|washington dc;washington d c;dc
+Atlanta|US
+Miami|US
+Orlando|US
+Tampa|US
+Las Vegas|US|vegas
+Salt Lake City|US
+Minneapolis|US
+Detroit|US
+Nashville|US
+New Orleans|US|nola
+Charlotte|US
+Baltimore|US
+Pittsburgh|US
+Cleveland|US
+St. Louis|US|saint louis;st louis
+Kansas City|US
+Indianapolis|US
+Columbus|US
+Sacramento|US
+Honolulu|US
+Anchorage|US
+Toronto|CA
+Montreal|CA|montréal
+Vancouver|CA
+Calgary|CA
+Edmonton|CA
+Ottawa|CA
+Quebec City|CA|quebec
+Winnipeg|CA
+Halifax|CA
+Mexico City|MX|cdmx
+Guadalajara|MX
+Monterrey|MX
+Cancun|MX|cancún
+Tijuana|MX
+Havana|CU|la habana
+Kingston|JM
+Santo Domingo|DO
+San Juan|PR
+Panama City|PA|panama
+Guatemala City|GT
+San Salvador|SV
+Tegucigalpa|HN
+Managua|NI
+Bogota|CO|bogotá
+Medellin|CO|medellín
+Cartagena|CO
+Caracas|VE
+Quito|EC
+Guayaquil|EC
+Lima|PE
+Cusco|PE|cuzco
+La Paz|BO
+Santiago|CL
+Buenos Aires|AR
+Cordoba|AR|córdoba
+Montevideo|UY
+Asuncion|PY|asunción
+Sao Paulo|BR|são paulo
+Rio de Janeiro|BR|rio
+Brasilia|BR|brasília
+Fortaleza|BR
+Belo Horizonte|BR
+Manaus|BR
+Recife|BR
+Porto Alegre|BR
+Sydney|AU
+Melbourne|AU
+Brisbane|AU
+Perth|AU
+Adelaide|AU
+Canberra|AU
+Gold Coast|AU
+Darwin|AU
+Hobart|AU
+Auckland|NZ
+Wellington|NZ
+Christchurch|NZ
+Queenstown|NZ
+Suva|FJ
+Port Moresby|PG
+"""
+
+# A place name is only trusted where it is the whole location phrase: the
+# whole query, the start of "<city> weather ...", or right after one of these
+# prepositions, with at most time/weather words after it. So "is it nice today"
+# or "weather in Paris, Texas" aren't forced onto a gazetteer city.
+_PLACE_PREPOSITIONS = {"in", "at", "for"}
+_TRAILING_WORDS = {
+    "weather", "forecast", "temperature", "temp", "now", "right", "today", "tonight",
+    "tomorrow", "this", "morning", "afternoon", "evening", "week", "weekend",
+}
+
+_index = None
+
+def _tokens(text):
+    text = str(text or "").casefold().replace("-", " ").replace(".", " ")
+    return re.findall(r"[^\W_]+(?:'[^\W_]+)?", text)
+
+def _build_index():
+    """Token trie over all names and aliases, plus a flat name list for fuzzy matching."""
+    trie = {}
+    names = {}
+    for line in CITY_DATA.strip().splitlines():
+        parts = line.split("|")
+        name, country = parts[0], parts[1]
+        aliases = parts[2].split(";") if len(parts) > 2 and parts[2] else []
+        city = {"name": name, "country": country}
+        for variant in [name] + aliases:
+            tokens = _tokens(variant)
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node["$"] = city
+            names[" ".join(tokens)] = city
+    return trie, names
+
+def _get_index():
+    global _index
+    if _index is None:
+        _index = _build_index()
+    return _index
+
+def find_cities(text):
+    """
+    Returns all cities mentioned in `text` as a list of (city, start, end) token
+    indexes, using the longest match at each position ("new york city" beats "new york").
+    """
+    trie, _ = _get_index()
+    tokens = _tokens(text)
+    matches = []
+    i = 0
+    while i < len(tokens):
+        node = trie
+        best = None
+        j = i
+        while j < len(tokens) and tokens[j] in node:
+            node = node[tokens[j]]
+            j += 1
+            if "$" in node:
+                best = (node["$"], j)
+        if best:
+            matches.append((best[0], i, best[1]))
+            i = best[1]
+        else:
+            i += 1
+    return matches
+
+def fuzzy_city(text, cutoff=0.85):
+    """Closest gazetteer name to `text` (for typos like 'Londn'), or None."""
+    _, names = _get_index()
+    key = " ".join(_tokens(text))
+    if not key:
+        return None
+    close = difflib.get_close_matches(key, names.keys(), n=1, cutoff=cutoff)
+    return names[close[0]] if close else None
+
+def _starts_with_city(tokens):
+    """True if tokens begin with a gazetteer name followed by more words."""
+    node, _ = _get_index()
+    for token in tokens[:-1]:
+        if token not in node:
+            return False
+        node = node[token]
+        if "$" in node:
+            return True
+    return False
+
+def _is_location_phrase(tokens, start, end):
+    """True if tokens[start:end] is where the query names its place (see _TRAILING_WORDS)."""
+    if not all(token in _TRAILING_WORDS for token in tokens[end:]):
+        return False
+    return start == 0 or tokens[start - 1] in _PLACE_PREPOSITIONS
+
+def resolve_city(query):
+    """
+    Resolve the city a weather query is about, without any network call.
+    Returns {"name", "country"} or None when the query is ambiguous, unknown or
+    names its place in a way the gazetteer can't be sure of (the caller should
+    then fall back to the LLM).
+    """
+    tokens = _tokens(query)
+    located = {city["name"]: city for city, start, end in find_cities(query) if _is_location_phrase(tokens, start, end)}
+    if len(located) == 1:
+        return next(iter(located.values()))
+    if located:
+        return None
+
+    # No exact hit: try the words after the last preposition, e.g. "weather in san fransisco"
+    for idx in range(len(tokens) - 1, -1, -1):
+        if tokens[idx] in _PLACE_PREPOSITIONS and idx + 1 < len(tokens):
+            tail = tokens[idx + 1:]
+            while tail and tail[-1] in _TRAILING_WORDS:
+                tail = tail[:-1]
+            # "melbourne fl" is a qualified place, not a typo for Melbourne
+            if tail and len(tail) <= 4 and not _starts_with_city(tail):
+                return fuzzy_city(" ".join(tail))
+            break
+    return None
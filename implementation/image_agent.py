@@ -2,15 +2,21 @@ import os
 import json
 import requests
 import io
-from openai import OpenAI
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 import gspread
+import telegram_client
 
-# Initialize OpenAI
-openai_api_key = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=openai_api_key) if openai_api_key else None
+_openai_client = None
+
+def get_openai_client():
+    """OpenAI client, created on first use so importing this module stays cheap."""
+    global _openai_client
+    if _openai_client is None and os.getenv("OPENAI_API_KEY"):
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
 
 def generate_image_workflow(image_title, image_prompt, chat_id=None):
     """
@@ -63,6 +69,7 @@ def generate_image_workflow(image_title, image_prompt, chat_id=None):
         return {"status": "error", "message": str(e)}
 
 def refine_prompt(original_prompt):
+    openai_client = get_openai_client()
     if not openai_client:
         return original_prompt + " (Mock Refined)"
         
@@ -87,6 +94,7 @@ def refine_prompt(original_prompt):
         return original_prompt
 
 def generate_image(prompt):
+    openai_client = get_openai_client()
     if not openai_client:
         return "https://via.placeholder.com/1024?text=Mock+Image"
         
@@ -201,13 +209,10 @@ def log_to_sheets(title, request_prompt, drive_link, image_url):
         traceback.print_exc()
 
 def send_to_telegram(chat_id, image_url):
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-    if not bot_token:
+    if not os.getenv("TELEGRAM_BOT_TOKEN"):
         return "No Bot Token"
-        
-    url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-    try:
-        requests.post(url, json={"chat_id": chat_id, "photo": image_url})
+
+    result = telegram_client.get_client().send_photo(chat_id, image_url)
+    if result.get("ok"):
         return "Sent"
-    except Exception as e:
-        return f"Error sending to Telegram: {e}"
+    return f"Error sending to Telegram: {result.get('description')}"
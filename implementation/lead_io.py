@@ -0,0 +1,76 @@
+import os
+import sys
+import json
+import contextlib
+
+def is_stream(path):
+    """'-' (stdin/stdout) and *.jsonl paths are read and written one lead per line."""
+    return path == "-" or path.endswith(".jsonl")
+
+def read_leads(path):
+    """
+    Yields leads from a JSON array file, a JSONL file, or stdin ('-', JSONL).
+    JSONL inputs are read lazily, so a producer upstream in a pipe can still be running.
+    """
+    if path == "-":
+        yield from _read_jsonl(sys.stdin)
+    elif path.endswith(".jsonl"):
+        with open(path, "r") as f:
+            yield from _read_jsonl(f)
+    else:
+        with open(path, "r") as f:
+            yield from json.load(f)
+
+def _read_jsonl(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+class LeadWriter:
+    """
+    Writes leads to a JSON array file, a JSONL file, or stdout ('-').
+    JSONL output is flushed per lead so the next stage sees it immediately;
+    a JSON array is written in one go on close.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._items = []
+        if path == "-":
+            # Captured now, so data still reaches stdout inside logs_to_stderr()
+            self._f = sys.stdout
+            return
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._f = open(path, "w") if path.endswith(".jsonl") else None
+
+    def write(self, lead):
+        self.count += 1
+        if self._f is None:
+            self._items.append(lead)
+        else:
+            self._f.write(json.dumps(lead, default=str) + "\n")
+            self._f.flush()
+
+    def close(self):
+        if self._f is None:
+            with open(self.path, "w") as f:
+                json.dump(self._items, f, indent=2)
+        elif self._f is not sys.stdout:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@contextlib.contextmanager
+def logs_to_stderr(enabled=True):
+    """Sends print() output to stderr while stdout carries JSONL data."""
+    if not enabled:
+        yield
+        return
+    with contextlib.redirect_stdout(sys.stderr):
+        yield
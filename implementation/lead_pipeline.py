@@ -0,0 +1,122 @@
+import os
+import sys
+import queue
+import argparse
+import threading
+from dotenv import load_dotenv
+import lead_io
+import scrape_apify
+import enrich_leads
+import lead_store
+
+load_dotenv()
+
+_END = object()
+
+def _produce(source, q, errors):
+    try:
+        for item in source:
+            q.put(item)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        q.put(_END)
+
+def _consume(q):
+    while True:
+        item = q.get()
+        if item is _END:
+            return
+        yield item
+
+def run_stage(source, maxsize):
+    """
+    Runs `source` on its own thread and returns a generator over its items.
+    The bounded queue between stages is what keeps memory flat: a fast stage
+    blocks once `maxsize` items are waiting for the next one.
+    """
+    q = queue.Queue(maxsize=maxsize)
+    errors = []
+    threading.Thread(target=_produce, args=(source, q, errors), daemon=True).start()
+    yield from _consume(q)
+    if errors:
+        raise errors[0]
+
+def run_pipeline(query, location, sink, limit=10, size=None, industry=None, email_status=None,
+                 openai_client=None, apify_client=None, workers=enrich_leads.ENRICH_WORKERS,
+                 limiter=None, checkpoint_path=None, queue_size=20, poll_interval=None,
+                 store=None, skip_known=False):
+    """
+    scrape -> enrich -> sink, one lead at a time. `sink` is called with each
+    enriched lead as soon as it is ready (e.g. SheetStreamUploader.add).
+    With a LeadStore, leads are tagged with lead_id, known icebreakers are reused
+    and (with skip_known) leads seen in earlier runs are dropped.
+    Returns the number of leads delivered.
+    """
+    apify_client = apify_client or scrape_apify.get_client()
+    handle = scrape_apify.start_scrape(query, location, limit, size, industry, email_status, client=apify_client)
+
+    items = scrape_apify.iter_run_items(handle, client=apify_client, poll_interval=poll_interval)
+    if store:
+        items = lead_store.tag_leads(items, store, skip_known)
+    scraped = run_stage(items, queue_size)
+    enriched = run_stage(
+        enrich_leads.enrich_stream(scraped, openai_client, workers, limiter, checkpoint_path, store=store),
+        queue_size
+    )
+
+    count = 0
+    for lead in enriched:
+        sink(lead)
+        count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape, enrich and upload leads as a single streaming pipeline.")
+    parser.add_argument("--limit", type=int, default=10, help="Number of leads to scrape (MAX 10 enforced).")
+    parser.add_argument("--query", type=str, default="CEO", help="Search query (e.g. 'CEO', 'Founder').")
+    parser.add_argument("--location", type=str, default="United States", help="Location filter.")
+    parser.add_argument("--size", type=str, default=None, help="Company size (e.g. '51-200').")
+    parser.add_argument("--industry", type=str, default=None, help="Industry filter.")
+    parser.add_argument("--email-status", type=str, default=None, help="Email status (e.g. 'validated').")
+    parser.add_argument("--workers", type=int, default=enrich_leads.ENRICH_WORKERS, help="Concurrent OpenAI requests.")
+    parser.add_argument("--output", type=str, default=None, help="Write JSONL here ('-' for stdout) instead of uploading to Sheets.")
+    parser.add_argument("--checkpoint", default=".tmp/leads_stream.checkpoint.jsonl", help="Icebreaker progress file.")
+    parser.add_argument("--skip-known", action="store_true", help="Drop leads already in the lead store from earlier runs.")
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        print("Error: OPENAI_API_KEY not found in .env", file=sys.stderr)
+        sys.exit(1)
+    from openai import OpenAI
+    client = OpenAI(api_key=api_key)
+
+    writer = lead_io.LeadWriter(args.output) if args.output else None
+    try:
+        with lead_io.logs_to_stderr(args.output == "-"):
+            os.makedirs(os.path.dirname(args.checkpoint) or ".", exist_ok=True)
+            store = lead_store.open_store()
+            if writer:
+                with writer:
+                    count = run_pipeline(args.query, args.location, writer.write, args.limit, args.size,
+                                         args.industry, args.email_status, openai_client=client,
+                                         workers=args.workers, checkpoint_path=args.checkpoint,
+                                         store=store, skip_known=args.skip_known)
+            else:
+                import upload_sheets
+                uploader = upload_sheets.SheetStreamUploader(upload_sheets.open_worksheet(), store=store)
+                try:
+                    count = run_pipeline(args.query, args.location, uploader.add, args.limit, args.size,
+                                         args.industry, args.email_status, openai_client=client,
+                                         workers=args.workers, checkpoint_path=args.checkpoint,
+                                         store=store, skip_known=args.skip_known)
+                finally:
+                    uploader.flush()
+            print(f"Success: {count} leads scraped, enriched and delivered.")
+    except Exception as e:
+        print(f"Pipeline error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
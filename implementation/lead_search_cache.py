@@ -0,0 +1,53 @@
+import os
+import time
+from disk_cache import DiskCache
+from research_cache import normalize_query
+import scrape_apify
+
+# Apify runs cost credits; reuse a search's results for a day by default
+LEAD_CACHE_TTL = int(os.getenv("LEAD_CACHE_TTL", 24 * 3600))
+LEAD_CACHE_MAX_BYTES = int(float(os.getenv("LEAD_CACHE_MAX_MB", 20)) * 1024 * 1024)
+
+_cache = DiskCache("leads", ttl=LEAD_CACHE_TTL, max_bytes=LEAD_CACHE_MAX_BYTES)
+
+def cache_key(query, location, size=None, industry=None, email_status=None):
+    """Filters that change what the actor returns; limit isn't one of them (it always fetches SAFE_LIMIT)."""
+    return {
+        "query": normalize_query(query),
+        "location": normalize_query(location),
+        "size": normalize_query(size),
+        "industry": normalize_query(industry),
+        "email_status": normalize_query(email_status)
+    }
+
+def search_leads(query, location, limit=10, size=None, industry=None, email_status=None, force_refresh=False):
+    """
+    scrape_apify.scrape_leads through the on-disk lead-search cache.
+    The full SAFE_LIMIT result set is cached and sliced to `limit`, so a later,
+    larger request for the same search is still a hit.
+    Returns {"leads": [...], "cache": {"hit", "fetched_at", "age_seconds"}}.
+    """
+    key = cache_key(query, location, size, industry, email_status)
+    limit = min(limit, scrape_apify.SAFE_LIMIT)
+
+    entry = None if force_refresh else _cache.get_entry(key)
+    if entry:
+        print(f"Lead search cache hit for '{query}' in '{location}'")
+        return {
+            "leads": entry["value"][:limit],
+            "cache": {
+                "hit": True,
+                "fetched_at": entry["fetched_at"],
+                "age_seconds": round(time.time() - entry["fetched_at"], 1)
+            }
+        }
+
+    leads = scrape_apify.scrape_leads(query, location, limit=scrape_apify.SAFE_LIMIT, size=size, industry=industry, email_status=email_status)
+    fetched_at = time.time()
+    if leads:
+        # Empty results are usually a bad filter or an actor hiccup; don't pin them
+        fetched_at = _cache.set(key, leads)["fetched_at"]
+    return {"leads": leads[:limit], "cache": {"hit": False, "fetched_at": fetched_at, "age_seconds": 0}}
+
+def clear():
+    _cache.clear()
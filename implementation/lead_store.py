@@ -0,0 +1,223 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import unquote, urlparse
+from disk_cache import atomic_write_json
+
+# Lives next to the rest of the bot memory (mounted as a volume on Modal)
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../memory/leads/lead_store.json")
+
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "gmbh", "plc", "pte", "sa", "ag"}
+
+# --- IDENTITY ---
+
+def normalize_email(email):
+    """Lowercased, with any +tag dropped: "John.Doe+leads@Acme.com" -> "john.doe@acme.com"."""
+    email = str(email or "").strip().lower()
+    if "@" not in email:
+        return None
+    local, _, domain = email.rpartition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if local and domain else None
+
+def normalize_linkedin(value):
+    """Profile slug from a LinkedIn URL or bare public identifier: ".../in/John-Doe/?x=1" -> "john-doe"."""
+    value = unquote(str(value or "").strip()).lower()
+    if not value:
+        return None
+    if "linkedin.com" in value:
+        path = urlparse(value if "://" in value else "https://" + value).path
+        match = re.search(r"/in/([^/]+)", path)
+        return match.group(1) if match else None
+    return value.strip("/") or None
+
+def _clean(text):
+    text = re.sub(r"[^\w\s]", " ", str(text or "").casefold())
+    return " ".join(text.split())
+
+def normalize_name_company(name, company):
+    name = _clean(name)
+    words = [w for w in _clean(company).split() if w not in COMPANY_SUFFIXES]
+    if not name or not words:
+        return None
+    return f"{name}|{' '.join(words)}"
+
+def identity_keys(lead):
+    """All identity keys for a lead, strongest first: email, LinkedIn, name+company."""
+    keys = []
+    email = normalize_email(lead.get("email") or lead.get("personal_email"))
+    if email:
+        keys.append("email:" + email)
+
+    for field in ("linkedInUrl", "linkedin_url", "linkedin", "publicIdentifier"):
+        slug = normalize_linkedin(lead.get(field))
+        if slug:
+            keys.append("linkedin:" + slug)
+            break
+
+    name = lead.get("name") or " ".join(filter(None, [lead.get("first_name") or lead.get("firstName"), lead.get("last_name") or lead.get("lastName")]))
+    company = lead.get("company") or lead.get("companyName") or lead.get("organization_name")
+    name_company = normalize_name_company(name, company)
+    if name_company:
+        keys.append("name:" + name_company)
+    return keys
+
+def _new_id(key):
+    return "L" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+# --- BLOOM FILTER ---
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter (double hashing over sha256). Sized by default for
+    100k keys at ~1% false positives (~120 KB), small enough to load on every run.
+    """
+
+    def __init__(self, num_bits=958_506, num_hashes=7, data=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(data) if data else bytearray((num_bits + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos // 8] |= 1 << (pos % 8)
+
+    def __contains__(self, key):
+        return all(self.bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(key))
+
+# --- STORE ---
+
+class LeadStore:
+    """
+    Leads seen across runs, so the same person isn't enriched or appended twice.
+
+    The index is one JSON file: {"keys": {identity_key: lead_id}, "leads": {lead_id: record}},
+    written atomically. With use_bloom=True a Bloom filter of all identity keys is
+    kept alongside it (<path>.bloom) and answers most "never seen" checks without
+    loading the index at all.
+    """
+
+    def __init__(self, path=STORE_PATH, use_bloom=False, autosave_every=25):
+        self.path = path
+        self.use_bloom = use_bloom
+        self.autosave_every = autosave_every
+        self._index = None
+        self._bloom = None
+        self._dirty = 0
+        self._lock = threading.RLock()
+
+    # Loading is lazy: a run that only ever sees new leads never reads the index
+    def _load(self):
+        if self._index is None:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    self._index = json.load(f)
+            else:
+                self._index = {"version": 1, "keys": {}, "leads": {}}
+        return self._index
+
+    def _bloom_filter(self):
+        if self._bloom is None:
+            bloom_path = self.path + ".bloom"
+            if os.path.exists(bloom_path):
+                with open(bloom_path, "rb") as f:
+                    self._bloom = BloomFilter(data=f.read())
+            else:
+                self._bloom = BloomFilter()
+                for key in self._load()["keys"]:
+                    self._bloom.add(key)
+        return self._bloom
+
+    def find(self, lead):
+        """lead_id of a known lead, or None."""
+        with self._lock:
+            keys = identity_keys(lead)
+            if self.use_bloom and not any(key in self._bloom_filter() for key in keys):
+                return None
+            index = self._load()
+            for key in keys:
+                if key in index["keys"]:
+                    return index["keys"][key]
+            return None
+
+    def get(self, lead):
+        """Stored record for a known lead ({"lead_id", "icebreaker", ...}), or None."""
+        with self._lock:
+            lead_id = self.find(lead)
+            return dict(self._load()["leads"][lead_id], lead_id=lead_id) if lead_id else None
+
+    def assign_id(self, lead):
+        """
+        Sets lead["lead_id"]: the existing ID if any identity key matches, else a
+        new one derived from the strongest key. Leads with no identity get None.
+        """
+        with self._lock:
+            keys = identity_keys(lead)
+            lead_id = lead.get("lead_id") or self.find(lead) or (_new_id(keys[0]) if keys else None)
+            lead["lead_id"] = lead_id
+            return lead_id
+
+    def record(self, lead, **fields):
+        """Upserts a lead and any extra fields (icebreaker, uploaded_at...); links all its identity keys."""
+        with self._lock:
+            lead_id = self.assign_id(lead)
+            if not lead_id:
+                return None
+            index = self._load()
+            now = time.time()
+            entry = index["leads"].setdefault(lead_id, {"first_seen": now})
+            entry["last_seen"] = now
+            entry.update({k: v for k, v in fields.items() if v is not None})
+            for key in identity_keys(lead):
+                index["keys"][key] = lead_id
+                if self.use_bloom:
+                    self._bloom_filter().add(key)
+
+            self._dirty += 1
+            if self._dirty >= self.autosave_every:
+                self.save()
+            return lead_id
+
+    def save(self):
+        with self._lock:
+            if self._index is None or not self._dirty:
+                return
+            atomic_write_json(self.path, self._index)
+            if self.use_bloom:
+                tmp_path = self.path + ".bloom.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(self._bloom_filter().bits)
+                os.replace(tmp_path, self.path + ".bloom")
+            self._dirty = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load()["leads"])
+
+def open_store():
+    """The shared store, with the Bloom filter on unless LEAD_STORE_BLOOM=false."""
+    return LeadStore(use_bloom=os.getenv("LEAD_STORE_BLOOM", "true").lower() == "true")
+
+def tag_leads(leads, store, skip_known=False):
+    """
+    Yields leads tagged with their lead_id. With skip_known, leads already in
+    the store (enriched or uploaded by an earlier run) are dropped.
+    """
+    skipped = 0
+    for lead in leads:
+        if skip_known and store.find(lead):
+            skipped += 1
+            continue
+        store.assign_id(lead)
+        yield lead
+    if skipped:
+        print(f"Skipped {skipped} leads already in the lead store")
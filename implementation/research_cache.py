@@ -0,0 +1,54 @@
+import os
+import copy
+import time
+from disk_cache import DiskCache
+
+# Tavily results change slowly; 6 hours by default, ~20 MB on disk
+RESEARCH_CACHE_TTL = int(os.getenv("RESEARCH_CACHE_TTL", 6 * 3600))
+RESEARCH_CACHE_MAX_BYTES = int(float(os.getenv("RESEARCH_CACHE_MAX_MB", 20)) * 1024 * 1024)
+
+_cache = DiskCache("research", ttl=RESEARCH_CACHE_TTL, max_bytes=RESEARCH_CACHE_MAX_BYTES)
+
+def normalize_query(query):
+    """
+    Normalizes a search query so near-repeats share a cache entry:
+    case, extra whitespace and closing ?/!/. are ignored. Other symbols are
+    kept, since "C++" and "C#" are different searches from "C".
+    e.g. "What is RAG?" and "  what is rag " -> "what is rag"
+    """
+    query = " ".join(str(query or "").casefold().split())
+    return query.rstrip("?!. ")
+
+def cached_search(client, query, search_depth="basic", max_results=5, **kwargs):
+    """
+    Tavily search through the shared on-disk research cache.
+    Same signature as TavilyClient.search; the response gets a "cache" field with
+    hit/fetched_at/age_seconds so callers can see how fresh it is.
+    """
+    key = {
+        "query": normalize_query(query),
+        "search_depth": search_depth,
+        "max_results": max_results,
+        **kwargs
+    }
+
+    entry = _cache.get_entry(key)
+    if entry:
+        response = copy.deepcopy(entry["value"])
+        response["cache"] = {
+            "hit": True,
+            "fetched_at": entry["fetched_at"],
+            "age_seconds": round(time.time() - entry["fetched_at"], 1)
+        }
+        print(f"Research cache hit for '{query}' ({search_depth}, {max_results})")
+        return response
+
+    response = client.search(query=query, search_depth=search_depth, max_results=max_results, **kwargs)
+    entry = _cache.set(key, response)
+
+    response = copy.deepcopy(response)
+    response["cache"] = {"hit": False, "fetched_at": entry["fetched_at"], "age_seconds": 0}
+    return response
+
+def clear():
+    _cache.clear()
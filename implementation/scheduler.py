@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import heapq
+import glob
+import socket
+import uuid
+import hashlib
+from datetime import datetime, timedelta
+from disk_cache import atomic_write_json
+
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]  # minute hour day-of-month month day-of-week (0 = Sunday)
+
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/")
+            step = int(step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-"))
+        else:
+            start = end = int(part)
+            if step > 1:
+                end = high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Cron field {text!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+class CronExpr:
+    """
+    Standard 5-field cron expression: "minute hour day-of-month month day-of-week".
+    Supports *, lists (1,5), ranges (1-5) and steps (*/15, 0-30/10). Times are local.
+    As in cron, when both day fields are restricted a day matching either one fires.
+    """
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, FIELD_RANGES)
+        )
+        self.weekdays = {0 if d == 7 else d for d in self.weekdays}
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, dt):
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt):
+        """First matching minute strictly after `dt` (a naive local datetime)."""
+        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+class Job:
+    """A named action on a cron schedule. Runs later than `misfire_grace` seconds after the fire time are skipped."""
+
+    def __init__(self, name, cron, action, misfire_grace=300):
+        self.name = name
+        self.cron = CronExpr(cron)
+        self.action = action
+        self.misfire_grace = misfire_grace
+
+    def next_fire(self, after_ts):
+        return self.cron.next_after(datetime.fromtimestamp(after_ts)).timestamp()
+
+class LeaseLock:
+    """
+    Single-leader lock shared through a file between processes on one
+    filesystem. The holder writes its owner ID and an expiry; an expired lease
+    can be taken over, so a crashed holder never blocks jobs for longer than
+    `lease_seconds`. Taking over goes through an O_EXCL marker named after the
+    expired lease, so only one of several contenders wins it.
+    Not for sharing between Modal containers: a Volume only shows other
+    containers' writes after commit/reload, so it can't arbitrate a race.
+    """
+
+    def __init__(self, path, lease_seconds=300):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self):
+        lease = {"owner": self.owner, "expires": time.time() + self.lease_seconds}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            with os.fdopen(fd, "w") as f:
+                json.dump(lease, f)
+            return True
+        except FileExistsError:
+            pass
+
+        current = self._read()
+        if current is None:
+            # Just released, or created and not yet written; only a file left empty for a whole lease is stale
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                return False
+            if time.time() - mtime < self.lease_seconds:
+                return False
+            current = {"unreadable_since": mtime}
+        if current.get("owner") == self.owner:
+            atomic_write_json(self.path, lease)
+            return True
+        if current.get("expires", 0) > time.time():
+            return False
+        # Expired: whoever creates the marker for this exact lease takes it over
+        self._clear_markers()
+        stale = hashlib.sha256(json.dumps(current, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        try:
+            os.close(os.open(f"{self.path}.takeover-{stale}", os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            return False
+        atomic_write_json(self.path, lease)
+        return True
+
+    def _clear_markers(self):
+        # A marker only has to outlive contenders that read the same expired lease
+        for marker in glob.glob(glob.escape(self.path) + ".takeover-*"):
+            try:
+                if time.time() - os.path.getmtime(marker) > self.lease_seconds:
+                    os.remove(marker)
+            except OSError:
+                pass
+
+    def release(self):
+        current = self._read()
+        if current and current.get("owner") == self.owner:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+class Scheduler:
+    """
+    Runs jobs from a heap of next fire times. Job state (last and next run) is
+    saved after every job with an atomic write-rename, and run_pending() only
+    runs jobs while holding the lease lock, after re-reading the state. So
+    processes sharing a filesystem can all call it without double-firing.
+    Across Modal containers, make one runner authoritative instead (see
+    telegram_agent.RUN_AUTOMATIONS).
+    """
+
+    def __init__(self, jobs, state_path, lock_path=None, lease_seconds=300):
+        self.jobs = {job.name: job for job in jobs}
+        self.state_path = state_path
+        self.lock = LeaseLock(lock_path or state_path + ".lock", lease_seconds)
+        self.state = {}
+        self._heap = []
+        self._load(time.time())
+
+    def _load(self, now):
+        try:
+            with open(self.state_path, "r") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+        for name, job in self.jobs.items():
+            entry = self.state.setdefault(name, {})
+            if not entry.get("next_run"):
+                # A fire time still inside the grace window (e.g. started at 9:00 for an 8:00 job) runs now
+                entry["next_run"] = job.next_fire(now - job.misfire_grace)
+        self._heap = [(entry["next_run"], name) for name, entry in self.state.items() if name in self.jobs]
+        heapq.heapify(self._heap)
+
+    def _save(self):
+        atomic_write_json(self.state_path, self.state)
+
+    def seed(self, name, last_run):
+        """Record that a job already ran at `last_run` (used when migrating older state)."""
+        job = self.jobs[name]
+        self.state[name] = {"last_run": last_run, "next_run": job.next_fire(last_run)}
+        self._save()
+        self._load(time.time())
+
+    def next_run(self):
+        """Earliest next fire time from the in-memory heap (no disk access)."""
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now=None):
+        next_run = self.next_run()
+        return next_run is not None and next_run <= (now or time.time())
+
+    def run_pending(self, now=None):
+        """Runs every due job once. Returns the names of jobs that ran."""
+        now = now or time.time()
+        if not self.due(now) or not self.lock.acquire():
+            return []
+        ran = []
+        try:
+            # Another process may have run (or rescheduled) jobs since our last read
+            self._load(now)
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, name = heapq.heappop(self._heap)
+                job = self.jobs[name]
+                entry = self.state[name]
+                if now - fire_at > job.misfire_grace:
+                    print(f"Skipping missed run of {name} (due {datetime.fromtimestamp(fire_at):%Y-%m-%d %H:%M})")
+                else:
+                    print(f"Running scheduled job: {name}")
+                    try:
+                        job.action()
+                        entry["last_status"] = "success"
+                    except Exception as e:
+                        print(f"Scheduled job {name} failed: {e}")
+                        entry["last_status"] = f"error: {e}"
+                    entry["last_run"] = now
+                    ran.append(name)
+                entry["next_run"] = job.next_fire(now)
+                self._save()
+                heapq.heappush(self._heap, (entry["next_run"], name))
+        finally:
+            self.lock.release()
+        return ran
@@ -1,35 +1,36 @@
 import os
 import json
+import time
 import argparse
 import sys
 from apify_client import ApifyClient
 from dotenv import load_dotenv
+import lead_io
+import lead_store
 
 # Load environment variables
 load_dotenv()
 
-def scrape_leads(query, location, limit=10, size=None, industry=None, email_status=None):
-    # CONSTANTS
-    ACTOR_ID = "IoSHqwTR9YGhzccez"  # The specific actor ID provided
-    # HARD LIMIT ENFORCEMENT
-    SAFE_LIMIT = 10 # HARDCODED STRICT MAX
-    
-    if limit > 10:
-        print("WARNING: Requested limit > 10. Forcing limit to 10.")
-        limit = 10
-        
-    # Double check safe limit
-    if SAFE_LIMIT > 10:
-        raise ValueError("CRITICAL SAFETY ERROR: LIMIT > 10")
-    
+# CONSTANTS
+ACTOR_ID = "IoSHqwTR9YGhzccez"  # The specific actor ID provided
+# HARD LIMIT ENFORCEMENT
+SAFE_LIMIT = 10 # HARDCODED STRICT MAX
+
+TERMINAL_STATUSES = {"SUCCEEDED", "FAILED", "ABORTED", "TIMED-OUT"}
+POLL_INTERVAL = float(os.getenv("APIFY_POLL_INTERVAL", 2))
+
+def get_client():
+    """ApifyClient, or the local stand-in actor when APIFY_FAKE_ACTOR=true."""
+    if os.getenv("APIFY_FAKE_ACTOR", "false").lower() == "true":
+        import fake_apify
+        return fake_apify.FakeApifyClient()
+
     api_token = os.getenv("APIFY_API_TOKEN")
     if not api_token:
         raise ValueError("Error: APIFY_API_TOKEN not found in .env")
+    return ApifyClient(api_token)
 
-    print(f"Initializing ApifyClient with strict limit: {SAFE_LIMIT}...")
-    print(f"Filters: Query='{query}', Location='{location}', Size='{size}', Industry='{industry}', EmailStatus='{email_status}'")
-    client = ApifyClient(api_token)
-
+def build_run_input(query, location, size=None, industry=None, email_status=None):
     # Actor input configuration (MATCHING USER SCHEMA STRICTLY)
     run_input = {
         "fetch_count": SAFE_LIMIT,
@@ -44,18 +45,97 @@ def scrape_leads(query, location, limit=10, size=None, industry=None, email_stat
         run_input["company_industry"] = [industry.lower()]
     if email_status:
         run_input["email_status"] = [email_status.lower()]
-    
-    try:
-        # Start the actor and wait for it to finish
-        print(f"Starting actor {ACTOR_ID} run (fetch_count={SAFE_LIMIT})...")
-        print(f"Input payload: {json.dumps(run_input, indent=2)}")
-        run = client.actor(ACTOR_ID).call(run_input=run_input)
-        
-        # Fetch results
-        dataset_id = run["defaultDatasetId"]
-        print(f"Run finished. Fetching results from dataset {dataset_id}...")
+    return run_input
+
+def start_scrape(query, location, limit=10, size=None, industry=None, email_status=None, client=None):
+    """
+    Starts the actor run without waiting for it and returns a run handle:
+    {"run_id", "dataset_id", "status", "offset", "limit"}.
+    Pass the handle (or just run_id + offset) to poll_run / iter_run_items.
+    """
+    if limit > 10:
+        print("WARNING: Requested limit > 10. Forcing limit to 10.")
+        limit = 10
         
-        items = list(client.dataset(dataset_id).iterate_items(limit=SAFE_LIMIT))
+    # Double check safe limit
+    if SAFE_LIMIT > 10:
+        raise ValueError("CRITICAL SAFETY ERROR: LIMIT > 10")
+
+    client = client or get_client()
+    run_input = build_run_input(query, location, size, industry, email_status)
+
+    print(f"Filters: Query='{query}', Location='{location}', Size='{size}', Industry='{industry}', EmailStatus='{email_status}'")
+    print(f"Starting actor {ACTOR_ID} run (fetch_count={SAFE_LIMIT})...")
+    print(f"Input payload: {json.dumps(run_input, indent=2)}")
+    run = client.actor(ACTOR_ID).start(run_input=run_input)
+
+    return {
+        "run_id": run["id"],
+        "dataset_id": run["defaultDatasetId"],
+        "status": run.get("status", "READY"),
+        "offset": 0,
+        "limit": limit
+    }
+
+def poll_run(run_id, offset=0, limit=SAFE_LIMIT, client=None):
+    """
+    One poll of a run: current status plus dataset items from `offset` on.
+    Returns {"status", "items", "next_offset", "done"}. Stateless, so a caller
+    that remembers next_offset can resume after a restart.
+    """
+    client = client or get_client()
+    run = client.run(run_id).get()
+    if run is None:
+        raise ValueError(f"Apify run {run_id} not found")
+
+    status = run.get("status")
+    remaining = max(0, min(limit, SAFE_LIMIT) - offset)
+    items = []
+    if remaining:
+        page = client.dataset(run["defaultDatasetId"]).list_items(offset=offset, limit=remaining)
+        items = list(page.items)
+
+    next_offset = offset + len(items)
+    # Only finished once the run is terminal and everything it wrote has been read
+    done = next_offset >= min(limit, SAFE_LIMIT) or (status in TERMINAL_STATUSES and not items)
+    return {"status": status, "items": items, "next_offset": next_offset, "done": done}
+
+def iter_run_pages(handle, client=None, poll_interval=None, timeout=600):
+    """
+    Yields lists of new dataset items as the run produces them.
+    handle["offset"] and handle["status"] are updated in place after each page.
+    """
+    client = client or get_client()
+    poll_interval = POLL_INTERVAL if poll_interval is None else poll_interval
+    deadline = time.time() + timeout
+
+    while True:
+        result = poll_run(handle["run_id"], handle.get("offset", 0), handle.get("limit", SAFE_LIMIT), client=client)
+        handle["offset"] = result["next_offset"]
+        handle["status"] = result["status"]
+        if result["items"]:
+            yield result["items"]
+        if result["done"]:
+            if result["status"] in TERMINAL_STATUSES - {"SUCCEEDED"} and not handle["offset"]:
+                raise RuntimeError(f"Apify run {handle['run_id']} ended with status {result['status']}")
+            return
+        if time.time() > deadline:
+            raise TimeoutError(f"Apify run {handle['run_id']} still {result['status']} after {timeout}s")
+        time.sleep(poll_interval)
+
+def iter_run_items(handle, client=None, poll_interval=None, timeout=600):
+    """Like iter_run_pages, one item at a time."""
+    for page in iter_run_pages(handle, client=client, poll_interval=poll_interval, timeout=timeout):
+        yield from page
+
+def scrape_leads(query, location, limit=10, size=None, industry=None, email_status=None):
+    """Blocking scrape: starts the run and collects items until it finishes."""
+    print(f"Initializing ApifyClient with strict limit: {SAFE_LIMIT}...")
+    client = get_client()
+
+    try:
+        handle = start_scrape(query, location, limit, size, industry, email_status, client=client)
+        items = list(iter_run_items(handle, client=client))
         
         # Enforce limit post-fetch just in case
         items = items[:SAFE_LIMIT]
@@ -66,7 +146,6 @@ def scrape_leads(query, location, limit=10, size=None, industry=None, email_stat
         raise e
 
 def main():
-    print("DEBUG: Starting main function...")
     parser = argparse.ArgumentParser(description="Scrape leads using Apify.")
     parser.add_argument("--limit", type=int, default=10, help="Number of leads to scrape (MAX 10 enforced).")
     parser.add_argument("--query", type=str, default="CEO", help="Search query (e.g. 'CEO', 'Founder').")
@@ -74,30 +153,57 @@ def main():
     parser.add_argument("--size", type=str, default=None, help="Company size (e.g. '51-200').")
     parser.add_argument("--industry", type=str, default=None, help="Industry filter.")
     parser.add_argument("--email-status", type=str, default=None, help="Email status (e.g. 'validated').")
+    parser.add_argument("--resume-run", type=str, default=None, help="Resume reading an existing run ID instead of starting a new one.")
+    parser.add_argument("--offset", type=int, default=0, help="Dataset offset to resume from (with --resume-run).")
+    parser.add_argument("--output", type=str, default=".tmp/leads_raw.json", help="JSON file, JSONL file, or '-' to stream JSONL to stdout.")
+    parser.add_argument("--skip-known", action="store_true", help="Drop leads already in the lead store from earlier runs.")
     args = parser.parse_args()
 
+    writer = lead_io.LeadWriter(args.output) if lead_io.is_stream(args.output) else None
     try:
-        items = scrape_leads(
-            query=args.query,
-            location=args.location,
-            limit=args.limit,
-            size=args.size,
-            industry=args.industry,
-            email_status=args.email_status
-        )
-        
-        # Save to .tmp/leads_raw.json
-        output_path = ".tmp/leads_raw.json"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        with open(output_path, "w") as f:
-            json.dump(items, f, indent=2)
+        with lead_io.logs_to_stderr(args.output == "-"):
+            store = lead_store.open_store()
+            if writer:
+                # Streaming: each lead is written as soon as the actor publishes it
+                client = get_client()
+                if args.resume_run:
+                    handle = {"run_id": args.resume_run, "offset": args.offset, "limit": min(args.limit, SAFE_LIMIT)}
+                else:
+                    handle = start_scrape(args.query, args.location, args.limit, args.size, args.industry, args.email_status, client=client)
+                with writer:
+                    for item in lead_store.tag_leads(iter_run_items(handle, client=client), store, args.skip_known):
+                        writer.write(item)
+                print(f"Success: Streamed {writer.count} leads to {args.output} (run {handle['run_id']})")
+                return
+
+            if args.resume_run:
+                client = get_client()
+                handle = {"run_id": args.resume_run, "offset": args.offset, "limit": min(args.limit, SAFE_LIMIT)}
+                items = list(iter_run_items(handle, client=client))
+            else:
+                items = scrape_leads(
+                    query=args.query,
+                    location=args.location,
+                    limit=args.limit,
+                    size=args.size,
+                    industry=args.industry,
+                    email_status=args.email_status
+                )
+            
+            items = list(lead_store.tag_leads(items, store, args.skip_known))
+
+            # Save to .tmp/leads_raw.json
+            output_path = args.output
+            os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
             
-        print(f"Success: Saved {len(items)} leads to {output_path}")
+            with open(output_path, "w") as f:
+                json.dump(items, f, indent=2)
+                
+            print(f"Success: Saved {len(items)} leads to {output_path}")
 
     except Exception as e:
+        print(f"Error during scraping: {str(e)}", file=sys.stderr)
         sys.exit(1)
 
 if __name__ == "__main__":
-    print("DEBUG: Condition __name__ == '__main__' met.")
     main()
@@ -1,8 +1,8 @@
 import os
 import io
 import re
-import requests
 import gspread
+import telegram_client
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
@@ -180,23 +180,16 @@ def download_and_send(file_id, chat_id):
         print(f"Downloaded file from Drive (ID: {file_id})")
         
         # Send to Telegram
-        bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
-        if not bot_token:
+        if not os.getenv("TELEGRAM_BOT_TOKEN"):
             return "No Telegram Bot Token configured"
         
-        url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
+        result = telegram_client.get_client().send_photo(chat_id, file_content)
         
-        file_content.seek(0)  # Reset buffer position
-        files = {'photo': ('image.png', file_content, 'image/png')}
-        data = {'chat_id': chat_id}
-        
-        response = requests.post(url, files=files, data=data)
-        
-        if response.status_code == 200:
+        if result.get("ok"):
             print(f"Image sent to Telegram chat {chat_id}")
             return "sent"
         else:
-            error_msg = f"Telegram API error: {response.status_code}"
+            error_msg = f"Telegram API error: {result.get('error_code')} {result.get('description')}"
             print(error_msg)
             return error_msg
             
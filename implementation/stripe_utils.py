@@ -1,8 +1,13 @@
 import os
+import threading
 import stripe
+import entitlements
+from ttl_cache import TTLCache
 
 stripe_api_key = os.getenv("STRIPE_SECRET_KEY")
 stripe.api_key = stripe_api_key
+# Signing secret of the webhook endpoint (whsec_...), from the Stripe dashboard or `stripe listen`
+WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
 
 # Hardcoded Price ID for "Premium Plan" - ideally this should be in env or config
 # Using the product ID you found: prod_TqhJhf7EuIDrfQ
@@ -12,9 +17,13 @@ stripe.api_key = stripe_api_key
 
 PREMIUM_PRODUCT_ID = "prod_TqhJhf7EuIDrfQ" 
 
-def get_premium_price_id():
-    if not stripe.api_key:
-        return None
+# Price and customer IDs rarely change; webhook events invalidate them early when they do
+PRICE_CACHE_TTL = int(os.getenv("STRIPE_PRICE_CACHE_TTL", 3600))
+CUSTOMER_CACHE_TTL = int(os.getenv("STRIPE_CUSTOMER_CACHE_TTL", 86400))
+_price_cache = TTLCache(ttl=PRICE_CACHE_TTL)
+_customer_cache = TTLCache(ttl=CUSTOMER_CACHE_TTL, max_entries=10000)
+
+def _fetch_premium_price_id():
     try:
         prices = stripe.Price.list(product=PREMIUM_PRODUCT_ID, active=True, limit=1)
         if prices.data:
@@ -23,36 +32,103 @@ def get_premium_price_id():
         print(f"Error fetching price: {e}")
     return None
 
+def get_premium_price_id():
+    if not stripe.api_key:
+        return None
+    return _price_cache.get_or_load(PREMIUM_PRODUCT_ID, _fetch_premium_price_id, cacheable=lambda price_id: price_id is not None)
+
+def get_or_create_customer_id(email):
+    """
+    Stripe customer ID for an email: from the cache, then the entitlement store,
+    then Customer.list, creating the customer if none exists.
+    Concurrent checkouts for one email share a single lookup, so only one customer is created.
+    """
+    def load():
+        customer_id = get_store().customer_id_for(email)
+        if customer_id:
+            return customer_id
+        customers = stripe.Customer.list(email=email, limit=1)
+        if customers.data:
+            return customers.data[0].id
+        return stripe.Customer.create(email=email).id
+
+    return _customer_cache.get_or_load(entitlements.normalize_email(email), load)
+
+def invalidate_caches(event):
+    """Drops cached IDs that a Stripe event may have made stale."""
+    event_type = event["type"]
+    if event_type.startswith(("product.", "price.")):
+        _price_cache.invalidate()
+    elif event_type in ("customer.updated", "customer.deleted"):
+        obj = event["data"]["object"]
+        previous = event["data"].get("previous_attributes") or {}
+        for email in (obj.get("email"), previous.get("email")):
+            if email:
+                _customer_cache.invalidate(entitlements.normalize_email(email))
+
+def get_cache_stats():
+    return {"price": _price_cache.stats(), "customer": _customer_cache.stats()}
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = entitlements.EntitlementStore()
+        return _store
+
+def maybe_reconcile(store=None):
+    """
+    Runs the reconciliation sweep when it is due. The very first sweep blocks so
+    an empty table isn't read as "nobody is subscribed"; later ones run in the background.
+    """
+    store = store or get_store()
+    if not stripe.api_key or not store.reconcile_due():
+        return
+    if store.last_reconciled() is None:
+        try:
+            store.reconcile(stripe)
+        except Exception as e:
+            print(f"Stripe error reconciling entitlements: {e}")
+    elif not store._reconcile_lock.locked():
+        threading.Thread(target=_reconcile_quietly, args=(store,), daemon=True).start()
+
+def _reconcile_quietly(store):
+    try:
+        store.reconcile(stripe)
+    except Exception as e:
+        print(f"Stripe error reconciling entitlements: {e}")
+
+def handle_webhook(payload, sig_header):
+    """
+    Verifies a Stripe webhook delivery and applies it to the entitlement store.
+    Raises ValueError for a missing secret, a bad payload or a bad signature.
+    """
+    if not WEBHOOK_SECRET:
+        raise ValueError("STRIPE_WEBHOOK_SECRET is not set")
+    try:
+        event = stripe.Webhook.construct_event(payload, sig_header, WEBHOOK_SECRET)
+    except stripe.SignatureVerificationError as e:
+        raise ValueError(f"Invalid signature: {e}")
+    event = event.to_dict() if hasattr(event, "to_dict") else event
+    applied = get_store().apply_event(event)
+    invalidate_caches(event)
+    return {"status": "success", "type": event["type"], "duplicate": not applied}
+
 def check_subscription(email):
     """
     Checks if a user with the given email has an active subscription to the Premium Plan.
+    Answered from the local entitlement store kept current by the Stripe webhook.
     Returns: bool
     """
-    if not stripe.api_key:
-        print("Stripe API key missing. Mocking subscription as False.")
-        return False
-
     try:
-        # 1. Find customer by email
-        customers = stripe.Customer.list(email=email, limit=1)
-        if not customers.data:
-            return False
-        
-        customer = customers.data[0]
-        
-        # 2. List active subscriptions for this customer
-        subscriptions = stripe.Subscription.list(customer=customer.id, status='active')
-        
-        # 3. Check if any subscription is for our premium product
-        for sub in subscriptions.data:
-            for item in sub['items'].data:
-                if item.price.product == PREMIUM_PRODUCT_ID:
-                    return True
-                    
-        return False
-        
+        store = get_store()
+        maybe_reconcile(store)
+        return store.is_entitled(email, PREMIUM_PRODUCT_ID)
     except Exception as e:
-        print(f"Stripe error checking subscription: {e}")
+        print(f"Error checking subscription: {e}")
         return False
 
 def create_checkout_session(email, success_url, cancel_url):
@@ -70,13 +146,8 @@ def create_checkout_session(email, success_url, cancel_url):
         return None
 
     try:
-        # Create or get customer
-        customers = stripe.Customer.list(email=email, limit=1)
-        if customers.data:
-            customer_id = customers.data[0].id
-        else:
-            customer = stripe.Customer.create(email=email)
-            customer_id = customer.id
+        # Create or get customer (cached after the first checkout)
+        customer_id = get_or_create_customer_id(email)
 
         session = stripe.checkout.Session.create(
             customer=customer_id,
@@ -4,6 +4,7 @@ import requests
 import json
 import sys
 import traceback
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -12,23 +13,36 @@ load_dotenv()
 # Add implementation folder to path
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import io
-import google_calendar
-import google_mail
-import google_contacts
-import weather_agent
-import web_agent
-import image_agent
-import chat_agent
-import search_image_agent
-import blog_agent
-import faceless_video_agent
-import stripe_utils
-import scrape_apify
-import clickup_agent
+from tool_registry import lazy_import
+import scheduler
+import telegram_client
+import voice_pipeline
+from disk_cache import atomic_write_json
+
+# Agents (and their SDKs) are imported the first time a command needs them
+google_calendar = lazy_import("google_calendar")
+google_mail = lazy_import("google_mail")
+google_contacts = lazy_import("google_contacts")
+weather_agent = lazy_import("weather_agent")
+web_agent = lazy_import("web_agent")
+image_agent = lazy_import("image_agent")
+chat_agent = lazy_import("chat_agent")
+search_image_agent = lazy_import("search_image_agent")
+blog_agent = lazy_import("blog_agent")
+faceless_video_agent = lazy_import("faceless_video_agent")
+stripe_utils = lazy_import("stripe_utils")
+scrape_apify = lazy_import("scrape_apify")
+clickup_agent = lazy_import("clickup_agent")
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 ALLOWED_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+# Whether the polling loop runs the scheduled jobs. Off under Modal, where the
+# cron-triggered Automations container is the only runner (containers don't see
+# each other's lease or job state until a volume commit/reload).
+RUN_AUTOMATIONS = os.getenv("BOT_RUN_AUTOMATIONS", "true").lower() == "true"
 API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}"
+# Shared with the other agents: one connection pool, one set of rate limits
+telegram = telegram_client.get_client()
 MEM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../memory")
 if not os.path.exists(MEM_DIR):
     os.makedirs(MEM_DIR)
@@ -80,48 +94,171 @@ def log_interaction(chat_id, user_text, bot_response):
     except Exception as e:
         print(f"Error logging interaction: {e}")
 
-def get_updates(offset=None):
-    url = f"{API_URL}/getUpdates"
-    params = {"timeout": 100, "offset": offset}
-    try:
-        response = requests.get(url, params=params)
-        return response.json()
-    except Exception as e:
-        print(f"Error getting updates: {e}")
+def get_updates(offset=None, timeout=100):
+    result = telegram.get_updates(offset, timeout=timeout)
+    if not result.get("ok"):
+        print(f"Error getting updates: {result.get('description')}")
         return None
+    return result
+
+def send_message(chat_id, text, parse_mode="Markdown"):
+    """Send a message. Returns the new message_id, or None on failure."""
+    result = telegram.send_message(chat_id, text, parse_mode=parse_mode)
+    if result.get("ok"):
+        return result["result"]["message_id"]
+    print(f"Error sending message: {result.get('description')}")
+    return None
+
+def edit_message(chat_id, message_id, text, parse_mode="Markdown"):
+    """Replace the text of a message sent earlier. Returns True on success."""
+    result = telegram.edit_message_text(chat_id, message_id, text, parse_mode=parse_mode)
+    if result.get("ok") or "message is not modified" in result.get("description", ""):
+        return True
+    print(f"Error editing message: {result.get('description')}")
+    return False
+
+# Telegram allows roughly one message (or edit) per second per chat
+STREAM_EDIT_INTERVAL = 1.5
+STREAM_MIN_NEW_CHARS = 40
+TELEGRAM_MAX_LEN = 4096
+
+def replace_message(chat_id, message_id, text):
+    """
+    Edits message `message_id` into `text`, or sends it as a new message if
+    there is none. Overflow past Telegram's limit goes out as new messages.
+    """
+    if not message_id:
+        send_message(chat_id, text)
+        return
+    first, rest = text[:TELEGRAM_MAX_LEN], text[TELEGRAM_MAX_LEN:]
+    # Results can contain Markdown that doesn't parse; fall back to plain text, then to a new message
+    if not edit_message(chat_id, message_id, first) and not edit_message(chat_id, message_id, first, parse_mode=None):
+        send_message(chat_id, first)
+    for i in range(0, len(rest), TELEGRAM_MAX_LEN):
+        send_message(chat_id, rest[i:i + TELEGRAM_MAX_LEN])
+
+class StreamingReply:
+    """
+    Shows an LLM reply while it is being generated: the first tokens are sent
+    as a new message, which is then edited in place at most every
+    STREAM_EDIT_INTERVAL seconds. finish() writes the final (Markdown) text.
+    """
 
-def send_message(chat_id, text):
-    url = f"{API_URL}/sendMessage"
-    payload = {"chat_id": chat_id, "text": text, "parse_mode": "Markdown"}
-    try:
-        requests.post(url, json=payload)
-    except Exception as e:
-        print(f"Error sending message: {e}")
+    def __init__(self, chat_id):
+        self.chat_id = chat_id
+        self.message_id = None
+        self.started = False
+        self.last_edit = 0
+        self.shown = ""
+        self.text = ""
+
+    def update(self, text):
+        self.text = text
+        if not text.strip():
+            return
+        now = time.time()
+        if not self.started:
+            self.started = True
+            # Partial Markdown often doesn't parse, so previews go out as plain text
+            self.message_id = send_message(self.chat_id, self._preview(text), parse_mode=None)
+            self.last_edit = now
+            self.shown = text
+        elif self.message_id and now - self.last_edit >= STREAM_EDIT_INTERVAL and len(text) - len(self.shown) >= STREAM_MIN_NEW_CHARS:
+            edit_message(self.chat_id, self.message_id, self._preview(text), parse_mode=None)
+            self.last_edit = now
+            self.shown = text
+
+    def finish(self, text):
+        replace_message(self.chat_id, self.message_id, text)
+
+    def _preview(self, text):
+        # Keep the tail visible while the reply is longer than one message
+        if len(text) > TELEGRAM_MAX_LEN - 2:
+            text = "…" + text[-(TELEGRAM_MAX_LEN - 4):]
+        return text + " ▌"
+
+class ProgressMessage:
+    """
+    One status message for a long-running command instead of a new message per
+    step: start() sends it, stage() edits it in place as the workflow moves on
+    (at most one edit per STREAM_EDIT_INTERVAL; a stage that arrives too soon is
+    shown by a timer once the interval is up), and finish() replaces it with the result.
+    """
 
-def download_telegram_file(file_id):
+    def __init__(self, chat_id, title):
+        self.chat_id = chat_id
+        self.title = title
+        self.message_id = None
+        self.stages = []
+        self.last_edit = 0
+        self.dirty = False
+        self.finished = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.message_id = send_message(self.chat_id, self.title)
+        self.last_edit = time.time()
+        return self
+
+    def stage(self, text):
+        """Marks the current stage done and shows `text` as the one in progress."""
+        with self._lock:
+            self.stages.append(text)
+            self.dirty = True
+            if not self.message_id or self.finished:
+                return
+            wait = STREAM_EDIT_INTERVAL - (time.time() - self.last_edit)
+            if wait <= 0:
+                self._edit()
+            elif self._timer is None:
+                # Trailing edit, so a stage isn't hidden until the next one arrives
+                self._timer = threading.Timer(wait, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _render(self):
+        lines = [self.title, ""]
+        lines += [f"✅ {stage}" for stage in self.stages[:-1]]
+        lines.append(f"⏳ {self.stages[-1]}")
+        return "\n".join(lines)
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            if not self.finished:
+                self._edit()
+
+    def _edit(self):
+        if self.dirty and self.stages:
+            edit_message(self.chat_id, self.message_id, self._render())
+            self.last_edit = time.time()
+            self.dirty = False
+
+    def finish(self, text):
+        """Replaces the progress message with the result."""
+        with self._lock:
+            self.finished = True
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        replace_message(self.chat_id, self.message_id, text)
+
+def download_telegram_file(file_id, max_bytes=None):
     """Get file path and download the file from Telegram."""
     try:
-        # Get file path
-        url = f"{API_URL}/getFile"
-        response = requests.get(url, params={"file_id": file_id})
-        file_info = response.json()
-        
-        if not file_info.get("ok"):
-            print(f"Error getting file info: {file_info}")
-            return None
-            
-        file_path = file_info["result"]["file_path"]
-        download_url = f"https://api.telegram.org/file/bot{BOT_TOKEN}/{file_path}"
-        
-        # Download file
-        response = requests.get(download_url)
-        return response.content
+        return telegram.download_file(file_id, max_bytes=max_bytes)
     except Exception as e:
         print(f"Error downloading file: {e}")
         return None
 
 def transcribe_voice(voice_data):
-    """Transcribe voice message using OpenAI Whisper."""
+    """Transcribe voice message with the configured backend (local faster-whisper or OpenAI Whisper)."""
+    if voice_pipeline.TRANSCRIBE_BACKEND == "local":
+        text = voice_pipeline.transcribe_local(voice_data)
+        if text:
+            return text
+
     client = chat_agent.get_openai_client()
     if not client:
         return None
@@ -140,6 +277,22 @@ def transcribe_voice(voice_data):
         print(f"Error transcribing voice: {e}")
         return None
 
+_voice_pipeline = None
+_voice_pipeline_lock = threading.Lock()
+
+def get_voice_pipeline():
+    """The shared voice pipeline. Stages look up this module's functions per call, so patches in tests apply."""
+    global _voice_pipeline
+    with _voice_pipeline_lock:
+        if _voice_pipeline is None:
+            _voice_pipeline = voice_pipeline.VoicePipeline(
+                download=lambda file_id: download_telegram_file(file_id, max_bytes=voice_pipeline.VOICE_MAX_BYTES),
+                transcribe=lambda voice_data: transcribe_voice(voice_data),
+                handle=lambda text, chat_id: handle_command(text, chat_id),
+                progress=lambda chat_id, title: ProgressMessage(chat_id, title)
+            )
+        return _voice_pipeline
+
 def parse_intent(text):
     """
     Use OpenAI to categorize the user's intent and extract parameters.
@@ -379,6 +532,8 @@ def save_followups(items):
         json.dump(items, f, indent=2)
 
 STATE_FILE = os.path.join(MEM_DIR, "automation_state.json")
+SCHEDULER_STATE_FILE = os.path.join(MEM_DIR, "scheduler_state.json")
+ALERT_QUERY = "is:unread (security OR alert OR bank OR verify OR unauthorized OR login OR finance)"
 
 def load_state():
     if os.path.exists(STATE_FILE):
@@ -386,52 +541,45 @@ def load_state():
             return json.load(f)
     return {}
 
-def save_state(state):
-    with open(STATE_FILE, 'w') as f:
-        json.dump(state, f, indent=2)
+def scan_alerts(chat_id):
+    """Security/finance alerts monitor: forwards unread alert-like emails."""
+    print("Checking for security/finance alerts...")
+    service = google_mail.get_service()
+    # Search for security or finance alerts unread using keywords
+    res = google_mail.list_emails(service, max_results=5, query=ALERT_QUERY)
+    if res['status'] == 'success' and res['messages']:
+        for m in res['messages']:
+            alert_msg = f"🔔 *URGENT ALERT*\nFrom: {m['from']}\nSub: {m['subject']}\n\nCheck /urgent for details."
+            send_message(chat_id, alert_msg)
+
+def build_scheduler(chat_id):
+    jobs = [
+        # Morning digest at 8 AM and evening log at 8 PM; a late start still runs them within 2 hours
+        scheduler.Job("morning_digest", "0 8 * * *", lambda: handle_command("/digest", chat_id), misfire_grace=2 * 3600),
+        scheduler.Job("evening_log", "0 20 * * *", lambda: handle_command("daily_log", chat_id), misfire_grace=2 * 3600),
+        scheduler.Job("alert_scan", "*/15 * * * *", lambda: scan_alerts(chat_id), misfire_grace=15 * 60),
+    ]
+    sched = scheduler.Scheduler(jobs, SCHEDULER_STATE_FILE, lease_seconds=600)
+
+    # Carry over today's progress from the old automation_state.json
+    legacy = load_state()
+    if legacy.get("last_date") == datetime.now().strftime("%Y-%m-%d") and not os.path.exists(SCHEDULER_STATE_FILE):
+        if legacy.get("morning_done"):
+            sched.seed("morning_digest", time.time())
+        if legacy.get("evening_done"):
+            sched.seed("evening_log", time.time())
+    return sched
+
+_schedulers = {}
+
+def get_scheduler(chat_id):
+    if chat_id not in _schedulers:
+        _schedulers[chat_id] = build_scheduler(chat_id)
+    return _schedulers[chat_id]
 
 def check_automations(chat_id):
-    """Run scheduled jobs and monitor for urgent alerts."""
-    state = load_state()
-    today = datetime.now().strftime("%Y-%m-%d")
-    hour = datetime.now().hour
-    
-    # Initialize today's state
-    if state.get("last_date") != today:
-        state = {"last_date": today, "morning_done": False, "evening_done": False, "last_alert_check": 0}
-        save_state(state)
-
-    # 1. Morning Digest (Automatic at 8-9 AM)
-    if not state.get("morning_done") and 8 <= hour < 10:
-        print("Triggering automatic morning digest...")
-        handle_command("/digest", chat_id)
-        state["morning_done"] = True
-        save_state(state)
-
-    # 2. Evening Log (Automatic at 8-9 PM)
-    if not state.get("evening_done") and 20 <= hour < 22:
-        print("Triggering automatic evening log...")
-        handle_command("daily_log", chat_id)
-        state["evening_done"] = True
-        save_state(state)
-
-    # 3. Security/Finance Alerts Monitor (Every 15 mins)
-    now_ts = time.time()
-    if now_ts - state.get("last_alert_check", 0) > 900: # 15 mins
-        print("Checking for security/finance alerts...")
-        try:
-            service = google_mail.get_service()
-            # Search for security or finance alerts unread using keywords
-            query = "is:unread (security OR alert OR bank OR verify OR unauthorized OR login OR finance)"
-            res = google_mail.list_emails(service, max_results=5, query=query)
-            if res['status'] == 'success' and res['messages']:
-                for m in res['messages']:
-                    alert_msg = f"🔔 *URGENT ALERT*\nFrom: {m['from']}\nSub: {m['subject']}\n\nCheck /urgent for details."
-                    send_message(chat_id, alert_msg)
-            state["last_alert_check"] = now_ts
-            save_state(state)
-        except Exception as e:
-            print(f"Alert monitor error: {e}")
+    """Run scheduled jobs (digest, evening log, alert scan) that are due."""
+    return get_scheduler(chat_id).run_pending()
 
 
 def reply_and_log(chat_id, text, user_input=None):
@@ -675,13 +823,16 @@ def handle_command(text, chat_id):
             if not query:
                 send_message(chat_id, "❌ Please specify a job title or keyword. Example: 'Find leads for CEO in New York'")
             else:
-                send_message(chat_id, f"🔍 Scraping leads for '{query}' in '{location}' (Limit: {limit})...\nThis may take up to a minute.")
+                progress = ProgressMessage(chat_id, f"🔍 Scraping leads for '{query}' in '{location}' (Limit: {limit})...\nLeads will be sent as they come in.").start()
                 try:
-                    leads = scrape_apify.scrape_leads(query, location, limit=limit)
-                    if not leads:
-                        send_message(chat_id, "❌ No leads found.")
-                    else:
-                        msg = f"💼 *Leads Found ({len(leads)})*:\n\n"
+                    # Start the actor run and forward each new page of results as it lands
+                    handle = scrape_apify.start_scrape(query, location, limit=limit)
+                    progress.stage("Scraper started, waiting for the first leads")
+                    found = 0
+                    for leads in scrape_apify.iter_run_pages(handle):
+                        found += len(leads)
+                        progress.stage(f"{found} of {limit} leads found")
+                        msg = f"💼 *Leads Found ({found})*:\n\n"
                         for lead in leads:
                             name = (lead.get('firstName') or '') + ' ' + (lead.get('lastName') or '')
                             company = lead.get('companyName', 'N/A')
@@ -696,8 +847,12 @@ def handle_command(text, chat_id):
                                 msg += f"  🔗 [LinkedIn](https://www.linkedin.com/in/{linkedin})\n"
                             msg += "\n"
                         send_message(chat_id, msg)
+                    if not found:
+                        progress.finish("❌ No leads found.")
+                    else:
+                        progress.finish(f"✅ Found {found} leads for '{query}' in '{location}'.")
                 except Exception as e:
-                    send_message(chat_id, f"❌ Scraping error: {str(e)}")
+                    progress.finish(f"❌ Scraping error: {str(e)}")
 
         elif intent == "contact_search":
             query = params.get("query")
@@ -737,33 +892,33 @@ def handle_command(text, chat_id):
             if not query:
                 send_message(chat_id, "❌ Please specify what to search for. Example: 'Search for AI news'")
             else:
-                send_message(chat_id, f"🔍 Searching web for '{query}'...")
+                progress = ProgressMessage(chat_id, f"🔍 Searching web for '{query}'...").start()
                 result = web_agent.search_web(query)
                 if "error" not in result:
                     msg = f"🌐 *Search Results*:\n\n{result.get('ai_summary', 'No summary available.')}"
-                    send_message(chat_id, msg)
+                    progress.finish(msg)
                 else:
-                    send_message(chat_id, f"❌ Search error: {result['error']}")
+                    progress.finish(f"❌ Search error: {result['error']}")
 
         elif intent == "image_gen":
             prompt = params.get("prompt")
             if not prompt:
                 send_message(chat_id, "❌ Please describe the image you want to generate. Example: 'Generate an image of a sunset'")
             else:
-                send_message(chat_id, f"🎨 Generating image based on: '{prompt}'...")
+                progress = ProgressMessage(chat_id, f"🎨 Generating image based on: '{prompt}'...").start()
                 result = image_agent.generate_image_workflow(params.get("title", "Telegram Image"), prompt, chat_id)
                 if result['status'] == 'success':
                     # image_agent sends the link/image itself if chat_id is provided
-                    pass
+                    progress.finish(f"✅ Image generated for: '{prompt}'")
                 else:
-                    send_message(chat_id, f"❌ Image error: {result['message']}")
+                    progress.finish(f"❌ Image error: {result['message']}")
 
         elif intent == "image_search":
             query = params.get("query")
             if not query:
                 send_message(chat_id, "❌ Please specify what image to search for. Example: 'find image of sunset'")
             else:
-                send_message(chat_id, f"🔍 Searching for image: '{query}'...")
+                progress = ProgressMessage(chat_id, f"🔍 Searching for image: '{query}'...").start()
                 result = search_image_agent.search_image(query, intent='search', chat_id=None)
                 
                 if result.get('status') == 'success':
@@ -771,11 +926,11 @@ def handle_command(text, chat_id):
                         msg = f"🖼 *Image Found!*\n\n"
                         msg += f"*Name*: {result.get('image_name')}\n"
                         msg += f"*Drive Link*: [View on Google Drive]({result.get('image_link')})"
-                        send_message(chat_id, msg)
+                        progress.finish(msg)
                     else:
-                        send_message(chat_id, f"❌ No image found for '{query}'")
+                        progress.finish(f"❌ No image found for '{query}'")
                 else:
-                    send_message(chat_id, f"❌ Image search error: {result.get('message', 'Unknown error')}")
+                    progress.finish(f"❌ Image search error: {result.get('message', 'Unknown error')}")
 
         elif intent == "blog_gen":
             topic = params.get("topic")
@@ -783,27 +938,27 @@ def handle_command(text, chat_id):
             if not topic:
                 send_message(chat_id, "❌ Please specify a topic for the blog. Example: 'Write a blog about AI'")
             else:
-                send_message(chat_id, f"📝 Writing blog post about '{topic}' for '{audience}'...\nThis might take a minute.")
+                progress = ProgressMessage(chat_id, f"📝 Writing blog post about '{topic}' for '{audience}'...\nThis might take a minute.").start()
                 # We pass chat_id to the workflow so it can send the image/text directly
                 result = blog_agent.generate_blog_workflow(topic, audience, chat_id=chat_id)
                 if result['status'] == 'success':
                      # The agent handles sending the content, we just confirm completion if needed
-                     send_message(chat_id, "✅ Blog post workflow completed.")
+                     progress.finish("✅ Blog post workflow completed.")
                 else:
-                    send_message(chat_id, f"❌ Blog error: {result['message']}")
+                    progress.finish(f"❌ Blog error: {result['message']}")
 
         elif intent == "video_gen":
             subject = params.get("subject")
             if not subject:
                 send_message(chat_id, "❌ Please specify a subject for the video. Example: 'Make a video about cats'")
             else:
-                send_message(chat_id, f"🎬 Starting video generation for '{subject}'...")
+                progress = ProgressMessage(chat_id, f"🎬 Starting video generation for '{subject}'...").start()
                 result = faceless_video_agent.generate_video_workflow(subject=subject)
                 if result['status'] == 'success':
                     msg = f"✅ Video generation started!\nProject ID: `{result.get('project_id')}`\n\nI will notify you when it's ready (or you can ask 'status of video')."
-                    send_message(chat_id, msg)
+                    progress.finish(msg)
                 else:
-                    send_message(chat_id, f"❌ Video error: {result['message']}")
+                    progress.finish(f"❌ Video error: {result['message']}")
 
         elif intent == "video_status":
             project_id = params.get("project_id")
@@ -819,17 +974,17 @@ def handle_command(text, chat_id):
                 # For now prompt user.
                 send_message(chat_id, "ℹ️ Please provide the Project ID. Example: 'Check status of video xyz'")
             else:
-                send_message(chat_id, f"Checking status for `{project_id}`...")
+                progress = ProgressMessage(chat_id, f"Checking status for `{project_id}`...").start()
                 result = faceless_video_agent.check_video_status(project_id)
                 if result['status'] == 'success':
                     status = result.get('job_status')
                     video_url = result.get('video_url')
                     if status == 'done':
-                        send_message(chat_id, f"✅ Video is READY!\n[Watch Video]({video_url})")
+                        progress.finish(f"✅ Video is READY!\n[Watch Video]({video_url})")
                     else:
-                        send_message(chat_id, f"⏳ Video status: {status}")
+                        progress.finish(f"⏳ Video status: {status}")
                 else:
-                    send_message(chat_id, f"❌ Error checking status: {result['message']}")
+                    progress.finish(f"❌ Error checking status: {result['message']}")
 
         elif intent == "subscription_status":
             email = params.get("email")
@@ -851,7 +1006,7 @@ def handle_command(text, chat_id):
             if not task_id:
                 send_message(chat_id, "❌ Please provide a ClickUp Task ID. Example: 'Check clickup task 123'")
             else:
-                send_message(chat_id, f"🔍 Fetching ClickUp task `{task_id}`...")
+                progress = ProgressMessage(chat_id, f"🔍 Fetching ClickUp task `{task_id}`...").start()
                 result = clickup_agent.get_task(task_id)
                 if result['status'] == 'success':
                     task = result['task']
@@ -861,9 +1016,9 @@ def handle_command(text, chat_id):
                     msg += f"*URL*: [View in ClickUp]({task.get('url')})\n"
                     if task.get('description'):
                         msg += f"\n*Description*: {task.get('description')[:200]}..."
-                    send_message(chat_id, msg)
+                    progress.finish(msg)
                 else:
-                    send_message(chat_id, f"❌ ClickUp error: {result['message']}")
+                    progress.finish(f"❌ ClickUp error: {result['message']}")
 
         elif intent == "clickup_create":
             name = params.get("name")
@@ -875,20 +1030,21 @@ def handle_command(text, chat_id):
             elif not list_id:
                 send_message(chat_id, "❌ ClickUp List ID is not configured. Please set CLICKUP_LIST_ID in .env")
             else:
-                send_message(chat_id, f"🆕 Creating ClickUp task '{name}'...")
+                progress = ProgressMessage(chat_id, f"🆕 Creating ClickUp task '{name}'...").start()
                 result = clickup_agent.create_task(list_id, name, description)
                 if result['status'] == 'success':
                     task = result['task']
-                    send_message(chat_id, f"✅ Task created successfully!\n🔗 [View in ClickUp]({task.get('url')})")
+                    progress.finish(f"✅ Task created successfully!\n🔗 [View in ClickUp]({task.get('url')})")
                 else:
-                    send_message(chat_id, f"❌ ClickUp error: {result['message']}")
+                    progress.finish(f"❌ ClickUp error: {result['message']}")
 
 
         elif intent == "digest":
             limit = params.get("limit", 10)
-            send_message(chat_id, "☕ Preparing your daily digest...")
+            progress = ProgressMessage(chat_id, "☕ Preparing your daily digest...").start()
             
             # 1. Get Calendar for today
+            progress.stage("Reading today's calendar")
             cal_service = google_calendar.get_service()
             cal_res = google_calendar.list_events(cal_service, max_results=5, date_filter="today")
             cal_text = ""
@@ -898,11 +1054,13 @@ def handle_command(text, chat_id):
                      cal_text += f"• {t} - {e['summary']}\n"
             
             # 2. Get Recent unread emails and summarize
+            progress.stage("Checking unread email")
             mail_service = google_mail.get_service()
             mail_res = google_mail.list_emails(mail_service, max_results=limit, query="is:unread")
             summary = "No unread emails found."
             if mail_res['status'] == 'success' and mail_res['messages']:
                 email_list = mail_res['messages']
+                progress.stage(f"Summarizing {len(email_list)} unread emails")
                 email_context = "\n".join([f"- From {e['from']}: {e['subject']} ({e.get('snippet','')})" for e in email_list])
                 
                 system_prompt = f"You are an executive assistant for Kyaw Zin Tun. Summarize these emails into a concise bulleted digest. Highlight action items. Context: {USER_CONTENT}"
@@ -918,11 +1076,11 @@ def handle_command(text, chat_id):
             msg += f"📅 *Today's Schedule*:\n{cal_text if cal_text else 'No events found.'}\n\n"
             msg += f"📧 *Email Summary*:\n{summary}\n"
             
-            send_message(chat_id, msg)
+            progress.finish(msg)
 
         elif intent == "urgent":
             limit = params.get("limit", 5)
-            send_message(chat_id, "🚨 Checking for urgent items...")
+            progress = ProgressMessage(chat_id, "🚨 Checking for urgent items...").start()
             
             mail_service = google_mail.get_service()
             # Search for 'urgent' or 'important' or specific rules (Finance, Security, Subscriptions)
@@ -933,9 +1091,9 @@ def handle_command(text, chat_id):
                 msg = f"🚨 *Urgent Items*:\n\n"
                 for m in mail_res['messages']:
                     msg += f"• *{m['subject']}*\n  From: {m['from']}\n  `ID: {m['id']}`\n\n"
-                send_message(chat_id, msg)
+                progress.finish(msg)
             else:
-                send_message(chat_id, "✅ No urgent items found.")
+                progress.finish("✅ No urgent items found.")
 
         elif intent == "draft_list":
             service = google_mail.get_service()
@@ -1002,19 +1160,19 @@ def handle_command(text, chat_id):
             if not list_id:
                 send_message(chat_id, "❌ ClickUp List ID is not configured.")
             else:
-                send_message(chat_id, "📋 Fetching ClickUp tasks...")
+                progress = ProgressMessage(chat_id, "📋 Fetching ClickUp tasks...").start()
                 result = clickup_agent.list_tasks(list_id)
                 if result['status'] == 'success':
                     tasks = result['tasks']
                     if not tasks:
-                        send_message(chat_id, "ℹ️ No tasks found in this list.")
+                        progress.finish("ℹ️ No tasks found in this list.")
                     else:
                         msg = f"📋 *ClickUp Tasks ({len(tasks)})*:\n\n"
                         for t in tasks[:10]: # Limit to 10
                             msg += f"• *{t['name']}* (`{t['status']['status']}`)\n"
-                        send_message(chat_id, msg)
+                        progress.finish(msg)
                 else:
-                    send_message(chat_id, f"❌ ClickUp error: {result['message']}")
+                    progress.finish(f"❌ ClickUp error: {result['message']}")
 
         elif intent == "clickup_task":
             task_id = params.get("task_id")
@@ -1030,9 +1188,10 @@ def handle_command(text, chat_id):
                     send_message(chat_id, f"❌ Error: {res['message']}")
 
         elif intent == "daily_log": # Evening Session
-            send_message(chat_id, "🌙 Generating your evening summary...")
+            progress = ProgressMessage(chat_id, "🌙 Generating your evening summary...").start()
             
             # 1. Gather actions taken from memory
+            progress.stage("Reading today's actions and follow-ups")
             today = datetime.now().strftime("%Y-%m-%d")
             mem_file = os.path.join(MEM_DIR, f"{today}.md")
             actions = "No actions logged today."
@@ -1045,6 +1204,7 @@ def handle_command(text, chat_id):
             pending = [f['note'] for f in followups if f.get('status') == 'pending']
             
             # 3. Summarize with LLM
+            progress.stage("Writing the summary")
             prompt = f"""
             Summarize the actions taken today and list pending items for tomorrow.
             Context: {USER_CONTENT}
@@ -1068,7 +1228,7 @@ def handle_command(text, chat_id):
             with open(os.path.join(log_dir, f"{today}.md"), 'w') as f:
                 f.write(summary)
             
-            send_message(chat_id, f"🌙 *Evening Summary & Daily Log*:\n\n{summary}")
+            progress.finish(f"🌙 *Evening Summary & Daily Log*:\n\n{summary}")
 
 
         else: # Default Chat
@@ -1096,65 +1256,141 @@ def handle_command(text, chat_id):
                 {"role": "user", "content": text}
             ]
             
-            response = chat_agent.chat_openai(messages)
+            # Stream the reply so the user sees text from the first token on
+            reply = StreamingReply(chat_id)
+            response = chat_agent.chat_openai(messages, on_token=reply.update)
+            if "error" in response:
+                # Keep whatever already streamed in and say why it stopped
+                print(f"Chat reply failed: {response['error']}")
+                if reply.text.strip():
+                    reply.finish(f"{reply.text}\n\n⚠️ Reply interrupted: {response['error']}")
+                else:
+                    reply.finish(f"⚠️ Sorry, I couldn't get a reply: {response['error']}")
+                return
             content = response.get('choices', [{}])[0].get('message', {}).get('content', "I'm not sure how to help with that yet.")
-            send_message(chat_id, content)
+            reply.finish(content)
 
     except Exception as e:
         print(f"Error in handle_command: {e}")
         traceback.print_exc()
         send_message(chat_id, f"⚠️ An error occurred while processing your request: {str(e)}")
 
+OFFSET_FILE = os.path.join(MEM_DIR, "telegram_offset.json")
+
+# Commands that report current state: after downtime only the newest of each needs an answer
+COLLAPSIBLE_COMMANDS = {
+    "/digest": "digest", "digest": "digest", "summary": "digest", "what did i miss": "digest",
+    "/urgent": "urgent", "urgent": "urgent", "urgent emails": "urgent",
+    "daily_log": "daily_log", "daily log": "daily_log",
+    "/drafts": "draft_list", "list drafts": "draft_list", "show drafts": "draft_list",
+    "show followups": "followup_list", "tracking list": "followup_list",
+    "/help": "help", "help": "help",
+}
+
+def load_offset():
+    """The next getUpdates offset saved by the last run, or None."""
+    try:
+        with open(OFFSET_FILE, "r") as f:
+            return json.load(f).get("offset")
+    except (OSError, ValueError):
+        return None
+
+def save_offset(offset):
+    atomic_write_json(OFFSET_FILE, {"offset": offset, "saved_at": time.time()})
+
+def _collapse_key(update):
+    message = update.get("message") or {}
+    text = " ".join((message.get("text") or "").lower().strip(" ?!.").split())
+    command = COLLAPSIBLE_COMMANDS.get(text)
+    return (str(message.get("chat", {}).get("id")), command) if command else None
+
+def collapse_backlog(updates):
+    """Drops all but the newest of each repeated status command (per chat). Other updates are kept in order."""
+    newest = {}
+    for update in updates:
+        key = _collapse_key(update)
+        if key:
+            newest[key] = update["update_id"]
+    return [u for u in updates if _collapse_key(u) is None or newest[_collapse_key(u)] == u["update_id"]]
+
+def process_update(update):
+    message = update.get("message")
+    if not message:
+        return
+    chat_id = str(message["chat"]["id"])
+    text = message.get("text")
+    voice = message.get("voice")
+
+    # Security check: only respond to the configured chat ID
+    if ALLOWED_CHAT_ID and chat_id != str(ALLOWED_CHAT_ID):
+        print(f"Unauthorized access attempt from Chat ID: {chat_id}")
+        return
+
+    if voice:
+        # Download and transcription run on the voice workers; keep polling meanwhile
+        print(f"Received voice message from {chat_id}")
+        get_voice_pipeline().submit(chat_id, voice)
+
+    elif text:
+        print(f"Received message: {text}")
+        # Behind any voice notes still being handled for this chat, so replies stay in order
+        get_voice_pipeline().run_in_order(chat_id, handle_command, text, chat_id)
+
+def resume_backlog(offset):
+    """
+    Catches up on updates queued while the bot was down, a page at a time and
+    without long polling. Repeated status commands in a page are collapsed and
+    the rest processed, saving the offset after each one. Telegram deletes
+    every update below the offset passed to getUpdates, so the next page is
+    only requested once this one has been handled. Returns the next offset.
+    """
+    received = collapsed = 0
+    while True:
+        updates = get_updates(offset, timeout=0)
+        results = (updates or {}).get("result") or []
+        if not results:
+            break
+        pending = collapse_backlog(results)
+        received += len(results)
+        collapsed += len(results) - len(pending)
+        for update in pending:
+            process_update(update)
+            save_offset(update["update_id"] + 1)
+        offset = results[-1]["update_id"] + 1
+        save_offset(offset)
+    if received:
+        print(f"Processed backlog of {received} updates ({collapsed} repeated commands collapsed)")
+    return offset
+
 def main():
     if not BOT_TOKEN:
         print("Error: TELEGRAM_BOT_TOKEN not found.")
         return
 
     print("Telegram Agent started. Listening for messages...")
-    last_update_id = None
+    # Resume where the last run stopped, even after a crash or restart
+    last_update_id = load_offset()
+    try:
+        last_update_id = resume_backlog(last_update_id)
+    except Exception as e:
+        # Updates after the failed one are still unconfirmed on Telegram's side; pick them up from the saved offset
+        print(f"Backlog error: {e}")
+        last_update_id = load_offset()
     
     while True:
         try:
-            # Run periodic automations
-            if ALLOWED_CHAT_ID:
+            # Run periodic automations (cheap in-memory check until a job is due)
+            if RUN_AUTOMATIONS and ALLOWED_CHAT_ID and get_scheduler(str(ALLOWED_CHAT_ID)).due():
                 check_automations(str(ALLOWED_CHAT_ID))
 
             updates = get_updates(last_update_id)
             if updates and updates.get("ok"):
-                for update in updates.get("result", []):
+                results = updates.get("result", [])
+                for update in results:
                     last_update_id = update["update_id"] + 1
-                    message = update.get("message")
-                    if message:
-                        chat_id = str(message["chat"]["id"])
-                        text = message.get("text")
-                        voice = message.get("voice")
-                        
-                        # Security check: only respond to the configured chat ID
-                        if ALLOWED_CHAT_ID and chat_id != str(ALLOWED_CHAT_ID):
-                            print(f"Unauthorized access attempt from Chat ID: {chat_id}")
-                            continue
-
-                        if voice:
-                            print(f"Received voice message from {chat_id}")
-                            send_message(chat_id, "🎙️ _Transcribing your voice message..._")
-                            
-                            file_id = voice["file_id"]
-                            voice_content = download_telegram_file(file_id)
-                            
-                            if voice_content:
-                                transcribed_text = transcribe_voice(voice_content)
-                                if transcribed_text:
-                                    print(f"Transcribed: {transcribed_text}")
-                                    send_message(chat_id, f"📝 _Transcribed_: \"{transcribed_text}\"")
-                                    handle_command(transcribed_text, chat_id)
-                                else:
-                                    send_message(chat_id, "❌ Sorry, I couldn't transcribe your voice message.")
-                            else:
-                                send_message(chat_id, "❌ Sorry, I couldn't download your voice message.")
-                        
-                        elif text:
-                            print(f"Received message: {text}")
-                            handle_command(text, chat_id)
+                    process_update(update)
+                    # Saved per update so a crash mid-batch doesn't replay handled commands
+                    save_offset(last_update_id)
                             
             time.sleep(1)
         except KeyboardInterrupt:
@@ -0,0 +1,263 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+API_BASE = "https://api.telegram.org"
+RETRY_STATUSES = {500, 502, 503, 504}
+# Safe to repeat: after a timeout or 5xx these are retried even though Telegram may have acted on them.
+# Everything else (sendMessage, sendPhoto, ...) is only retried when it can't have been delivered.
+IDEMPOTENT_METHODS = {"getUpdates", "getFile", "getMe", "editMessageText", "deleteWebhook", "setWebhook", "getWebhookInfo"}
+
+# Telegram's published limits: about 30 messages/s across all chats, 1/s in a
+# single chat (short bursts are tolerated) and 20/min in a group
+GLOBAL_RATE = float(os.getenv("TELEGRAM_GLOBAL_RATE", 30))
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+CHAT_BURST = 3
+SEND_WORKERS = int(os.getenv("TELEGRAM_SEND_WORKERS", 4))
+
+def _never_sent(error):
+    """True if the request failed before reaching Telegram (so resending can't duplicate it)."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+class TokenBucket:
+    """Classic token bucket. reserve() takes a token and returns how long to wait before using it."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def pause(self, seconds):
+        """Holds every reservation for `seconds` (after a 429 retry_after)."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class TelegramClient:
+    """
+    Shared Bot API client:
+    - one pooled, keep-alive Session (no new TLS handshake per message)
+    - a global token bucket plus one per chat, matching Telegram's limits
+    - 429s are retried after the retry_after Telegram asks for; connection
+      failures with jittered backoff, and for idempotent methods also timeouts
+      and 5xx (a timed-out sendMessage may already have been delivered)
+    - a send queue: chat-bound calls (send*/edit*) are queued per chat and sent
+      by a small worker pool, so messages to one chat keep their order while
+      different chats go out in parallel
+    Calls return Telegram's JSON ({"ok": ..., "result": ...}); failures come back
+    as {"ok": False, "description": ...} rather than raising.
+    """
+
+    def __init__(self, token=None, pool_size=10, timeout=(5, 30), max_retries=3, global_rate=GLOBAL_RATE, workers=SEND_WORKERS):
+        self.token = token
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._lock = threading.Lock()
+        self._chat_queues = {}  # chat_id -> deque of (method, params, files, timeout, future)
+        self._ready = deque()  # chats with queued calls that no worker is handling
+        self._wakeup = threading.Condition(self._lock)
+        self._workers = []
+        self._idle = 0
+        self._max_workers = workers
+
+    @property
+    def bot_token(self):
+        return self.token or os.getenv("TELEGRAM_BOT_TOKEN")
+
+    # --- rate limiting ---
+
+    def _chat_bucket(self, chat_id):
+        key = str(chat_id)
+        with self._lock:
+            bucket = self._chat_buckets.get(key)
+            if bucket is None:
+                # Negative IDs are groups and channels
+                rate = GROUP_RATE if key.startswith("-") else CHAT_RATE
+                bucket = self._chat_buckets[key] = TokenBucket(rate, CHAT_BURST)
+            return bucket
+
+    def _wait_for_slot(self, chat_id):
+        wait = self.global_bucket.reserve()
+        if chat_id is not None:
+            wait = max(wait, self._chat_bucket(chat_id).reserve())
+        if wait > 0:
+            time.sleep(wait)
+
+    # --- HTTP ---
+
+    def _post(self, method, params, files, timeout):
+        if files:
+            for value in files.values():
+                # Retries must re-send uploads from the start
+                handle = value[1] if isinstance(value, tuple) else value
+                if hasattr(handle, "seek"):
+                    handle.seek(0)
+            return self.session.post(f"{API_BASE}/bot{self.bot_token}/{method}", data=params, files=files, timeout=timeout)
+        return self.session.post(f"{API_BASE}/bot{self.bot_token}/{method}", json=params, timeout=timeout)
+
+    def _execute(self, method, params, files=None, chat_id=None, timeout=None):
+        if not self.bot_token:
+            return {"ok": False, "description": "TELEGRAM_BOT_TOKEN not configured"}
+        timeout = timeout or self.timeout
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot(chat_id)
+            try:
+                response = self._post(method, params, files, timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries or not (method in IDEMPOTENT_METHODS or _never_sent(e)):
+                    return {"ok": False, "description": f"Network error: {e}"}
+                time.sleep(random.uniform(0, min(30, 2 ** attempt)))
+                continue
+
+            try:
+                result = response.json()
+            except ValueError:
+                result = {"ok": False, "error_code": response.status_code, "description": response.text[:200]}
+
+            if response.status_code == 429 and attempt < self.max_retries:
+                retry_after = (result.get("parameters") or {}).get("retry_after", 1)
+                print(f"Telegram rate limit on {method}, retrying in {retry_after}s")
+                bucket = self._chat_bucket(chat_id) if chat_id is not None else self.global_bucket
+                bucket.pause(retry_after)
+                continue
+            if response.status_code in RETRY_STATUSES and method in IDEMPOTENT_METHODS and attempt < self.max_retries:
+                time.sleep(random.uniform(0, min(30, 2 ** attempt)))
+                continue
+            return result
+
+    # --- send queue ---
+
+    def submit(self, method, params, files=None, timeout=None):
+        """Queues a chat-bound call. Returns a Future with Telegram's JSON response."""
+        future = Future()
+        chat_id = str(params["chat_id"])
+        with self._lock:
+            queue = self._chat_queues.get(chat_id)
+            if queue is None:
+                queue = self._chat_queues[chat_id] = deque()
+                self._ready.append(chat_id)
+            queue.append((method, params, files, timeout, future))
+            if len(self._workers) < self._max_workers and len(self._ready) > self._idle:
+                worker = threading.Thread(target=self._worker, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._wakeup.notify()
+        return future
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+                while not self._ready:
+                    self._wakeup.wait()
+                self._idle -= 1
+                chat_id = self._ready.popleft()
+            # This worker owns the chat until its queue is empty, which keeps per-chat order
+            while True:
+                with self._lock:
+                    queue = self._chat_queues[chat_id]
+                    if not queue:
+                        del self._chat_queues[chat_id]
+                        break
+                    method, params, files, timeout, future = queue.popleft()
+                try:
+                    future.set_result(self._execute(method, params, files, chat_id=chat_id, timeout=timeout))
+                except Exception as e:
+                    future.set_result({"ok": False, "description": str(e)})
+
+    # --- API ---
+
+    def call(self, method, params=None, files=None, timeout=None):
+        """
+        Calls a Bot API method and waits for the result. Calls with a chat_id go
+        through the send queue; the rest (getUpdates, getFile, ...) are sent directly.
+        """
+        params = params or {}
+        if "chat_id" in params:
+            return self.submit(method, params, files, timeout).result()
+        return self._execute(method, params, files, timeout=timeout)
+
+    def send_message(self, chat_id, text, parse_mode="Markdown", **extra):
+        params = {"chat_id": chat_id, "text": text, **extra}
+        if parse_mode:
+            params["parse_mode"] = parse_mode
+        return self.call("sendMessage", params)
+
+    def edit_message_text(self, chat_id, message_id, text, parse_mode="Markdown"):
+        params = {"chat_id": chat_id, "message_id": message_id, "text": text}
+        if parse_mode:
+            params["parse_mode"] = parse_mode
+        return self.call("editMessageText", params)
+
+    def send_photo(self, chat_id, photo, caption=None, filename="image.png", content_type="image/png"):
+        """`photo` is a URL / file_id, or a file-like object to upload."""
+        params = {"chat_id": chat_id}
+        if caption:
+            params["caption"] = caption
+        if hasattr(photo, "read"):
+            return self.call("sendPhoto", params, files={"photo": (filename, photo, content_type)})
+        params["photo"] = photo
+        return self.call("sendPhoto", params)
+
+    def get_updates(self, offset=None, timeout=100):
+        # The read timeout has to outlast Telegram's long poll
+        return self.call("getUpdates", {"timeout": timeout, "offset": offset}, timeout=(self.timeout[0], timeout + 10))
+
+    def download_file(self, file_id, max_bytes=None):
+        """Bytes of a file sent to the bot, or None. Files over `max_bytes` are refused without downloading the rest."""
+        info = self.call("getFile", {"file_id": file_id})
+        if not info.get("ok"):
+            print(f"Error getting file info: {info}")
+            return None
+        if max_bytes and info["result"].get("file_size", 0) > max_bytes:
+            print(f"File {file_id} is {info['result']['file_size']} bytes, over the {max_bytes} byte limit")
+            return None
+        with self.session.get(f"{API_BASE}/file/bot{self.bot_token}/{info['result']['file_path']}", timeout=(self.timeout[0], 60), stream=True) as response:
+            if not response.ok:
+                return None
+            chunks, size = [], 0
+            for chunk in response.iter_content(64 * 1024):
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    print(f"File {file_id} exceeded the {max_bytes} byte limit while downloading")
+                    return None
+                chunks.append(chunk)
+            return b"".join(chunks)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The process-wide client, so every agent shares one pool, one set of buckets and one send queue."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TelegramClient()
+        return _client
@@ -0,0 +1,84 @@
+import os
+import time
+import importlib
+import threading
+
+# Set EAGER_IMPORTS=true to load every registered module up front (e.g. before a
+# memory snapshot, or to surface import errors at boot instead of on first use)
+EAGER_IMPORTS = os.getenv("EAGER_IMPORTS", "false").lower() == "true"
+
+_registry = {}
+_lock = threading.RLock()
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    After that it forwards every attribute get/set/delete to the real module,
+    so callers (and mock.patch) can treat it like the module itself.
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_module", None)
+        object.__setattr__(self, "_load_seconds", None)
+
+    def _load(self):
+        module = object.__getattribute__(self, "_module")
+        if module is not None:
+            return module
+        with _lock:
+            module = object.__getattribute__(self, "_module")
+            if module is None:
+                name = object.__getattribute__(self, "_name")
+                started = time.perf_counter()
+                module = importlib.import_module(name)
+                object.__setattr__(self, "_load_seconds", time.perf_counter() - started)
+                object.__setattr__(self, "_module", module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        name = object.__getattribute__(self, "_name")
+        state = "loaded" if object.__getattribute__(self, "_module") is not None else "not loaded"
+        return f"<lazy module {name!r} ({state})>"
+
+def lazy_import(name):
+    """Returns a proxy for `name` that imports it on first use. One proxy per module name."""
+    with _lock:
+        proxy = _registry.get(name)
+        if proxy is None:
+            proxy = _registry[name] = LazyModule(name)
+    if EAGER_IMPORTS:
+        proxy._load()
+    return proxy
+
+def load_all():
+    """Imports every registered module now. Returns the names that failed to import."""
+    failed = []
+    for name, proxy in list(_registry.items()):
+        try:
+            proxy._load()
+        except Exception as e:
+            print(f"Failed to import {name}: {e}")
+            failed.append(name)
+    return failed
+
+def status():
+    """Which registered modules are loaded, and how long each import took (ms)."""
+    report = {}
+    for name, proxy in _registry.items():
+        seconds = object.__getattribute__(proxy, "_load_seconds")
+        loaded = object.__getattribute__(proxy, "_module") is not None
+        report[name] = {"loaded": loaded, "import_ms": round(seconds * 1000, 1) if seconds is not None else None}
+    return report
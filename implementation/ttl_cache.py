@@ -0,0 +1,133 @@
+import time
+import threading
+from collections import deque
+
+class _Flight:
+    """One in-progress load that concurrent callers for the same key wait on."""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class TTLCache:
+    """
+    In-process cache with a per-entry TTL and request coalescing (single-flight):
+    concurrent misses for the same key share one loader call.
+
+    With stale_while_revalidate=True, an entry that expired less than `max_stale`
+    seconds ago is still returned immediately while a single background refresh runs.
+    """
+
+    def __init__(self, ttl, stale_while_revalidate=False, max_stale=None, max_entries=1024):
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale if max_stale is not None else ttl
+        self.max_entries = max_entries
+        self._entries = {}  # key -> (value, expires_at)
+        self._inflight = {}
+        # Bumped by invalidate() so loads started earlier don't write back stale data
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "loads": 0, "load_errors": 0}
+        self._latencies = deque(maxlen=200)
+
+    def get_or_load(self, key, loader, cacheable=None):
+        """
+        Return the cached value for `key`, calling loader() on a miss.
+        `cacheable(value)` can reject results (e.g. error responses) from being stored.
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(key)
+            if entry and now < entry[1]:
+                self._counters["hits"] += 1
+                return entry[0]
+
+            if entry and self.stale_while_revalidate and now < entry[1] + self.max_stale:
+                self._counters["stale_hits"] += 1
+                refresh = None
+                if key not in self._inflight:
+                    refresh = self._inflight[key] = _Flight(self._generation)
+                stale = True
+            else:
+                stale = False
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = _Flight(self._generation)
+                    self._counters["misses"] += 1
+                else:
+                    self._counters["coalesced"] += 1
+
+        if stale:
+            if refresh:
+                threading.Thread(target=self._load, args=(key, loader, cacheable, refresh), daemon=True).start()
+            return entry[0]
+
+        if leader:
+            self._load(key, loader, cacheable, flight)
+        else:
+            flight.event.wait()
+        if flight.error:
+            raise flight.error
+        return flight.value
+
+    def _load(self, key, loader, cacheable, flight):
+        started = time.monotonic()
+        try:
+            value = loader()
+            flight.value = value
+            if cacheable is None or cacheable(value):
+                with self._lock:
+                    if flight.generation == self._generation:
+                        self._entries[key] = (value, time.monotonic() + self.ttl)
+                        self._prune()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._counters["load_errors"] += 1
+        finally:
+            with self._lock:
+                self._counters["loads"] += 1
+                self._latencies.append(time.monotonic() - started)
+                if self._inflight.get(key) is flight:
+                    del self._inflight[key]
+            flight.event.set()
+
+    def _prune(self):
+        if len(self._entries) <= self.max_entries:
+            return
+        # Drop the entries closest to expiry first
+        for key, _ in sorted(self._entries.items(), key=lambda kv: kv[1][1])[:len(self._entries) - self.max_entries]:
+            del self._entries[key]
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self._generation += 1
+            if key is None:
+                self._entries.clear()
+                self._inflight.clear()
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        """Counters plus hit ratio and upstream (loader) latency in milliseconds."""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = sorted(self._latencies)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["stale_hits"] + counters["misses"] + counters["coalesced"]
+        served_without_load = counters["hits"] + counters["stale_hits"] + counters["coalesced"]
+        counters["entries"] = size
+        counters["hit_ratio"] = round(served_without_load / lookups, 3) if lookups else None
+        if latencies:
+            counters["upstream_latency_ms"] = {
+                "avg": round(sum(latencies) / len(latencies) * 1000, 1),
+                "p50": round(latencies[len(latencies) // 2] * 1000, 1),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1),
+            }
+        return counters
@@ -2,96 +2,273 @@ import json
 import argparse
 import sys
 import os
+import re
+import time
 import gspread
 from dotenv import load_dotenv
+import lead_io
+import lead_store
 
 load_dotenv()
 
+CREDENTIALS_PATH = "credentials.json"
+
+def open_worksheet():
+    """First worksheet of the leads spreadsheet."""
+    sheet_id = os.getenv("APIFY_SHEETS_ID") or os.getenv("GOOGLE_SHEETS_ID")
+    if not sheet_id:
+        raise ValueError("APIFY_SHEETS_ID or GOOGLE_SHEETS_ID not found in .env")
+    if not os.path.exists(CREDENTIALS_PATH):
+        raise ValueError(f"{CREDENTIALS_PATH} not found.")
+
+    # Connect to Google Sheets
+    gc = gspread.service_account(filename=CREDENTIALS_PATH)
+    sh = gc.open_by_key(sheet_id)
+    return sh.sheet1  # Default to first sheet
+
+def lead_to_row(lead, headers):
+    row = []
+    for col in headers:
+        val = lead.get(col, "")
+        if val is None:
+            val = ""
+        row.append(str(val))
+    return row
+
+KEY_COLUMN = "lead_id"
+# The Sheets API caps request bodies (~2 MB recommended); stay well under it
+MAX_PAYLOAD_BYTES = int(os.getenv("SHEETS_MAX_PAYLOAD_BYTES", 1_000_000))
+MAX_RANGES_PER_READ = 100
+
+def _first_row(updated_range):
+    """Row number where an append landed, from a range like "Sheet1!A12:F14"."""
+    match = re.search(r"![A-Z]+(\d+)", updated_range or "")
+    return int(match.group(1)) if match else None
+
+def union_headers(existing, leads):
+    """
+    Existing header order, plus every key seen in any lead (first-seen order).
+    On a fresh sheet lead_id goes first and icebreaker last.
+    """
+    headers = list(existing)
+    new_columns = []
+    for lead in leads:
+        for key in lead:
+            if key not in headers and key not in new_columns:
+                new_columns.append(key)
+    if not headers:
+        new_columns.sort(key=lambda k: (k != KEY_COLUMN, k == "icebreaker", k))
+    return headers + new_columns, new_columns
+
+def chunk_by_payload(items, max_bytes=MAX_PAYLOAD_BYTES):
+    """Splits a list of JSON-serializable items into chunks whose encoded size stays under max_bytes."""
+    chunk, size = [], 0
+    for item in items:
+        item_size = len(json.dumps(item)) + 1
+        if chunk and size + item_size > max_bytes:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(item)
+        size += item_size
+    if chunk:
+        yield chunk
+
+class SheetSync:
+    """
+    Upserts leads into a worksheet keyed by the lead_id column.
+    Reads only the header row, the key column and the rows being updated, never
+    the whole sheet. New columns come from the union of keys across all leads.
+    Updates keep cells for columns a lead doesn't have, and unchanged rows are
+    skipped. Writes go out as batched range updates and chunked appends, each
+    under MAX_PAYLOAD_BYTES.
+    """
+
+    def __init__(self, worksheet, key=KEY_COLUMN, max_payload_bytes=MAX_PAYLOAD_BYTES):
+        self.worksheet = worksheet
+        self.key = key
+        self.max_payload_bytes = max_payload_bytes
+        self.headers = worksheet.row_values(1)
+        self.rows = {}  # key value -> sheet row number
+        if key in self.headers:
+            ids = worksheet.col_values(self.headers.index(key) + 1)
+            self.rows = {value: row for row, value in enumerate(ids, 1) if value and row > 1}
+
+    def plan(self, leads):
+        """Works out what sync() would change, without writing anything."""
+        headers, new_columns = union_headers(self.headers, leads)
+
+        appends, updates = {}, {}
+        for lead in leads:
+            value = lead.get(self.key)
+            if value and value in self.rows:
+                updates[value] = lead  # last copy of a duplicate wins
+            else:
+                appends[value or object()] = lead
+
+        existing = self._read_rows([self.rows[value] for value in updates])
+        changes, unchanged = [], 0
+        for value, lead in updates.items():
+            row = self.rows[value]
+            old = existing.get(row, [])
+            old = old + [""] * (len(headers) - len(old))
+            new = [str(lead[col]) if col in lead and lead[col] is not None else old[i] for i, col in enumerate(headers)]
+            diff = {col: (old[i], new[i]) for i, col in enumerate(headers) if old[i] != new[i]}
+            if diff:
+                changes.append({"row": row, "key": value, "values": new, "diff": diff})
+            else:
+                unchanged += 1
+
+        return {
+            "headers": headers,
+            "new_columns": new_columns,
+            "updates": changes,
+            "appends": [(value if isinstance(value, str) else None, lead_to_row(lead, headers)) for value, lead in appends.items()],
+            "unchanged": unchanged
+        }
+
+    def _read_rows(self, rows):
+        found = {}
+        rows = sorted(rows)
+        for i in range(0, len(rows), MAX_RANGES_PER_READ):
+            batch = rows[i:i + MAX_RANGES_PER_READ]
+            for row, values in zip(batch, self.worksheet.batch_get([f"{row}:{row}" for row in batch])):
+                found[row] = list(values[0]) if values else []
+        return found
+
+    def apply(self, plan):
+        """Writes a plan: header first, then batched updates, then chunked appends."""
+        if plan["new_columns"]:
+            self.worksheet.update("A1", [plan["headers"]])
+            print(f"Added columns: {plan['new_columns']}")
+        self.headers = plan["headers"]
+
+        updates = [{"range": f"A{change['row']}", "values": [change["values"]]} for change in plan["updates"]]
+        for chunk in chunk_by_payload(updates, self.max_payload_bytes):
+            self.worksheet.batch_update(chunk)
+
+        for chunk in chunk_by_payload(plan["appends"], self.max_payload_bytes):
+            response = self.worksheet.append_rows([row for _, row in chunk], table_range="A1")
+            start = _first_row((response or {}).get("updates", {}).get("updatedRange")) if isinstance(response, dict) else None
+            if start:
+                for offset, (value, _) in enumerate(chunk):
+                    if value:
+                        self.rows[value] = start + offset
+
+    def sync(self, leads, dry_run=False):
+        plan = self.plan(leads)
+        if not dry_run:
+            self.apply(plan)
+        return plan
+
+def format_report(plan, max_rows=20):
+    """Human-readable dry-run diff."""
+    lines = [
+        f"New columns: {', '.join(plan['new_columns']) or 'none'}",
+        f"Rows to append: {len(plan['appends'])}",
+        f"Rows to update: {len(plan['updates'])} ({plan['unchanged']} unchanged)"
+    ]
+    for change in plan["updates"][:max_rows]:
+        lines.append(f"  row {change['row']} ({change['key']}):")
+        for col, (old, new) in change["diff"].items():
+            lines.append(f"    {col}: {old[:40]!r} -> {new[:40]!r}")
+    if len(plan["updates"]) > max_rows:
+        lines.append(f"  ... {len(plan['updates']) - max_rows} more")
+    return "\n".join(lines)
+
+class SheetStreamUploader:
+    """
+    Writes leads as they arrive instead of after the whole run, through SheetSync.
+    Leads are buffered and synced every `flush_rows` leads or `flush_seconds`,
+    and the very first lead is written straight away. Columns first seen
+    mid-stream are added at the next flush.
+    """
+
+    def __init__(self, worksheet, flush_rows=20, flush_seconds=2.0, store=None):
+        self.sheet = SheetSync(worksheet)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.store = store
+        self.uploaded = 0
+        self.updated = 0
+        self._buffer = []
+        self._last_flush = None
+
+    def add(self, lead):
+        if self.store:
+            self.store.assign_id(lead)
+        self._buffer.append(lead)
+        due = self._last_flush is None or time.monotonic() - self._last_flush >= self.flush_seconds
+        if len(self._buffer) >= self.flush_rows or due:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            plan = self.sheet.sync(self._buffer)
+            self.uploaded += len(plan["appends"])
+            self.updated += len(plan["updates"])
+            print(f"Uploaded {self.uploaded} new rows, updated {self.updated} so far")
+            self._mark_uploaded(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _mark_uploaded(self, leads):
+        if self.store:
+            now = time.time()
+            for lead in leads:
+                self.store.record(lead, icebreaker=lead.get("icebreaker"), uploaded_at=now)
+            self.store.save()
+
+def upload_stream(worksheet, leads, flush_rows=20, flush_seconds=2.0, store=None):
+    """Streams any iterable of leads into the sheet. Returns (appended, updated) row counts."""
+    uploader = SheetStreamUploader(worksheet, flush_rows, flush_seconds, store=store)
+    try:
+        for lead in leads:
+            uploader.add(lead)
+    finally:
+        uploader.flush()
+    return uploader.uploaded, uploader.updated
+
 def main():
     parser = argparse.ArgumentParser(description="Upload leads to Google Sheets.")
-    parser.add_argument("--input", required=True, help="Input JSON file path (enriched leads)")
+    parser.add_argument("--input", required=True, help="Input JSON file path (enriched leads), JSONL file, or '-' for JSONL on stdin")
+    parser.add_argument("--no-store", action="store_true", help="Append without the lead store (no lead_id upserts).")
+    parser.add_argument("--dry-run", action="store_true", help="Print the columns/rows that would change without writing.")
     args = parser.parse_args()
     
-    sheet_id = os.getenv("APIFY_SHEETS_ID") or os.getenv("GOOGLE_SHEETS_ID")
-    if not sheet_id:
-        print("Error: APIFY_SHEETS_ID or GOOGLE_SHEETS_ID not found in .env")
-        sys.exit(1)
-        
-    credentials_path = "credentials.json"
-    if not os.path.exists(credentials_path):
-        print(f"Error: {credentials_path} not found.")
+    credentials_path = CREDENTIALS_PATH
+    try:
+        worksheet = open_worksheet()
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
 
     try:
-        # Connect to Google Sheets
-        gc = gspread.service_account(filename=credentials_path)
-        sh = gc.open_by_key(sheet_id)
-        worksheet = sh.sheet1  # Default to first sheet
-        
-        # Load leads
-        with open(args.input, "r") as f:
-            leads = json.load(f)
-            
+        store = None if args.no_store else lead_store.open_store()
+        if lead_io.is_stream(args.input) and not args.dry_run:
+            appended, updated = upload_stream(worksheet, lead_io.read_leads(args.input), store=store)
+            print(f"Success: Streamed {appended} new rows and updated {updated} existing rows in Google Sheet.")
+            return
+
+        leads = list(lead_io.read_leads(args.input))
         if not leads:
             print("No leads to upload.")
             return
+        if store:
+            for lead in leads:
+                store.assign_id(lead)
 
-        # Check if sheet has existing headers
-        existing_data = worksheet.get_all_values()
-        
-        if existing_data:
-            # Use existing headers from the first row
-            sheet_headers = existing_data[0]
-            print(f"Found existing headers: {sheet_headers}")
-            
-            # Check for new columns in the data that aren't in the sheet
-            # We want to ensure 'icebreaker' (and others) are captured
-            data_keys = list(leads[0].keys())
-            new_columns = [key for key in data_keys if key not in sheet_headers]
-            
-            if new_columns:
-                print(f"Found new columns to add: {new_columns}")
-                # Update headers in memory
-                headers = sheet_headers + new_columns
-                # Update headers in Sheet (row 1)
-                # We need to rewrite the first row. 
-                # gspread update using range
-                worksheet.update("A1", [headers]) 
-                print("Updated sheet headers with new columns.")
-            else:
-                headers = sheet_headers
-        else:
-            # Create new headers if sheet is empty
-            all_keys = list(leads[0].keys())
-            # Ensure icebreaker is last if possible, though strict ordering matters less now
-            if "icebreaker" in all_keys:
-                all_keys.remove("icebreaker")
-                all_keys.sort()
-                headers = all_keys + ["icebreaker"]
-            else:
-                all_keys.sort()
-                headers = all_keys
-            
-            worksheet.append_row(headers)
-            print("Added new headers to new sheet.")
-
-        # Prepare rows matching the FINAL headers
-        rows = []
-        for lead in leads:
-            row = []
-            for col in headers:
-                val = lead.get(col, "")
-                if val is None:
-                    val = ""
-                row.append(str(val))
-            rows.append(row)
-            
-        # Append data (skip header check as we handled it above)
-        worksheet.append_rows(rows)
-            
-        # Append data
-
-        print(f"Success: Uploaded {len(rows)} rows to Google Sheet.")
+        plan = SheetSync(worksheet).sync(leads, dry_run=args.dry_run)
+        if args.dry_run:
+            print("Dry run, nothing written:")
+            print(format_report(plan))
+            return
+
+        if store:
+            now = time.time()
+            for lead in leads:
+                store.record(lead, icebreaker=lead.get("icebreaker"), uploaded_at=now)
+            store.save()
+        print(f"Success: Uploaded {len(plan['appends'])} new rows and updated {len(plan['updates'])} existing rows in Google Sheet.")
         
     except Exception as e:
         import traceback
@@ -0,0 +1,234 @@
+import io
+import os
+import time
+import hashlib
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from disk_cache import DiskCache
+
+# In the polling bot, voice notes run on their own worker pool so a slow
+# download or transcription doesn't hold up updates from other chats.
+VOICE_WORKERS = int(os.getenv("VOICE_WORKERS", 2))
+VOICE_MAX_BYTES = int(os.getenv("VOICE_MAX_BYTES", 10 * 1024 * 1024))
+
+# "openai" sends audio to Whisper; "local" runs faster-whisper on the CPU
+# (optional dependency: pip install faster-whisper) and falls back to OpenAI
+# if it isn't installed or fails
+TRANSCRIBE_BACKEND = os.getenv("VOICE_TRANSCRIBE_BACKEND", "openai").lower()
+LOCAL_MODEL = os.getenv("VOICE_LOCAL_MODEL", "base")
+LOCAL_COMPUTE_TYPE = os.getenv("VOICE_LOCAL_COMPUTE_TYPE", "int8")
+
+# Transcripts of earlier voice notes, by Telegram file_unique_id and by audio hash,
+# so forwarded or re-sent notes skip the download and/or Whisper; 30 days, ~5 MB
+VOICE_CACHE_TTL = int(os.getenv("VOICE_CACHE_TTL", 30 * 86400))
+VOICE_CACHE_MAX_BYTES = int(float(os.getenv("VOICE_CACHE_MAX_MB", 5)) * 1024 * 1024)
+
+STAGES = ("download", "transcribe", "handle")
+
+_cache = DiskCache("transcripts", ttl=VOICE_CACHE_TTL, max_bytes=VOICE_CACHE_MAX_BYTES)
+
+def cached_transcript(file_unique_id=None, voice_data=None):
+    """Transcript of a note seen before, looked up by file_unique_id and then by content hash. None on a miss."""
+    if file_unique_id:
+        text = _cache.get({"file_unique_id": file_unique_id})
+        if text:
+            return text
+    if voice_data:
+        return _cache.get({"sha256": hashlib.sha256(voice_data).hexdigest()})
+    return None
+
+def remember_transcript(text, file_unique_id=None, voice_data=None):
+    if file_unique_id:
+        _cache.set({"file_unique_id": file_unique_id}, text)
+    if voice_data:
+        _cache.set({"sha256": hashlib.sha256(voice_data).hexdigest()}, text)
+
+def clear_cache():
+    _cache.clear()
+
+_local_model = None
+_local_model_lock = threading.Lock()
+
+def get_local_model():
+    """The faster-whisper model, loaded once per process. None if faster-whisper isn't installed."""
+    global _local_model
+    with _local_model_lock:
+        if _local_model is None:
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                print("faster-whisper is not installed; using OpenAI Whisper for voice messages")
+                return None
+            started = time.perf_counter()
+            _local_model = WhisperModel(LOCAL_MODEL, device="cpu", compute_type=LOCAL_COMPUTE_TYPE)
+            print(f"Loaded faster-whisper '{LOCAL_MODEL}' in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return _local_model
+
+def transcribe_local(voice_data):
+    """Transcribes audio bytes on the CPU with faster-whisper. None if unavailable or on failure."""
+    model = get_local_model()
+    if model is None:
+        return None
+    try:
+        # Greedy decoding and VAD keep short voice notes fast on a CPU
+        segments, _ = model.transcribe(io.BytesIO(voice_data), beam_size=1, vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments).strip() or None
+    except Exception as e:
+        print(f"Error transcribing voice locally: {e}")
+        return None
+
+class VoicePipeline:
+    """
+    Download -> transcribe -> handle for voice messages, run on a small worker
+    pool. `download(file_id)`, `transcribe(bytes)` and `handle(text, chat_id)`
+    are injected; `progress(chat_id, title)` builds the status message that is
+    edited into the transcript. Notes over `max_bytes` are refused up front.
+    Each job records per-stage timings, kept for stats(). With `use_cache`,
+    transcripts are reused for notes whose file_unique_id or audio was seen before.
+
+    Work is queued per chat: one chat's voice notes (and any text commands
+    passed to run_in_order() behind them) run one at a time and in arrival
+    order, while different chats run in parallel.
+    """
+
+    def __init__(self, download, transcribe, handle, progress, workers=VOICE_WORKERS, max_bytes=VOICE_MAX_BYTES, history=100, use_cache=True):
+        self.download = download
+        self.transcribe = transcribe
+        self.handle = handle
+        self.progress = progress
+        self.max_bytes = max_bytes
+        self.use_cache = use_cache
+        self.cache_hits = 0
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="voice")
+        self.timings = deque(maxlen=history)
+        self._pending = set()
+        self._chat_queues = {}  # chat_id -> deque of (fn, args, future)
+        self._lock = threading.Lock()
+
+    def submit(self, chat_id, voice):
+        """Queues a voice message. Returns a Future with the process() result."""
+        return self._enqueue(chat_id, self.process, (chat_id, voice))
+
+    def run_in_order(self, chat_id, fn, *args):
+        """
+        Runs fn(*args) after the chat's queued voice notes, or right away (in
+        this thread) when there are none. Call it from the thread that submits,
+        so nothing can be queued for the chat between the check and the call.
+        """
+        with self._lock:
+            busy = str(chat_id) in self._chat_queues
+        if busy:
+            return self._enqueue(chat_id, fn, args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def _enqueue(self, chat_id, fn, args):
+        future = Future()
+        key = str(chat_id)
+        with self._lock:
+            queue = self._chat_queues.setdefault(key, deque())
+            queue.append((fn, args, future))
+            idle = len(queue) == 1
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        if idle:
+            self.executor.submit(self._drain, key)
+        return future
+
+    def _drain(self, key):
+        # One worker owns a chat until its queue is empty, which keeps per-chat order
+        while True:
+            with self._lock:
+                fn, args, future = self._chat_queues[key][0]
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                print(f"Voice pipeline job failed: {e}")
+                future.set_exception(e)
+            with self._lock:
+                queue = self._chat_queues[key]
+                queue.popleft()
+                if not queue:
+                    del self._chat_queues[key]
+                    return
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+
+    def join(self, timeout=None):
+        """Waits for every queued voice message to finish."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return True
+            for future in pending:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                try:
+                    future.result(timeout=remaining)
+                except Exception:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return False
+
+    def process(self, chat_id, voice):
+        timings = {}
+        progress = self.progress(chat_id, "🎙️ _Transcribing your voice message..._").start()
+        try:
+            size = voice.get("file_size") or 0
+            if size > self.max_bytes:
+                progress.finish(f"❌ That voice message is too large ({size / 1_048_576:.1f} MB, limit {self.max_bytes / 1_048_576:.0f} MB).")
+                return {"status": "error", "message": "Voice message over the size limit", "timings": timings}
+
+            file_unique_id = voice.get("file_unique_id")
+            transcribed_text = cached_transcript(file_unique_id) if self.use_cache else None
+            if not transcribed_text:
+                started = time.perf_counter()
+                voice_content = self.download(voice["file_id"])
+                timings["download"] = time.perf_counter() - started
+                if not voice_content:
+                    progress.finish("❌ Sorry, I couldn't download your voice message.")
+                    return {"status": "error", "message": "Download failed", "timings": timings}
+
+                transcribed_text = cached_transcript(voice_data=voice_content) if self.use_cache else None
+                if not transcribed_text:
+                    started = time.perf_counter()
+                    transcribed_text = self.transcribe(voice_content)
+                    timings["transcribe"] = time.perf_counter() - started
+                    if not transcribed_text:
+                        progress.finish("❌ Sorry, I couldn't transcribe your voice message.")
+                        return {"status": "error", "message": "Transcription failed", "timings": timings}
+                if self.use_cache:
+                    remember_transcript(transcribed_text, file_unique_id, voice_content)
+            if "transcribe" not in timings:
+                with self._lock:
+                    self.cache_hits += 1
+                print(f"Voice transcript cache hit ({'file' if 'download' not in timings else 'audio hash'})")
+
+            print(f"Transcribed: {transcribed_text}")
+            progress.finish(f"📝 _Transcribed_: \"{transcribed_text}\"")
+            started = time.perf_counter()
+            self.handle(transcribed_text, chat_id)
+            timings["handle"] = time.perf_counter() - started
+            return {"status": "success", "message": transcribed_text, "timings": timings}
+        except Exception as e:
+            print(f"Error processing voice message: {e}")
+            progress.finish(f"⚠️ An error occurred while processing your voice message: {e}")
+            return {"status": "error", "message": str(e), "timings": timings}
+        finally:
+            self.timings.append(timings)
+            print("Voice pipeline timings: " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
+
+    def stats(self):
+        """Median and max milliseconds per stage over recent voice messages."""
+        recent = list(self.timings)
+        result = {"backend": TRANSCRIBE_BACKEND, "messages": len(recent), "cache_hits": self.cache_hits, "stages": {}}
+        for stage in STAGES:
+            samples = [t[stage] * 1000 for t in recent if stage in t]
+            if samples:
+                result["stages"][stage] = {"median_ms": round(statistics.median(samples)), "max_ms": round(max(samples)), "count": len(samples)}
+        return result
@@ -0,0 +1,40 @@
+import time
+import tool_registry
+
+# Container start-up work, split by whether it is safe to capture in a Modal
+# memory snapshot. prime() must not open sockets or read secrets-dependent
+# state that changes between restores; prewarm_clients() runs after every restore.
+
+def prime():
+    """Imports every agent module and builds pure in-memory indexes. Snapshot-safe."""
+    started = time.perf_counter()
+    failed = tool_registry.load_all()
+    import gazetteer
+    gazetteer._get_index()
+    print(f"Primed modules in {(time.perf_counter() - started) * 1000:.0f} ms" + (f" (failed: {failed})" if failed else ""))
+    return failed
+
+def prewarm_clients():
+    """Creates the long-lived API clients so the first request doesn't pay for them."""
+    started = time.perf_counter()
+    import blog_agent
+    import image_agent
+    import faceless_video_agent
+    import stripe_utils
+    import voice_pipeline
+    clients = [
+        ("blog_agent.openai", blog_agent.get_openai_client),
+        ("blog_agent.tavily", blog_agent.get_tavily_client),
+        ("image_agent.openai", image_agent.get_openai_client),
+        ("faceless_video_agent.openai", faceless_video_agent.get_openai_client),
+        ("stripe_utils.entitlements", stripe_utils.get_store),
+    ]
+    if voice_pipeline.TRANSCRIBE_BACKEND == "local":
+        # May fetch model weights on first use, so it stays out of the snapshot
+        clients.append(("voice_pipeline.local_model", voice_pipeline.get_local_model))
+    for name, create in clients:
+        try:
+            create()
+        except Exception as e:
+            print(f"Prewarm of {name} failed: {e}")
+    print(f"Prewarmed clients in {(time.perf_counter() - started) * 1000:.0f} ms")
@@ -2,6 +2,8 @@ import os
 import requests
 import logging
 from openai import OpenAI
+import gazetteer
+from ttl_cache import TTLCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -9,6 +11,13 @@ logger = logging.getLogger(__name__)
 
 OPENWEATHER_BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
 
+# OpenWeather refreshes current conditions roughly every 10 minutes
+WEATHER_CACHE_TTL = int(os.getenv("WEATHER_CACHE_TTL", 600))
+# Serve expired entries (up to another TTL) while refreshing in the background
+WEATHER_CACHE_SWR = os.getenv("WEATHER_CACHE_SWR", "false").lower() == "true"
+
+_weather_cache = TTLCache(ttl=WEATHER_CACHE_TTL, stale_while_revalidate=WEATHER_CACHE_SWR)
+
 def get_openai_client():
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
@@ -52,13 +61,28 @@ def get_weather(city_query, units="metric"):
     
     city_query = str(city_query).strip()
     
-    # Extract clean city name if query looks like a sentence (contains spaces)
-    if " " in city_query:
+    # Resolve the city from the bundled gazetteer first (no network call);
+    # only sentences it can't resolve unambiguously go to the LLM
+    city = gazetteer.resolve_city(city_query)
+    if city:
+        city_name = f"{city['name']},{city['country']}"
+        logger.info(f"Resolved city '{city_name}' locally from query '{city_query}'")
+    elif " " in city_query:
         city_name = extract_city(city_query)
         logger.info(f"Extracted city '{city_name}' from query '{city_query}'")
     else:
         city_name = city_query
 
+    # Cached per city and units; concurrent misses share one upstream call
+    cache_key = (city_name.casefold(), units)
+    return _weather_cache.get_or_load(
+        cache_key,
+        lambda: fetch_weather(city_name, units, api_key),
+        cacheable=lambda result: "error" not in result
+    )
+
+def fetch_weather(city_name, units, api_key):
+    """Call OpenWeatherMap for one city. Returns the API JSON or an {"error": ...} dict."""
     params = {
         "q": city_name,
         "appid": api_key,
@@ -66,14 +90,7 @@ def get_weather(city_query, units="metric"):
     }
     
     try:
-        response = requests.get(OPENWEATHER_BASE_URL, params=params)
-        
-        # If 404 and we haven't tried extraction yet (e.g. single word query that failed), try extraction
-        if response.status_code == 404 and city_name == city_query and " " not in city_query:
-             # It might be a single word that isn't a city but implies one, or just a typo. 
-             # For now, let's just return the error, but we could add more logic here.
-             pass
-
+        response = requests.get(OPENWEATHER_BASE_URL, params=params, timeout=10)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.HTTPError as e:
@@ -84,3 +101,10 @@ def get_weather(city_query, units="metric"):
     except requests.exceptions.RequestException as e:
         logger.error(f"Error calling OpenWeatherMap API: {e}")
         return {"error": str(e)}
+
+def get_cache_stats():
+    """Hit ratio and upstream latency of the weather cache."""
+    stats = _weather_cache.stats()
+    stats["ttl_seconds"] = WEATHER_CACHE_TTL
+    stats["stale_while_revalidate"] = WEATHER_CACHE_SWR
+    return stats
@@ -1,7 +1,14 @@
 import os
+import re
+import json
+import time
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, wait
 from tavily import TavilyClient
 import logging
 from openai import OpenAI
+import research_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,9 +38,10 @@ def search_web(query, max_results=5, include_answer=True):
     
     try:
         # Performing the search
-        response = tavily.search(
-            query=query, 
-            search_depth="basic", 
+        response = research_cache.cached_search(
+            tavily,
+            query,
+            search_depth="basic",
             max_results=max_results,
             include_answer=include_answer
         )
@@ -66,3 +74,175 @@ def search_web(query, max_results=5, include_answer=True):
     except Exception as e:
         logger.error(f"Error searching web: {e}")
         return {"error": str(e)}
+
+# Research mode defaults
+RESEARCH_SUB_QUERIES = 4
+RESEARCH_DEADLINE_SECONDS = 25
+RESEARCH_CONTEXT_TOKENS = 3000
+
+def research_web(query, num_queries=RESEARCH_SUB_QUERIES, max_results=5,
+                 deadline=RESEARCH_DEADLINE_SECONDS, context_tokens=RESEARCH_CONTEXT_TOKENS):
+    """
+    Research mode: expand the question into several sub-queries, search them
+    concurrently, dedupe the merged results by URL and content, and summarize
+    over a token-budgeted context.
+    The whole run is bounded by one wall-clock `deadline` (seconds); searches
+    still running when their share of it is used up are dropped.
+    """
+    started = time.monotonic()
+    deadline_at = started + deadline
+    # Keep part of the budget for the final summary
+    search_deadline_at = deadline_at - min(8, deadline * 0.4)
+
+    tavily = get_tavily_client()
+    if not tavily:
+        return {"error": "Tavily API key not configured"}
+    openai = get_openai_client()
+
+    sub_queries = expand_query(openai, query, num_queries, timeout=max(1, (search_deadline_at - time.monotonic()) / 2))
+    logger.info(f"Research sub-queries for '{query}': {sub_queries}")
+
+    executor = ThreadPoolExecutor(max_workers=len(sub_queries))
+    futures = {
+        executor.submit(research_cache.cached_search, tavily, q, search_depth="basic", max_results=max_results): q
+        for q in sub_queries
+    }
+    done, not_done = wait(futures, timeout=max(0, search_deadline_at - time.monotonic()))
+    # Don't wait for stragglers; they finish in the background and still warm the cache
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    raw_results = []
+    failed = []
+    for future in done:
+        try:
+            raw_results.extend(future.result().get("results", []))
+        except Exception as e:
+            logger.error(f"Research sub-query '{futures[future]}' failed: {e}")
+            failed.append(futures[future])
+    timed_out = [futures[f] for f in not_done]
+    if timed_out:
+        logger.warning(f"Research deadline reached, dropped sub-queries: {timed_out}")
+
+    if not raw_results:
+        return {"error": "No search results returned before the deadline.", "sub_queries": sub_queries}
+
+    results = dedupe_results(raw_results)
+    context_str, used = build_context(results, context_tokens)
+
+    response = {
+        "query": query,
+        "sub_queries": sub_queries,
+        "timed_out_queries": timed_out,
+        "failed_queries": failed,
+        "results": results,
+        "context_results": used,
+    }
+
+    remaining = deadline_at - time.monotonic()
+    if openai and remaining > 1:
+        try:
+            completion = openai.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a helpful research assistant. Combine the following search results into a concise answer to the original question. Mention conflicting information if any."},
+                    {"role": "user", "content": f"Question: {query}\n\nSearch Results:\n{context_str}"}
+                ],
+                timeout=remaining
+            )
+            response['ai_summary'] = completion.choices[0].message.content
+        except Exception as e:
+            logger.error(f"Error summarizing research with OpenAI: {e}")
+            response['ai_summary'] = "Could not generate summary due to an error."
+    elif openai:
+        response['ai_summary'] = "Research deadline reached before a summary could be generated."
+
+    response['elapsed_seconds'] = round(time.monotonic() - started, 2)
+    return response
+
+def expand_query(openai, query, num_queries=RESEARCH_SUB_QUERIES, timeout=10):
+    """Ask the LLM for sub-queries covering different angles of the question. Always includes the original query."""
+    if not openai or num_queries <= 1:
+        return [query]
+
+    try:
+        completion = openai.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": f"You write web search queries. Break the user's question into at most {num_queries - 1} short, distinct search queries that cover different angles of it. Output JSON: {{\"queries\": [\"...\"]}}"},
+                {"role": "user", "content": query}
+            ],
+            response_format={"type": "json_object"},
+            timeout=timeout
+        )
+        extra = json.loads(completion.choices[0].message.content).get("queries", [])
+    except Exception as e:
+        logger.error(f"Error expanding research query: {e}")
+        extra = []
+
+    queries = [query]
+    seen = {_query_words(query)}
+    for q in extra:
+        norm = _query_words(q) if isinstance(q, str) else ""
+        if norm and norm not in seen:
+            seen.add(norm)
+            queries.append(q.strip())
+    return queries[:num_queries]
+
+def _query_words(query):
+    """Looser than the cache key: sub-queries differing only in punctuation are duplicates."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.casefold()).split())
+
+def normalize_url(url):
+    """Canonical form of a URL for deduplication (no scheme, www, fragment, tracking params or trailing slash)."""
+    parts = urlsplit(str(url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_")])
+    return urlunsplit(("", host, parts.path.rstrip("/"), query, ""))
+
+def content_hash(text):
+    """Hash of the whitespace/case-normalized text, or None when there is no content to compare."""
+    normalized = re.sub(r"\s+", " ", str(text or "")).strip().casefold()
+    if not normalized:
+        return None
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+def dedupe_results(results):
+    """Merge results from several queries: one per URL and per content, best score first."""
+    ranked = sorted(results, key=lambda r: r.get("score") or 0, reverse=True)
+    seen_urls = set()
+    seen_content = set()
+    unique = []
+    for r in ranked:
+        url_key = normalize_url(r.get("url"))
+        body_key = content_hash(r.get("content"))
+        if (url_key and url_key in seen_urls) or (body_key and body_key in seen_content):
+            continue
+        seen_urls.add(url_key)
+        seen_content.add(body_key)
+        unique.append(r)
+    return unique
+
+def estimate_tokens(text):
+    # ~4 characters per token for English text
+    return len(text) // 4 + 1
+
+def build_context(results, max_tokens=RESEARCH_CONTEXT_TOKENS):
+    """Pack results into a context string of at most ~max_tokens tokens. Returns (context, results_used)."""
+    parts = []
+    used = []
+    budget = max_tokens
+    for r in results:
+        block = f"Source: {r.get('title')} ({r.get('url')})\nContent: {r.get('content')}"
+        cost = estimate_tokens(block)
+        if cost > budget:
+            # Fit a truncated version of the last source if there is meaningful room left
+            if budget >= 100:
+                parts.append(block[:budget * 4])
+                used.append(r)
+            break
+        parts.append(block)
+        used.append(r)
+        budget -= cost
+    return "\n\n".join(parts), used
@@ -46,6 +46,19 @@ volume = modal.Volume.from_name("personal-ai-memory", create_if_missing=True)
 app = modal.App("personal-ai-assistant")
 secrets = [modal.Secret.from_dotenv()]
 
+APP_DIR = "/root/app"
+# Containers kept running for the web app / Telegram webhook (0 = scale to zero)
+WEB_MIN_CONTAINERS = int(os.getenv("WEB_MIN_CONTAINERS", 1))
+# Modal's maximum; longer than the 15 min schedule, so one automation container serves every tick
+AUTOMATION_SCALEDOWN_WINDOW = 20 * 60
+
+def _bootstrap():
+    """Make the project importable the same way `python server.py` does."""
+    for path in (APP_DIR, os.path.join(APP_DIR, "implementation")):
+        if path not in sys.path:
+            sys.path.append(path)
+    os.chdir(APP_DIR)
+
 @app.function(
     image=image,
     secrets=secrets,
@@ -57,39 +70,91 @@ def run_bot():
     print("Starting Antigravity Telegram Bot...")
     sys.path.append("/root/app")
     os.chdir("/root/app")
+    # Scheduled jobs belong to the Automations container (automation_trigger)
+    os.environ["BOT_RUN_AUTOMATIONS"] = "false"
     
     from implementation import telegram_agent
     telegram_agent.main()
 
-@app.function(
+@app.cls(
     image=image,
     secrets=secrets,
     volumes={"/root/app/memory": volume},
+    enable_memory_snapshot=True,
+    min_containers=WEB_MIN_CONTAINERS,
 )
-@modal.wsgi_app()
-def web():
-    """Run the Flask API."""
-    sys.path.append("/root/app")
-    os.chdir("/root/app")
-    
-    from server import app as flask_app
-    return flask_app
+class Web:
+    """Flask API and Telegram webhook."""
 
-@app.function(
+    @modal.enter(snap=True)
+    def load(self):
+        # Runs once, before the memory snapshot: every import lands in the snapshot,
+        # so restored containers skip them. No network calls here.
+        _bootstrap()
+        from server import app as flask_app
+        import warmup
+        warmup.prime()
+        self.flask_app = flask_app
+
+    @modal.enter(snap=False)
+    def connect(self):
+        # Runs after every start/restore: anything holding sockets or credentials
+        import time
+        import server
+        import warmup
+        server.STARTED_AT = time.time()  # otherwise /api/health reports the snapshot's age
+        warmup.prewarm_clients()
+
+    # Pinned label keeps the URL the Telegram webhook points at (see set_webhook.py)
+    @modal.wsgi_app(label="personal-ai-assistant-web-app")
+    def web(self):
+        return self.flask_app
+
+@app.cls(
     image=image,
     secrets=secrets,
     volumes={"/root/app/memory": volume},
+    enable_memory_snapshot=True,
+    scaledown_window=AUTOMATION_SCALEDOWN_WINDOW,
+)
+class Automations:
+    """Morning/evening jobs and urgent alerts, run from a warm (or snapshot-restored) container."""
+
+    @modal.enter(snap=True)
+    def load(self):
+        _bootstrap()
+        import telegram_agent
+        import warmup
+        warmup.prime()
+        self.telegram_agent = telegram_agent
+
+    @modal.enter(snap=False)
+    def connect(self):
+        import warmup
+        warmup.prewarm_clients()
+
+    @modal.method()
+    def check(self, chat_id):
+        # The container outlives a single run, so pick up state written by the bot and web containers
+        volume.reload()
+        try:
+            self.telegram_agent.check_automations(chat_id)
+        finally:
+            volume.commit()
+
+@app.function(
+    image=image,
+    secrets=secrets,
     schedule=modal.Period(minutes=15),
 )
 def automation_trigger():
     """Periodic trigger for morning/evening jobs and urgent alerts."""
-    sys.path.append("/root/app")
-    os.chdir("/root/app")
-    from implementation import telegram_agent
+    # Schedules can only target functions; this one imports nothing from the
+    # project and hands off to the long-lived Automations container.
     chat_id = os.getenv("TELEGRAM_CHAT_ID")
     if chat_id:
         print(f"Running scheduled automation check for {chat_id}...")
-        telegram_agent.check_automations(str(chat_id))
+        Automations().check.remote(str(chat_id))
     else:
         print("TELEGRAM_CHAT_ID not set, skipping automation check.")
 
@@ -98,5 +163,4 @@ if __name__ == "__main__":
     print("Deployment Commands:")
     print("1. Deploy Telegram Bot: modal run modal_app.py::run_bot")
     print("2. Deploy Web App:      modal deploy modal_app.py")
-
-
+    print("3. Cold-start check:    python benchmark_cold_start.py --url <web endpoint>")
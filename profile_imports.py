@@ -0,0 +1,77 @@
+"""
+Import-time profile for the web server and the Telegram agent.
+
+Runs each entry point in a fresh interpreter with `python -X importtime`, once
+with lazy agent imports (the default) and once with EAGER_IMPORTS=true (the old
+import-everything-at-startup behaviour), and prints the totals plus the slowest
+top-level packages.
+
+Usage: python profile_imports.py [--top 10] [--runs 3]
+"""
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+TARGETS = {
+    "server": (ROOT, "import server"),
+    "telegram_agent": (os.path.join(ROOT, "implementation"), "import telegram_agent"),
+}
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(\S+)")
+
+def profile(cwd, statement, eager):
+    """Returns (total_us, {top-level package: cumulative_us}) for one fresh import."""
+    env = dict(os.environ, EAGER_IMPORTS="true" if eager else "false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    packages, total = {}, 0
+    entry = statement.split()[-1]
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = int(match.group(1)), int(match.group(2)), match.group(3)
+        total += self_us
+        top = name.split(".")[0]
+        # A package's first (outermost) import carries the cost of everything under it
+        if top != entry:
+            packages[top] = max(packages.get(top, 0), cumulative_us)
+    return total, packages
+
+def best_of(cwd, statement, eager, runs):
+    samples = [profile(cwd, statement, eager) for _ in range(runs)]
+    return min(samples, key=lambda sample: sample[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare import time with lazy vs eager agent loading.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list per run.")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per mode (best run is reported).")
+    args = parser.parse_args()
+
+    for target, (cwd, statement) in TARGETS.items():
+        print(f"== {target} ==")
+        totals = {}
+        for label, eager in (("eager (before)", True), ("lazy (after)", False)):
+            try:
+                total, packages = best_of(cwd, statement, eager, args.runs)
+            except RuntimeError as e:
+                print(f"{label}: import failed: {e}")
+                continue
+            totals[label] = total
+            print(f"{label}: {total / 1000:.0f} ms")
+            for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+                print(f"    {micros / 1000:8.1f} ms  {name}")
+        if len(totals) == 2:
+            before, after = totals["eager (before)"], totals["lazy (after)"]
+            print(f"saved {((before - after) / 1000):.0f} ms ({(before - after) / before:.0%})")
+        print()
+
+if __name__ == "__main__":
+    main()
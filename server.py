@@ -1,6 +1,9 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
 import sys
 import os
+import json
+import time
+import traceback
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,25 +11,29 @@ load_dotenv()
 # Add implementation folder to path so we can import modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'implementation')))
 
-import google_mail
-import google_calendar
-import generate_mock_leads
-import scrape_apify
-import web_agent
-import chat_agent
-import weather_agent
-import blog_agent
-import image_agent
-import search_image_agent
-import search_image_agent
-import stripe_utils
-import faceless_video_agent
-import google_contacts
-import verify_google_creds
-import clickup_agent
-from telegram_agent import handle_command, ALLOWED_CHAT_ID, download_telegram_file, transcribe_voice, send_message
+# Agents (and their SDKs) are imported on the first request that uses them
+import tool_registry
+from tool_registry import lazy_import
+google_mail = lazy_import("google_mail")
+google_calendar = lazy_import("google_calendar")
+generate_mock_leads = lazy_import("generate_mock_leads")
+scrape_apify = lazy_import("scrape_apify")
+lead_search_cache = lazy_import("lead_search_cache")
+web_agent = lazy_import("web_agent")
+chat_agent = lazy_import("chat_agent")
+weather_agent = lazy_import("weather_agent")
+blog_agent = lazy_import("blog_agent")
+image_agent = lazy_import("image_agent")
+search_image_agent = lazy_import("search_image_agent")
+stripe_utils = lazy_import("stripe_utils")
+faceless_video_agent = lazy_import("faceless_video_agent")
+google_contacts = lazy_import("google_contacts")
+verify_google_creds = lazy_import("verify_google_creds")
+clickup_agent = lazy_import("clickup_agent")
+from telegram_agent import handle_command, ALLOWED_CHAT_ID, send_message, get_voice_pipeline
 
 app = Flask(__name__)
+STARTED_AT = time.time()
 
 # Ensure token.json is accessible to the imported modules (they expect it in CWD)
 # In this simple setup, we assume server.py is running from the project root.
@@ -35,6 +42,15 @@ app = Flask(__name__)
 def index():
     return render_template('index.html')
 
+@app.route('/api/health', methods=['GET'])
+def health():
+    # Cheap on purpose: used to measure time to first response on a cold container
+    return jsonify({
+        'status': 'ok',
+        'uptime_seconds': round(time.time() - STARTED_AT, 3),
+        'modules': tool_registry.status()
+    })
+
 # --- MAIL ENDPOINTS ---
 
 @app.route('/api/mail/list', methods=['GET'])
@@ -164,12 +180,52 @@ def search_leads():
             return jsonify({'status': 'error', 'message': str(e)}), 500
     else:
         try:
-            # We aren't passing size/industry/email_status from UI yet, so defaults apply
-            leads = scrape_apify.scrape_leads(query=query, location=location, limit=limit)
-            return jsonify({'status': 'success', 'leads': leads})
+            result = lead_search_cache.search_leads(
+                query=query,
+                location=location,
+                limit=limit,
+                size=request.args.get('size'),
+                industry=request.args.get('industry'),
+                email_status=request.args.get('email_status'),
+                force_refresh=request.args.get('force_refresh', default='false').lower() == 'true'
+            )
+            return jsonify({'status': 'success', 'leads': result['leads'], 'cache': result['cache']})
         except Exception as e:
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/leads/start', methods=['GET', 'POST'])
+def start_leads_run():
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    query = data.get('query', 'CEO')
+    location = data.get('location', 'United States')
+    try:
+        limit = int(data.get('limit', 10))
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'limit must be an integer'}), 400
+    try:
+        handle = scrape_apify.start_scrape(
+            query=query,
+            location=location,
+            limit=limit,
+            size=data.get('size'),
+            industry=data.get('industry'),
+            email_status=data.get('email_status')
+        )
+        return jsonify({'status': 'success', 'run': handle})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@app.route('/api/leads/run/<run_id>', methods=['GET'])
+def poll_leads_run(run_id):
+    # Returns leads from `offset` on; poll again with next_offset until done
+    offset = request.args.get('offset', default=0, type=int)
+    limit = request.args.get('limit', default=10, type=int)
+    try:
+        result = scrape_apify.poll_run(run_id, offset=offset, limit=limit)
+        return jsonify({'status': 'success', 'run_id': run_id, **result})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 # --- WEB AGENT ENDPOINTS ---
 
 @app.route('/api/web/search', methods=['GET', 'POST'])
@@ -177,13 +233,19 @@ def web_search():
     if request.method == 'POST':
         data = request.json
         query = data.get('query')
+        mode = data.get('mode', 'search')
     else:
         query = request.args.get('query')
+        mode = request.args.get('mode', 'search')
     
     if not query:
         return jsonify({'error': 'Query parameter is required'}), 400
-        
-    result = web_agent.search_web(query)
+
+    # mode=research expands the query into parallel sub-queries (slower, broader)
+    if mode == 'research':
+        result = web_agent.research_web(query)
+    else:
+        result = web_agent.search_web(query)
     return jsonify(result)
 
 # --- CHAT AGENT ENDPOINTS ---
@@ -195,6 +257,22 @@ def chat_completions():
     if not messages:
         return jsonify({'error': 'Messages are required'}), 400
     
+    # stream=true returns Server-Sent Events with OpenAI-style delta chunks, ending with [DONE]
+    if data.get('stream'):
+        def generate():
+            try:
+                for delta in chat_agent.stream_chat_openai(messages):
+                    yield f"data: {json.dumps({'choices': [{'delta': {'content': delta}}]})}\n\n"
+            except Exception as e:
+                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
     result = chat_agent.chat_openai(messages)
     return jsonify(result)
 
@@ -209,6 +287,10 @@ def get_weather():
     result = weather_agent.get_weather(city)
     return jsonify(result)
 
+@app.route('/api/weather/stats', methods=['GET'])
+def weather_cache_stats():
+    return jsonify(weather_agent.get_cache_stats())
+
 # --- BLOG AGENT ENDPOINTS ---
 
 @app.route('/api/blog/generate', methods=['POST'])
@@ -292,6 +374,26 @@ def subscription_checkout():
     else:
         return jsonify({'status': 'error', 'message': 'Could not create checkout session'}), 500
 
+@app.route('/api/subscription/stats', methods=['GET'])
+def subscription_cache_stats():
+    return jsonify(stripe_utils.get_cache_stats())
+
+@app.route('/api/voice/stats', methods=['GET'])
+def voice_pipeline_stats():
+    return jsonify(get_voice_pipeline().stats())
+
+@app.route('/api/stripe/webhook', methods=['POST'])
+def stripe_webhook():
+    # Signature is computed over the raw body, so don't let Flask parse it first
+    payload = request.get_data()
+    sig_header = request.headers.get('Stripe-Signature', '')
+    try:
+        result = stripe_utils.handle_webhook(payload, sig_header)
+    except ValueError as e:
+        print(f"Rejected Stripe webhook: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    return jsonify(result)
+
 # --- FACELESS VIDEO ENDPOINTS ---
 
 @app.route('/api/video/generate', methods=['POST'])
@@ -363,6 +465,20 @@ def create_clickup_task():
     result = clickup_agent.create_task(list_id, name, description)
     return jsonify(result)
 
+@app.route('/api/clickup/create_bulk', methods=['POST'])
+def create_clickup_tasks():
+    data = request.json
+    list_id = data.get('list_id')
+    if not list_id or list_id == "0":
+        list_id = os.getenv("CLICKUP_LIST_ID")
+
+    tasks = data.get('tasks') or []
+    if not list_id or not tasks:
+        return jsonify({'error': 'List ID and a non-empty tasks list are required (and CLICKUP_LIST_ID is not set in .env)'}), 400
+
+    result = clickup_agent.create_tasks(list_id, tasks)
+    return jsonify(result)
+
 @app.route('/api/clickup/list/<list_id>', methods=['GET'])
 def list_clickup_tasks(list_id):
     if not list_id or list_id == "0":
@@ -371,7 +487,13 @@ def list_clickup_tasks(list_id):
     if not list_id:
          return jsonify({'status': 'error', 'message': 'No List ID provided and CLICKUP_LIST_ID not set.'}), 400
 
-    result = clickup_agent.list_tasks(list_id)
+    result = clickup_agent.list_tasks(
+        list_id,
+        status=request.args.get('status'),
+        refresh=request.args.get('refresh', default='false').lower() == 'true',
+        include_closed=request.args.get('include_closed', default='false').lower() == 'true',
+        include_subtasks=request.args.get('subtasks', default='false').lower() == 'true'
+    )
     return jsonify(result)
 
 @app.route('/api/clickup/search', methods=['GET'])
@@ -384,7 +506,12 @@ def search_clickup_tasks():
     if not list_id:
         return jsonify({'status': 'error', 'message': 'No List ID provided and CLICKUP_LIST_ID not set.'}), 400
 
-    result = clickup_agent.search_tasks(list_id, query)
+    result = clickup_agent.search_tasks(
+        list_id, query,
+        status=request.args.get('status'),
+        include_closed=request.args.get('include_closed', default='false').lower() == 'true',
+        include_subtasks=request.args.get('subtasks', default='false').lower() == 'true'
+    )
     return jsonify(result)
 
 @app.route('/api/auth/google', methods=['GET'])
@@ -422,22 +549,10 @@ def telegram_webhook():
             return jsonify({"status": "forbidden"}), 403
 
         if voice:
+            # Handled inside the request: Modal may scale a container down once it
+            # has answered, and Telegram won't redeliver an update that got a 200
             print(f"Webhook received voice message from {chat_id}")
-            send_message(chat_id, "🎙️ _Transcribing your voice message..._")
-            
-            file_id = voice["file_id"]
-            voice_content = download_telegram_file(file_id)
-            
-            if voice_content:
-                transcribed_text = transcribe_voice(voice_content)
-                if transcribed_text:
-                    print(f"Transcribed: {transcribed_text}")
-                    send_message(chat_id, f"📝 _Transcribed_: \"{transcribed_text}\"")
-                    handle_command(transcribed_text, chat_id)
-                else:
-                    send_message(chat_id, "❌ Sorry, I couldn't transcribe your voice message.")
-            else:
-                send_message(chat_id, "❌ Sorry, I couldn't download your voice message.")
+            get_voice_pipeline().process(chat_id, voice)
         
         elif text:
             print(f"Webhook received message: {text}")
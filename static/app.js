@@ -626,6 +626,12 @@ document.getElementById('leads-form').addEventListener('submit', async (e) => {
                     `;
                     listContainer.appendChild(item);
                 });
+                if (data.cache && data.cache.hit) {
+                    const note = document.createElement('div');
+                    note.className = 'placeholder-text';
+                    note.textContent = `Cached results from ${Math.round(data.cache.age_seconds / 60)} min ago`;
+                    listContainer.appendChild(note);
+                }
             }
         } else {
             listContainer.innerHTML = `<div class="loading">Error: ${data.message}</div>`;
@@ -724,21 +730,52 @@ document.getElementById('chat-form').addEventListener('submit', async (e) => {
         const response = await fetch('/api/chat/completions', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ messages: messages })
+            body: JSON.stringify({ messages: messages, stream: true })
         });
-        const data = await response.json();
 
-        if (data.choices && data.choices.length > 0) {
-            const reply = data.choices[0].message.content;
-            addChatMessage(reply, 'bot');
+        if (!response.ok || !response.body) {
+            const data = await response.json();
+            addChatMessage(`Error: ${data.error || 'Received empty response.'}`, 'bot');
+            return;
+        }
+
+        // Read Server-Sent Events and grow the bot message as tokens arrive
+        const botDiv = addChatMessage('…', 'bot');
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let reply = '';
+        let error = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            for (const event of events) {
+                const payload = event.replace(/^data: /, '');
+                if (payload === '[DONE]') continue;
+                const data = JSON.parse(payload);
+                if (data.error) {
+                    error = data.error;
+                } else if (data.choices && data.choices[0].delta.content) {
+                    reply += data.choices[0].delta.content;
+                    botDiv.innerText = reply;
+                    botDiv.parentElement.scrollTop = botDiv.parentElement.scrollHeight;
+                }
+            }
+        }
 
+        if (error) {
+            botDiv.innerText = reply ? `${reply}\n\nError: ${error}` : `Error: ${error}`;
+        } else if (!reply) {
+            botDiv.innerText = "Error: Received empty response.";
+        } else {
             // Update local history
             chatHistory.push({ role: "user", content: message });
             chatHistory.push({ role: "assistant", content: reply });
-        } else if (data.error) {
-            addChatMessage(`Error: ${data.error}`, 'bot');
-        } else {
-            addChatMessage("Error: Received empty response.", 'bot');
         }
     } catch (error) {
         addChatMessage(`Network Error: ${error}`, 'bot');
@@ -754,6 +791,7 @@ function addChatMessage(text, sender) {
     div.innerText = text;
     container.appendChild(div);
     container.scrollTop = container.scrollHeight;
+    return div;
 }
 
 // --- WEATHER AGENT LOGIC ---
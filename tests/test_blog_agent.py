@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace blog_agent with a MagicMock; load the real one
+_mocked = sys.modules.pop('blog_agent', None)
+import blog_agent
+if _mocked is not None:
+    sys.modules['blog_agent'] = _mocked
+
+TELEGRAM_LIMIT = 4096
+
+class TestChunking(unittest.TestCase):
+
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(blog_agent.split_chunk("Hello world", 20), ("Hello world", ""))
+
+    def test_prefers_paragraph_then_line_then_word(self):
+        self.assertEqual(blog_agent.split_chunk("aaaa bbbb\ncccc\n\ndddd eeee", 20), ("aaaa bbbb\ncccc", "dddd eeee"))
+        self.assertEqual(blog_agent.split_chunk("aaaa bbbbb\ncccc dddd eeee", 20), ("aaaa bbbbb", "cccc dddd eeee"))
+        self.assertEqual(blog_agent.split_chunk("aaaa bbbb cccc dddd eeee", 20), ("aaaa bbbb cccc dddd", "eeee"))
+
+    def test_separator_too_early_is_ignored(self):
+        # A cut before size // 2 would leave a tiny chunk; take the word boundary instead
+        self.assertEqual(blog_agent.split_chunk("aa\n\nbbbb cccc dddd eeee", 20), ("aa\n\nbbbb cccc dddd", "eeee"))
+
+    def test_hard_cut_only_without_separators(self):
+        self.assertEqual(blog_agent.split_chunk("x" * 25, 10), ("x" * 10, "x" * 15))
+
+    def test_stream_keeps_chunks_under_limit_and_words_whole(self):
+        paragraph = " ".join(f"word{i}" for i in range(300))
+        text = "\n\n".join([paragraph] * 20)
+        # Stream it in uneven pieces, as the model would
+        pieces = [text[i:i + 37] for i in range(0, len(text), 37)]
+
+        chunks = list(blog_agent.chunk_text_stream(pieces))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk), blog_agent.TELEGRAM_CHUNK_SIZE)
+            self.assertLessEqual(len(chunk), TELEGRAM_LIMIT)
+        self.assertEqual(" ".join(chunks).split(), text.split())
+
+    def test_stream_cuts_at_lines_when_possible(self):
+        lines = [f"- item {i} with some text" for i in range(1000)]
+        chunks = list(blog_agent.chunk_text_stream(["\n".join(lines)]))
+
+        self.assertEqual([line for chunk in chunks for line in chunk.split("\n")], lines)
+
+class TestBlogWorkflow(unittest.TestCase):
+
+    def test_photo_is_sent_after_the_article(self):
+        calls = []
+        paragraph = " ".join(["text"] * 1000)
+        patches = {
+            'research_topic': MagicMock(return_value="research"),
+            'stream_blog_post': MagicMock(return_value=iter([paragraph + "\n\n"] * 3)),
+            'create_blog_image': MagicMock(return_value=("Title", "prompt", "http://img")),
+            'send_text_chunk': MagicMock(side_effect=lambda chat_id, chunk: calls.append("chunk") or True),
+            'send_photo': MagicMock(side_effect=lambda chat_id, url: calls.append("photo") or True),
+        }
+        for name, mock in patches.items():
+            patcher = patch.object(blog_agent, name, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        result = blog_agent.generate_blog_workflow("AI", "devs", chat_id="123")
+
+        self.assertEqual(result["telegram_status"], "Sent successfully")
+        self.assertGreater(calls.count("chunk"), 1)
+        self.assertEqual(calls[-1], "photo")
+        self.assertEqual(calls.count("photo"), 1)
+        blog_agent.send_photo.assert_called_once_with("123", "http://img")
+
+if __name__ == '__main__':
+    unittest.main()
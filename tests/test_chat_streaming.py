@@ -0,0 +1,141 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import json
+from types import SimpleNamespace
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import telegram_agent
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+class TestStreamingReply(unittest.TestCase):
+
+    def setUp(self):
+        for name, mock in (('send_message', MagicMock(return_value=7)), ('edit_message', MagicMock(return_value=True))):
+            patcher = patch.object(telegram_agent, name, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @patch('telegram_agent.time.time')
+    def test_first_tokens_sent_then_edited_with_throttling(self, mock_time):
+        reply = telegram_agent.StreamingReply("123")
+
+        mock_time.return_value = 100.0
+        reply.update("Hello")
+        telegram_agent.send_message.assert_called_once_with("123", "Hello ▌", parse_mode=None)
+
+        # Too soon, then too little new text: no edits
+        mock_time.return_value = 100.5
+        reply.update("Hello" + " world" * 10)
+        mock_time.return_value = 102.0
+        reply.update("Hello world")
+        telegram_agent.edit_message.assert_not_called()
+
+        mock_time.return_value = 102.0
+        reply.update("Hello" + " world" * 10)
+        telegram_agent.edit_message.assert_called_once_with("123", 7, "Hello" + " world" * 10 + " ▌", parse_mode=None)
+
+        reply.finish("*Hello* world")
+        telegram_agent.edit_message.assert_called_with("123", 7, "*Hello* world")
+        telegram_agent.send_message.assert_called_once()
+
+    def test_finish_without_stream_sends_message(self):
+        telegram_agent.StreamingReply("123").finish("Done")
+        telegram_agent.send_message.assert_called_once_with("123", "Done")
+        telegram_agent.edit_message.assert_not_called()
+
+    @patch('telegram_agent.parse_intent', return_value={"intent": "chat", "params": {}})
+    def test_stream_error_keeps_partial_reply(self, mock_parse):
+        def chat_openai(messages, on_token=None):
+            on_token("The capital of France")
+            return {"error": "connection reset"}
+
+        with patch.object(telegram_agent, 'chat_agent', MagicMock(chat_openai=chat_openai)):
+            telegram_agent.handle_command("What's the capital of France?", "123")
+
+        final = telegram_agent.edit_message.call_args[0][2]
+        self.assertTrue(final.startswith("The capital of France"))
+        self.assertIn("connection reset", final)
+        self.assertNotIn("not sure how to help", final)
+
+    @patch('telegram_agent.parse_intent', return_value={"intent": "chat", "params": {}})
+    def test_error_before_any_token_is_reported(self, mock_parse):
+        with patch.object(telegram_agent, 'chat_agent', MagicMock(chat_openai=MagicMock(return_value={"error": "rate limited"}))):
+            telegram_agent.handle_command("hi", "123")
+
+        message = telegram_agent.send_message.call_args[0][1]
+        self.assertIn("rate limited", message)
+
+class TestStreamChatOpenAI(unittest.TestCase):
+
+    def setUp(self):
+        # Other test modules replace chat_agent with a MagicMock; load the real one
+        saved = sys.modules.pop('chat_agent', None)
+        self.addCleanup(lambda: sys.modules.__setitem__('chat_agent', saved) if saved is not None else None)
+        import chat_agent
+        self.chat_agent = chat_agent
+
+    def test_yields_deltas_and_skips_empty_chunks(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = iter([chunk("Hel"), chunk(None), SimpleNamespace(choices=[]), chunk("lo")])
+        with patch.object(self.chat_agent, 'get_openai_client', return_value=client):
+            self.assertEqual(list(self.chat_agent.stream_chat_openai([{"role": "user", "content": "hi"}])), ["Hel", "lo"])
+        self.assertTrue(client.chat.completions.create.call_args.kwargs["stream"])
+
+    def test_missing_client_raises(self):
+        with patch.object(self.chat_agent, 'get_openai_client', return_value=None):
+            with self.assertRaises(RuntimeError):
+                list(self.chat_agent.stream_chat_openai([]))
+
+    def test_chat_openai_streams_to_callback(self):
+        client = MagicMock()
+        client.chat.completions.create.return_value = iter([chunk("Hi"), chunk(" there")])
+        seen = []
+        with patch.object(self.chat_agent, 'get_openai_client', return_value=client):
+            result = self.chat_agent.chat_openai([], on_token=seen.append)
+        self.assertEqual(seen, ["Hi", "Hi there"])
+        self.assertEqual(result["choices"][0]["message"]["content"], "Hi there")
+
+class TestChatCompletionsSSE(unittest.TestCase):
+
+    def setUp(self):
+        import server
+        self.server = server
+        self.client = server.app.test_client()
+
+    def events(self, response):
+        body = response.get_data(as_text=True)
+        self.assertTrue(body.endswith("\n\n"))
+        return [frame[len("data: "):] for frame in body.strip("\n").split("\n\n")]
+
+    def test_stream_frames_deltas_and_done(self):
+        fake = MagicMock(stream_chat_openai=MagicMock(return_value=iter(["Hel", "lo"])))
+        with patch.object(self.server, 'chat_agent', fake):
+            response = self.client.post('/api/chat/completions', json={"messages": [{"role": "user", "content": "hi"}], "stream": True})
+
+        self.assertEqual(response.mimetype, "text/event-stream")
+        self.assertEqual(response.headers["Cache-Control"], "no-cache")
+        events = self.events(response)
+        self.assertEqual(events[-1], "[DONE]")
+        self.assertEqual([json.loads(e)["choices"][0]["delta"]["content"] for e in events[:-1]], ["Hel", "lo"])
+
+    def test_stream_error_is_sent_as_event(self):
+        def failing(messages):
+            yield "Hel"
+            raise RuntimeError("upstream closed")
+
+        with patch.object(self.server, 'chat_agent', MagicMock(stream_chat_openai=failing)):
+            response = self.client.post('/api/chat/completions', json={"messages": [{"role": "user", "content": "hi"}], "stream": True})
+
+        events = self.events(response)
+        self.assertEqual(json.loads(events[1]), {"error": "upstream closed"})
+        self.assertEqual(events[-1], "[DONE]")
+
+if __name__ == '__main__':
+    unittest.main()
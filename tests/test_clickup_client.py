@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace clickup_agent with a MagicMock; load the real one
+sys.modules.pop('clickup_agent', None)
+import clickup_agent
+from clickup_client import ClickUpClient
+
+def response(status=200, remaining=None, reset=None, limit=100, body=None):
+    headers = {}
+    if remaining is not None:
+        headers = {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": str(reset), "X-RateLimit-Limit": str(limit)}
+    return MagicMock(status_code=status, headers=headers, json=MagicMock(return_value=body or {}))
+
+@patch('clickup_client.time.sleep')
+class TestClickUpClient(unittest.TestCase):
+
+    def test_retries_429_until_reset(self, mock_sleep):
+        client = ClickUpClient()
+        reset = time.time() + 5
+        with patch.object(client.session, 'request', side_effect=[response(429, 0, reset), response(200, 99, reset + 60)]) as mock_request:
+            result = client.get("/task/1")
+
+        self.assertEqual(result.status_code, 200)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertGreaterEqual(mock_sleep.call_args_list[0].args[0], 4)
+        self.assertEqual(mock_request.call_args.kwargs["timeout"], (5, 15))
+
+    def test_retries_5xx_then_gives_up(self, mock_sleep):
+        client = ClickUpClient(max_retries=2)
+        with patch.object(client.session, 'request', return_value=response(503)) as mock_request:
+            result = client.get("/task/1")
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_throttles_when_budget_runs_low(self, mock_sleep):
+        client = ClickUpClient()
+        with patch.object(client.session, 'request', return_value=response(200, 50, time.time() + 60)):
+            client.get("/a")
+            client.get("/b")
+        mock_sleep.assert_not_called()
+
+        with patch.object(client.session, 'request', return_value=response(200, 5, time.time() + 60)):
+            client.get("/c")
+            client.get("/d")
+        # 5 left of 100 with ~60s to go: spread the rest over the window
+        self.assertGreater(mock_sleep.call_args.args[0], 10)
+
+    @patch.dict(os.environ, {"CLICKUP_PERSONAL_TOKEN": "pk_test"})
+    def test_bulk_create_keeps_order(self, mock_sleep):
+        def post(path, headers=None, json=None):
+            if json["name"] == "bad":
+                return MagicMock(status_code=400, text="invalid")
+            return response(200, body={"id": json["name"]})
+
+        with patch.object(clickup_agent._client, 'post', side_effect=post):
+            result = clickup_agent.create_tasks("L1", [{"name": "a"}, {"name": "bad"}, {"name": "c"}, {}])
+
+        self.assertEqual(result["status"], "partial")
+        self.assertEqual((result["created"], result["failed"]), (2, 2))
+        self.assertEqual(result["results"][2]["task"]["id"], "c")
+
+if __name__ == '__main__':
+    unittest.main()
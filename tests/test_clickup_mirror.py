@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace clickup_agent with a MagicMock; load the real one
+sys.modules.pop('clickup_agent', None)
+import clickup_agent
+import clickup_mirror
+
+def task(task_id, name, status="to do", updated=1000):
+    return {"id": task_id, "name": name, "status": {"status": status}, "date_updated": str(updated)}
+
+class FakeClickUp:
+    def __init__(self, tasks):
+        self.tasks = {t["id"]: t for t in tasks}
+        self.calls = []
+
+    def fetch(self, list_id, date_updated_gt=None):
+        self.calls.append(date_updated_gt)
+        return [t for t in self.tasks.values() if date_updated_gt is None or int(t["date_updated"]) > date_updated_gt]
+
+class TestClickUpMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.api = FakeClickUp([
+            task("1", "Invoice for Acme Corp", "open", 1000),
+            task("2", "CRM Lead: John Doe", "to do", 2000),
+            task("3", "Quarterly report", "done", 3000)
+        ])
+        self.mirror = clickup_mirror.TaskMirror(self.api.fetch, path=os.path.join(self.tmp.name, "m.sqlite3"), max_age=60)
+
+    def test_reads_within_max_age_do_not_call_api(self):
+        self.mirror.ensure_fresh("L1")
+        self.mirror.ensure_fresh("L1")
+        self.assertEqual(self.api.calls, [None])
+        self.assertEqual([t["id"] for t in self.mirror.list_tasks("L1")], ["3", "2", "1"])
+
+    def test_incremental_sync_uses_newest_date_updated(self):
+        self.mirror.sync("L1")
+        self.api.tasks["2"] = task("2", "CRM Lead: John Doe", "closed", 4000)
+        self.mirror.sync("L1")
+
+        self.assertEqual(self.api.calls, [None, 3000])
+        self.assertEqual(self.mirror.list_tasks("L1", status="closed")[0]["id"], "2")
+
+    def test_full_resync_drops_deleted_tasks(self):
+        self.mirror.sync("L1")
+        del self.api.tasks["1"]
+        self.mirror.sync("L1", full=True)
+        self.assertEqual(len(self.mirror.list_tasks("L1")), 2)
+
+    def test_fuzzy_search_and_status_filter(self):
+        self.mirror.sync("L1")
+        self.assertEqual(self.mirror.search("L1", "invoce acme")[0]["id"], "1")
+        self.assertEqual(self.mirror.search("L1", "john")[0]["id"], "2")
+        self.assertEqual(self.mirror.search("L1", "john", status="done"), [])
+
+    def test_failed_sync_serves_stale_data(self):
+        self.mirror.sync("L1")
+        self.mirror.fetch_tasks = MagicMock(side_effect=RuntimeError("ClickUp error: 503"))
+        with patch('clickup_mirror.time.time', return_value=time.time() + 120):
+            warning = self.mirror.ensure_fresh("L1")
+        self.assertIn("503", warning)
+        self.assertEqual(len(self.mirror.list_tasks("L1")), 3)
+
+    def test_closed_tasks_and_subtasks_hidden_by_default(self):
+        closed = task("4", "Old invoice", "complete", 5000)
+        closed["status"]["type"] = "closed"
+        subtask = task("5", "Invoice line items", "to do", 6000)
+        subtask["parent"] = "1"
+        self.api.tasks.update({"4": closed, "5": subtask})
+        self.mirror.sync("L1")
+
+        self.assertEqual([t["id"] for t in self.mirror.list_tasks("L1")], ["3", "2", "1"])
+        self.assertEqual([t["id"] for t in self.mirror.search("L1", "invoice")], ["1"])
+        self.assertEqual([t["id"] for t in self.mirror.list_tasks("L1", include_closed=True, include_subtasks=True)], ["5", "4", "3", "2", "1"])
+        # Naming a status asks for exactly those tasks, closed or not
+        self.assertEqual([t["id"] for t in self.mirror.list_tasks("L1", status="complete")], ["4"])
+
+    def test_old_mirror_is_migrated_and_resynced(self):
+        path = os.path.join(self.tmp.name, "old.sqlite3")
+        conn = clickup_mirror.sqlite3.connect(path)
+        conn.executescript(
+            "CREATE TABLE tasks (id TEXT PRIMARY KEY, list_id TEXT NOT NULL, name TEXT, name_norm TEXT, status TEXT, date_updated INTEGER, data TEXT);"
+            "CREATE TABLE sync_state (list_id TEXT PRIMARY KEY, last_updated INTEGER, last_sync REAL, last_full_sync REAL);"
+            f"INSERT INTO sync_state VALUES ('L1', 3000, {time.time()}, {time.time()});"
+        )
+        conn.commit()
+        conn.close()
+
+        mirror = clickup_mirror.TaskMirror(self.api.fetch, path=path, max_age=60)
+        mirror.ensure_fresh("L1")
+        self.assertEqual(self.api.calls, [None])
+        self.assertEqual(len(mirror.list_tasks("L1")), 3)
+
+class TestFetchListTasks(unittest.TestCase):
+
+    @patch.dict(os.environ, {"CLICKUP_PERSONAL_TOKEN": "pk_test"})
+    def test_follows_pagination(self):
+        pages = [
+            {"tasks": [task(str(i), f"t{i}") for i in range(100)], "last_page": False},
+            {"tasks": [task("100", "t100")], "last_page": True}
+        ]
+        responses = [MagicMock(status_code=200, json=MagicMock(return_value=p)) for p in pages]
+        with patch.object(clickup_agent._client, 'get', side_effect=responses) as mock_get:
+            tasks = clickup_agent.fetch_list_tasks("L1", date_updated_gt=5)
+
+        self.assertEqual(len(tasks), 101)
+        self.assertEqual([c.kwargs["params"]["page"] for c in mock_get.call_args_list], [0, 1])
+        self.assertEqual(mock_get.call_args.kwargs["params"]["date_updated_gt"], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import json
+import tempfile
+import threading
+import httpx
+from openai import RateLimitError
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import enrich_leads
+import fake_openai_batch
+
+def make_client(fail_first=0):
+    """Fake OpenAI client echoing the lead's company; the first `fail_first` calls get a 429."""
+    calls = {"n": 0}
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        with lock:
+            calls["n"] += 1
+            n = calls["n"]
+        if n <= fail_first:
+            response = httpx.Response(429, headers={"retry-after": "0"}, request=httpx.Request("POST", "https://api.openai.com"))
+            raise RateLimitError("rate limited", response=response, body=None)
+        company = kwargs["messages"][1]["content"].split("business called ")[1].split(".")[0]
+        message = MagicMock(content=json.dumps({"icebreaker": f"Hey {company}"}))
+        return MagicMock(choices=[MagicMock(message=message)])
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client, calls
+
+def make_leads(n):
+    return [{"id": f"lead_{i}", "name": f"Person {i}", "company": f"Co{i}"} for i in range(n)]
+
+class TestEnrichLeads(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.checkpoint = os.path.join(self.tmp.name, "progress.jsonl")
+
+    def test_concurrent_run_keeps_order(self):
+        client, calls = make_client()
+        leads = enrich_leads.enrich_leads(make_leads(12), client, workers=4, checkpoint_path=self.checkpoint)
+
+        self.assertEqual([l["icebreaker"] for l in leads], [f"Hey Co{i}" for i in range(12)])
+        self.assertEqual(calls["n"], 12)
+
+    def test_resume_skips_checkpointed_leads(self):
+        client, _ = make_client()
+        enrich_leads.enrich_leads(make_leads(5), client, workers=2, checkpoint_path=self.checkpoint)
+
+        client, calls = make_client()
+        leads = enrich_leads.enrich_leads(make_leads(8), client, workers=2, checkpoint_path=self.checkpoint)
+
+        self.assertEqual(calls["n"], 3)
+        self.assertTrue(all(l["icebreaker"].startswith("Hey Co") for l in leads))
+
+    def test_failed_icebreakers_are_retried(self):
+        leads = make_leads(3)
+        # As read back from a sheet: one failed, one blank, one done
+        leads[0]["icebreaker"] = enrich_leads.ERROR_ICEBREAKER
+        leads[1]["icebreaker"] = ""
+        leads[2]["icebreaker"] = "Hey there"
+
+        client, calls = make_client()
+        enriched = enrich_leads.enrich_leads([dict(l) for l in leads], client, workers=2)
+        self.assertEqual([l["icebreaker"] for l in enriched], ["Hey Co0", "Hey Co1", "Hey there"])
+        self.assertEqual(calls["n"], 2)
+
+        client, calls = make_client()
+        streamed = sorted(enrich_leads.enrich_stream([dict(l) for l in leads], client, workers=2), key=lambda l: l["id"])
+        self.assertEqual([l["icebreaker"] for l in streamed], ["Hey Co0", "Hey Co1", "Hey there"])
+        self.assertEqual(calls["n"], 2)
+
+    @patch('enrich_leads.time.sleep')
+    def test_rate_limit_is_retried(self, mock_sleep):
+        client, calls = make_client(fail_first=2)
+        icebreaker = enrich_leads.generate_icebreaker({"company": "Acme"}, client)
+        self.assertEqual(icebreaker, "Hey Acme")
+        self.assertEqual(calls["n"], 3)
+
+    def test_limiter_blocks_past_request_budget(self):
+        limiter = enrich_leads.RateLimiter(rpm=2, tpm=10_000, window=0.2)
+        with patch('enrich_leads.time.sleep') as mock_sleep:
+            mock_sleep.side_effect = lambda s: limiter._calls.clear() or setattr(limiter, '_tokens', 0)
+            limiter.acquire(100)
+            limiter.acquire(100)
+            mock_sleep.assert_not_called()
+            limiter.acquire(100)
+            mock_sleep.assert_called_once()
+
+class TestEnrichLeadsBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.state = os.path.join(self.tmp.name, "out.json.batch.json")
+        self.checkpoint = os.path.join(self.tmp.name, "out.json.checkpoint.jsonl")
+
+    def test_results_merge_back_by_lead_id(self):
+        leads = make_leads(4)
+        leads[1]["icebreaker"] = "already done"
+        client = fake_openai_batch.FakeBatchClient(fail_ids={"id:lead_3"})
+
+        enrich_leads.enrich_leads_batch(leads, client, self.state, self.checkpoint, poll_interval=0)
+
+        self.assertEqual(leads[0]["icebreaker"], "Hey, love what Co0 is doing.")
+        self.assertEqual(leads[1]["icebreaker"], "already done")
+        self.assertEqual(leads[2]["icebreaker"], "Hey, love what Co2 is doing.")
+        self.assertEqual(leads[3]["icebreaker"], enrich_leads.ERROR_ICEBREAKER)
+        self.assertFalse(os.path.exists(self.state))
+        self.assertEqual(set(enrich_leads.load_checkpoint(self.checkpoint)), {"id:lead_0", "id:lead_2"})
+
+    def test_rerun_resumes_saved_batch(self):
+        client = fake_openai_batch.FakeBatchClient()
+        with patch('enrich_leads.wait_for_batch', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                enrich_leads.enrich_leads_batch(make_leads(3), client, self.state, poll_interval=0)
+        with open(self.state) as f:
+            batch_id = json.load(f)["batch_id"]
+
+        with patch('enrich_leads.submit_batch') as mock_submit:
+            leads = enrich_leads.enrich_leads_batch(make_leads(3), client, self.state, poll_interval=0)
+            mock_submit.assert_not_called()
+
+        self.assertEqual(client.batches.retrieve(batch_id).status, "completed")
+        self.assertTrue(all(l["icebreaker"].startswith("Hey, love what") for l in leads))
+
+if __name__ == '__main__':
+    unittest.main()
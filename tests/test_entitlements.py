@@ -0,0 +1,175 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import json
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace stripe_utils with a MagicMock; load the real one
+sys.modules.pop('stripe_utils', None)
+import stripe_utils
+import entitlements
+import fake_stripe_events as fake
+
+PRODUCT = stripe_utils.PREMIUM_PRODUCT_ID
+SECRET = "whsec_test"
+
+class FakeFlaskClient:
+    """Posts straight into stripe_utils.handle_webhook, like the server route does."""
+
+    def post(self, url, data=None, headers=None):
+        try:
+            stripe_utils.handle_webhook(data.encode("utf-8"), headers["Stripe-Signature"])
+            code = 200
+        except ValueError:
+            code = 400
+        return type("Response", (), {"status_code": code})()
+
+class TestEntitlementStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = entitlements.EntitlementStore(os.path.join(self.tmp.name, "entitlements.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_subscription_events_grant_and_cancel_revokes(self):
+        events = fake.subscribe_events("Alice@Example.com", PRODUCT)
+        for event in events:
+            self.store.apply_event(event)
+        self.assertTrue(self.store.is_entitled("alice@example.com", PRODUCT))
+        self.assertFalse(self.store.is_entitled("alice@example.com", "prod_other"))
+
+        subscription = events[1]["data"]["object"]
+        self.store.apply_event(fake.cancel_event(subscription, created=events[1]["created"] + 1))
+        self.assertFalse(self.store.is_entitled("alice@example.com", PRODUCT))
+
+    def test_duplicate_and_out_of_order_events(self):
+        events = fake.subscribe_events("bob@example.com", PRODUCT)
+        for event in events:
+            self.store.apply_event(event)
+        subscription = events[1]["data"]["object"]
+
+        cancel = fake.cancel_event(subscription, created=events[1]["created"] + 10)
+        self.assertTrue(self.store.apply_event(cancel))
+        self.assertFalse(self.store.apply_event(cancel))
+
+        # A late retry of an older "active" update must not resurrect the subscription
+        stale = fake.make_event("customer.subscription.updated", subscription, created=events[1]["created"] + 5)
+        self.store.apply_event(stale)
+        self.assertFalse(self.store.is_entitled("bob@example.com", PRODUCT))
+
+    def test_reconcile_repairs_missed_events(self):
+        customer = fake.make_customer("carol@example.com")
+        subscription = fake.make_subscription(customer["id"], PRODUCT)
+        self.assertTrue(self.store.reconcile_due())
+        self.store.reconcile(fake.FakeStripe([customer], [subscription]))
+        self.assertTrue(self.store.is_entitled("carol@example.com", PRODUCT))
+        self.assertFalse(self.store.reconcile_due())
+
+        # Subscription gone from Stripe entirely
+        self.store.reconcile(fake.FakeStripe([customer], []))
+        self.assertFalse(self.store.is_entitled("carol@example.com", PRODUCT))
+
+    def test_expired_period_is_not_entitled(self):
+        customer = fake.make_customer("dave@example.com")
+        subscription = fake.make_subscription(customer["id"], PRODUCT, period_days=-1)
+        self.store.apply_event(fake.make_event("customer.created", customer))
+        self.store.apply_event(fake.make_event("customer.subscription.created", subscription))
+        self.assertFalse(self.store.is_entitled("dave@example.com", PRODUCT))
+
+class TestStripeWebhook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = entitlements.EntitlementStore(os.path.join(self.tmp.name, "entitlements.sqlite3"))
+        patches = [
+            patch.object(stripe_utils, "_store", self.store),
+            patch.object(stripe_utils, "WEBHOOK_SECRET", SECRET),
+            patch.object(stripe_utils.stripe, "api_key", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_signed_events_update_check_subscription(self):
+        self.assertFalse(stripe_utils.check_subscription("erin@example.com"))
+        codes = fake.replay(fake.subscribe_events("erin@example.com", PRODUCT), SECRET, client=FakeFlaskClient())
+        self.assertEqual(codes, [200, 200, 200])
+        self.assertTrue(stripe_utils.check_subscription("erin@example.com"))
+
+    def test_bad_signature_is_rejected(self):
+        events = fake.subscribe_events("mallory@example.com", PRODUCT)
+        codes = fake.replay(events, "whsec_wrong", client=FakeFlaskClient())
+        self.assertEqual(codes, [400, 400, 400])
+        self.assertFalse(stripe_utils.check_subscription("mallory@example.com"))
+
+        payload = json.dumps(events[0])
+        with self.assertRaises(ValueError):
+            stripe_utils.handle_webhook(payload, fake.sign(payload, SECRET, timestamp=1))  # too old
+
+class TestCheckoutCaches(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = entitlements.EntitlementStore(os.path.join(self.tmp.name, "entitlements.sqlite3"))
+        self.api = MagicMock()
+        self.api.api_key = "sk_test"
+        self.api.Price.list.return_value = MagicMock(data=[MagicMock(id="price_1")])
+        self.api.Customer.list.return_value = MagicMock(data=[])
+        self.api.Customer.create.return_value = MagicMock(id="cus_new")
+        self.api.checkout.Session.create.return_value = MagicMock(url="https://checkout.stripe.test/1")
+        patches = [
+            patch.object(stripe_utils, "_store", self.store),
+            patch.object(stripe_utils, "WEBHOOK_SECRET", SECRET),
+            patch.object(stripe_utils, "stripe", self.api),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        stripe_utils._price_cache.invalidate()
+        stripe_utils._customer_cache.invalidate()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def checkout(self, email="frank@example.com"):
+        return stripe_utils.create_checkout_session(email, "https://x/ok", "https://x/cancel")
+
+    def test_warm_checkout_makes_one_call(self):
+        self.assertEqual(self.checkout(), "https://checkout.stripe.test/1")
+        self.assertEqual(self.checkout("Frank@Example.com"), "https://checkout.stripe.test/1")
+
+        self.assertEqual(self.api.Price.list.call_count, 1)
+        self.assertEqual(self.api.Customer.list.call_count, 1)
+        self.assertEqual(self.api.Customer.create.call_count, 1)
+        self.assertEqual(self.api.checkout.Session.create.call_count, 2)
+        self.assertEqual(self.api.checkout.Session.create.call_args.kwargs["customer"], "cus_new")
+
+    def test_customer_from_entitlement_store_skips_lookup(self):
+        self.store.apply_event(fake.make_event("customer.created", fake.make_customer("gina@example.com", "cus_known")))
+        self.checkout("gina@example.com")
+        self.api.Customer.list.assert_not_called()
+        self.assertEqual(self.api.checkout.Session.create.call_args.kwargs["customer"], "cus_known")
+
+    def test_events_invalidate_caches(self):
+        self.checkout()
+        self.api.Price.list.return_value = MagicMock(data=[MagicMock(id="price_2")])
+        stripe_utils.invalidate_caches(fake.make_event("price.updated", {"id": "price_1", "product": PRODUCT}))
+        stripe_utils.invalidate_caches(fake.make_event("customer.deleted", {"id": "cus_new", "email": "frank@example.com"}))
+        self.api.Customer.create.return_value = MagicMock(id="cus_newer")
+
+        self.checkout()
+        kwargs = self.api.checkout.Session.create.call_args.kwargs
+        self.assertEqual(kwargs["line_items"][0]["price"], "price_2")
+        self.assertEqual(kwargs["customer"], "cus_newer")
+
+if __name__ == '__main__':
+    unittest.main()
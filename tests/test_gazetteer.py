@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import gazetteer
+
+class TestGazetteer(unittest.TestCase):
+
+    def assertCity(self, query, name):
+        city = gazetteer.resolve_city(query)
+        self.assertIsNotNone(city, f"no city resolved for {query!r}")
+        self.assertEqual(city["name"], name)
+
+    def test_multi_word_names(self):
+        self.assertCity("New York", "New York")
+        self.assertCity("what's the weather in San Francisco today?", "San Francisco")
+        self.assertCity("how hot is it in rio de janeiro", "Rio de Janeiro")
+
+    def test_longest_match_and_aliases(self):
+        self.assertCity("weather in new york city", "New York")
+        self.assertCity("Rangoon", "Yangon")
+        self.assertCity("is it raining in Hpa-An", "Hpa-An")
+
+    def test_preposition_breaks_ties(self):
+        self.assertCity("nice weather in london?", "London")
+
+    def test_typo_after_preposition(self):
+        self.assertCity("weather in londn", "London")
+
+    def test_ambiguous_or_unknown_returns_none(self):
+        self.assertIsNone(gazetteer.resolve_city("Paris or London"))
+        self.assertIsNone(gazetteer.resolve_city("weather in Smallville"))
+
+    def test_city_word_outside_location_phrase_returns_none(self):
+        # Common words and qualified places go to the LLM instead of a forced guess
+        for query in (
+            "is it nice today",
+            "Mandalay weather for male dog walk",
+            "weather in Paris, Texas",
+            "weather in Sydney Nova Scotia",
+            "weather in Georgetown",
+            "how about la",
+            "weather in Melbourne, FL",
+            "weather in Cambridge MA",
+            "weather in Birmingham AL",
+            "weather in Manchester NH",
+            "weather in Alexandria VA",
+            "weather in Vancouver, WA",
+        ):
+            self.assertIsNone(gazetteer.resolve_city(query), query)
+
+    def test_location_phrase_forms(self):
+        self.assertCity("Nice", "Nice")
+        self.assertCity("weather in Nice tomorrow", "Nice")
+        self.assertCity("Mandalay weather today", "Mandalay")
+        self.assertCity("forecast for Sydney this weekend", "Sydney")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import json
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace scrape_apify with a MagicMock; load the real one
+sys.modules.pop('scrape_apify', None)
+import lead_io
+import lead_pipeline
+import upload_sheets
+from fake_apify import FakeApifyClient
+
+def make_openai_client():
+    def create(**kwargs):
+        company = kwargs["messages"][1]["content"].split("business called ")[1].split(".")[0]
+        message = MagicMock(content=json.dumps({"icebreaker": f"Hey {company}"}))
+        return MagicMock(choices=[MagicMock(message=message)])
+
+    client = MagicMock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+class TestLeadPipeline(unittest.TestCase):
+
+    def test_leads_flow_through_to_sink(self):
+        delivered = []
+        count = lead_pipeline.run_pipeline(
+            "CEO", "New York", delivered.append, limit=7,
+            openai_client=make_openai_client(), apify_client=FakeApifyClient(batch_size=2),
+            workers=3, queue_size=2, poll_interval=0
+        )
+        self.assertEqual(count, 7)
+        self.assertEqual(len(delivered), 7)
+        self.assertTrue(all(lead["icebreaker"].startswith("Hey ") for lead in delivered))
+
+    def test_stream_uploader_extends_header_and_flushes_first_row(self):
+        worksheet = MagicMock()
+        worksheet.row_values.return_value = ["name", "company"]
+        uploader = upload_sheets.SheetStreamUploader(worksheet, flush_rows=10, flush_seconds=60)
+
+        uploader.add({"name": "Ann", "company": "Acme"})
+        worksheet.append_rows.assert_called_once_with([["Ann", "Acme"]], table_range="A1")
+
+        uploader.add({"name": "Bob", "company": "Bolt", "icebreaker": "Hey Bob"})
+        uploader.flush()
+        worksheet.update.assert_called_once_with("A1", [["name", "company", "icebreaker"]])
+        worksheet.append_rows.assert_called_with([["Bob", "Bolt", "Hey Bob"]], table_range="A1")
+        self.assertEqual(uploader.uploaded, 2)
+
+    def test_jsonl_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "leads.jsonl")
+            with lead_io.LeadWriter(path) as writer:
+                writer.write({"id": 1})
+                writer.write({"id": 2})
+            self.assertEqual(list(lead_io.read_leads(path)), [{"id": 1}, {"id": 2}])
+
+if __name__ == '__main__':
+    unittest.main()
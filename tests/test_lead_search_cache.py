@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace scrape_apify with a MagicMock; load the real one
+sys.modules.pop('scrape_apify', None)
+import disk_cache
+import lead_search_cache
+
+LEADS = [{"id": f"lead_{i}"} for i in range(10)]
+
+class TestLeadSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache = disk_cache.DiskCache("leads", ttl=60, max_bytes=100_000, root=self.tmp.name)
+        for patcher in (patch.object(lead_search_cache, '_cache', cache),
+                        patch.object(lead_search_cache.scrape_apify, 'scrape_leads', return_value=LEADS)):
+            self.scrape = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_repeat_search_is_served_from_cache(self):
+        first = lead_search_cache.search_leads("CEO", "New York", limit=3)
+        second = lead_search_cache.search_leads("  ceo ", "new york", limit=5)
+
+        self.scrape.assert_called_once()
+        self.assertFalse(first["cache"]["hit"])
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(len(first["leads"]), 3)
+        self.assertEqual(len(second["leads"]), 5)
+        self.assertGreaterEqual(second["cache"]["age_seconds"], 0)
+
+    def test_filters_are_part_of_key(self):
+        lead_search_cache.search_leads("CEO", "London")
+        lead_search_cache.search_leads("CEO", "London", industry="Software")
+        lead_search_cache.search_leads("CEO", "London", email_status="validated")
+        self.assertEqual(self.scrape.call_count, 3)
+
+    def test_force_refresh_bypasses_cache(self):
+        lead_search_cache.search_leads("CEO", "Paris")
+        result = lead_search_cache.search_leads("CEO", "Paris", force_refresh=True)
+        self.assertEqual(self.scrape.call_count, 2)
+        self.assertFalse(result["cache"]["hit"])
+
+    def test_entries_expire(self):
+        lead_search_cache.search_leads("CEO", "Berlin")
+        with patch('disk_cache.time.time', return_value=time.time() + 120):
+            lead_search_cache.search_leads("CEO", "Berlin")
+        self.assertEqual(self.scrape.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import lead_store
+import enrich_leads
+import upload_sheets
+
+class TestLeadStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "lead_store.json")
+
+    def test_identity_normalization(self):
+        a = {"email": "John.Doe+leads@Acme.com", "linkedInUrl": "https://www.linkedin.com/in/John-Doe/?trk=x"}
+        b = {"email": "john.doe@acme.com", "publicIdentifier": "john-doe"}
+        self.assertEqual(lead_store.identity_keys(a)[:2], lead_store.identity_keys(b)[:2])
+        self.assertEqual(
+            lead_store.normalize_name_company("Jane Smith", "GreenEarth Logistics, Inc."),
+            lead_store.normalize_name_company("jane  smith", "GreenEarth Logistics")
+        )
+
+    def test_any_matching_key_finds_the_lead(self):
+        store = lead_store.LeadStore(self.path)
+        lead_id = store.record({"name": "Jane Smith", "company": "GreenEarth"}, icebreaker="Hey Jane")
+        # Same person later scraped with an email too: still the same lead, and the email is linked
+        self.assertEqual(store.record({"name": "Jane Smith", "company": "GreenEarth LLC", "email": "jane@ge.com"}), lead_id)
+        self.assertEqual(store.find({"email": "JANE@ge.com"}), lead_id)
+        self.assertIsNone(store.find({"email": "someone@else.com"}))
+
+    def test_persists_with_bloom_filter(self):
+        store = lead_store.LeadStore(self.path, use_bloom=True)
+        lead_id = store.record({"email": "ann@acme.com"}, icebreaker="Hey Ann")
+        store.save()
+
+        reopened = lead_store.LeadStore(self.path, use_bloom=True)
+        self.assertIsNone(reopened.find({"email": "new@acme.com"}))
+        self.assertIsNone(reopened._index)  # answered by the Bloom filter alone
+        self.assertEqual(reopened.get({"email": "ann@acme.com"})["icebreaker"], "Hey Ann")
+        self.assertEqual(reopened.get({"email": "ann@acme.com"})["lead_id"], lead_id)
+
+    def test_known_leads_skip_enrichment(self):
+        store = lead_store.LeadStore(self.path)
+        store.record({"email": "ann@acme.com"}, icebreaker="Hey Ann")
+        client = MagicMock()
+
+        leads = enrich_leads.enrich_leads([{"email": "ann@acme.com", "name": "Ann"}], client, workers=1, store=store)
+
+        client.chat.completions.create.assert_not_called()
+        self.assertEqual(leads[0]["icebreaker"], "Hey Ann")
+        self.assertTrue(leads[0]["lead_id"].startswith("L"))
+
+    def test_uploader_updates_existing_row(self):
+        store = lead_store.LeadStore(self.path)
+        lead_id = store.record({"email": "ann@acme.com"})
+        worksheet = MagicMock()
+        worksheet.row_values.return_value = ["lead_id", "email", "icebreaker"]
+        worksheet.col_values.return_value = ["lead_id", "Lother", lead_id]
+        worksheet.batch_get.return_value = [[[lead_id, "ann@acme.com", ""]]]
+
+        appended, updated = upload_sheets.upload_stream(
+            worksheet, [{"email": "ann@acme.com", "icebreaker": "Hey Ann"}, {"email": "bob@acme.com"}], store=store
+        )
+
+        self.assertEqual((appended, updated), (1, 1))
+        worksheet.batch_update.assert_called_once_with([{"range": "A3", "values": [[lead_id, "ann@acme.com", "Hey Ann"]]}])
+        self.assertIn("uploaded_at", store.get({"email": "bob@acme.com"}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import time
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import disk_cache
+import research_cache
+
+class TestResearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = disk_cache.DiskCache("research", ttl=60, max_bytes=10_000, root=self.tmp.name)
+        patcher = patch.object(research_cache, '_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_near_repeat_query_hits_cache(self):
+        tavily = MagicMock()
+        tavily.search.return_value = {"results": [{"title": "RAG", "content": "Retrieval"}]}
+
+        first = research_cache.cached_search(tavily, "What is RAG?", search_depth="basic", max_results=5)
+        second = research_cache.cached_search(tavily, "  what is rag ", search_depth="basic", max_results=5)
+
+        tavily.search.assert_called_once()
+        self.assertFalse(first["cache"]["hit"])
+        self.assertTrue(second["cache"]["hit"])
+        self.assertEqual(second["results"], first["results"])
+        self.assertIn("fetched_at", second["cache"])
+
+    def test_symbols_are_part_of_key(self):
+        tavily = MagicMock()
+        tavily.search.return_value = {"results": []}
+
+        for query in ("C++ tutorial", "C# tutorial", "C tutorial"):
+            research_cache.cached_search(tavily, query)
+
+        self.assertEqual(tavily.search.call_count, 3)
+
+    def test_depth_and_max_results_are_part_of_key(self):
+        tavily = MagicMock()
+        tavily.search.return_value = {"results": []}
+
+        research_cache.cached_search(tavily, "ai news", search_depth="basic", max_results=5)
+        research_cache.cached_search(tavily, "ai news", search_depth="advanced", max_results=5)
+        research_cache.cached_search(tavily, "ai news", search_depth="advanced", max_results=3)
+
+        self.assertEqual(tavily.search.call_count, 3)
+
+    def test_expired_entry_is_refetched(self):
+        self.cache.set("k", {"v": 1})
+        with patch('disk_cache.time.time', return_value=time.time() + 120):
+            self.assertIsNone(self.cache.get("k"))
+
+    def test_lru_eviction_keeps_recently_used(self):
+        payload = "x" * 3000
+        self.cache.set("a", payload)
+        self.cache.set("b", payload)
+        # Make "a" the oldest on disk, then touch it with a read so "b" becomes LRU
+        old = time.time() - 30
+        os.utime(self.cache._path("a"), (old, old))
+        os.utime(self.cache._path("b"), (old + 1, old + 1))
+        self.cache.get("a")
+
+        self.cache.set("c", payload)
+        self.cache.set("d", payload)
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+
+if __name__ == '__main__':
+    unittest.main()
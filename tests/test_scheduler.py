@@ -0,0 +1,152 @@
+import unittest
+import sys
+import os
+import json
+import time
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import scheduler
+
+def ts(*args):
+    return datetime(*args).timestamp()
+
+def set_next_run(sched, name, when):
+    sched.state[name]["next_run"] = when
+    sched._save()
+    sched._load(when)
+
+# Run in child processes: contend for one lock / run one schedule at the same moment
+
+def _contend_for_lease(path, barrier, results):
+    lock = scheduler.LeaseLock(path, lease_seconds=60)
+    barrier.wait()
+    results.put(lock.acquire())
+
+def _run_schedule(state_path, log_path, now, barrier, results):
+    def action():
+        with open(log_path, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        time.sleep(0.2)
+    sched = scheduler.Scheduler([scheduler.Job("digest", "0 8 * * *", action, misfire_grace=3600)], state_path)
+    barrier.wait()
+    results.put(sched.run_pending(now=now))
+
+class TestCronExpr(unittest.TestCase):
+
+    def test_next_after(self):
+        daily = scheduler.CronExpr("0 8 * * *")
+        self.assertEqual(daily.next_after(datetime(2025, 3, 1, 7, 59)), datetime(2025, 3, 1, 8, 0))
+        self.assertEqual(daily.next_after(datetime(2025, 3, 1, 8, 0)), datetime(2025, 3, 2, 8, 0))
+
+        quarter = scheduler.CronExpr("*/15 * * * *")
+        self.assertEqual(quarter.next_after(datetime(2025, 3, 1, 23, 50)), datetime(2025, 3, 2, 0, 0))
+
+        weekdays = scheduler.CronExpr("30 9 * * 1-5")
+        self.assertEqual(weekdays.next_after(datetime(2025, 3, 1, 12, 0)), datetime(2025, 3, 3, 9, 30))  # Sat -> Mon
+
+    def test_invalid(self):
+        for expr in ("* * * *", "61 * * * *", "0 8 * 13 *", "*/0 * * * *"):
+            with self.assertRaises(ValueError):
+                scheduler.CronExpr(expr)
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp.name, "scheduler_state.json")
+        self.calls = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make(self, cron="0 8 * * *", grace=3600):
+        job = scheduler.Job("digest", cron, lambda: self.calls.append("digest"), misfire_grace=grace)
+        return scheduler.Scheduler([job], self.state_path)
+
+    def test_runs_once_per_fire_time_and_persists(self):
+        sched = self.make()
+        set_next_run(sched, "digest", ts(2025, 3, 1, 8, 0))
+
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 8, 1)), ["digest"])
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 9, 0)), [])
+        self.assertEqual(self.calls, ["digest"])
+
+        with open(self.state_path) as f:
+            state = json.load(f)
+        self.assertEqual(state["digest"]["next_run"], ts(2025, 3, 2, 8, 0))
+        self.assertEqual(state["digest"]["last_status"], "success")
+
+    def test_missed_run_outside_grace_is_skipped(self):
+        sched = self.make(grace=600)
+        set_next_run(sched, "digest", ts(2025, 3, 1, 8, 0))
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 12, 0)), [])
+        self.assertEqual(self.calls, [])
+        self.assertEqual(sched.next_run(), ts(2025, 3, 2, 8, 0))
+
+    def test_two_processes_do_not_double_fire(self):
+        bot, trigger = self.make(), self.make()
+        for sched in (bot, trigger):
+            set_next_run(sched, "digest", ts(2025, 3, 1, 8, 0))
+
+        self.assertEqual(bot.run_pending(now=ts(2025, 3, 1, 8, 0, 30)), ["digest"])
+        # trigger's in-memory heap is stale, but it re-reads state under the lock
+        self.assertEqual(trigger.run_pending(now=ts(2025, 3, 1, 8, 1)), [])
+        self.assertEqual(self.calls, ["digest"])
+
+    def test_held_lease_blocks_and_expired_lease_is_taken_over(self):
+        sched = self.make()
+        set_next_run(sched, "digest", ts(2025, 3, 1, 8, 0))
+        other = scheduler.LeaseLock(sched.lock.path, lease_seconds=60)
+        self.assertTrue(other.acquire())
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 8, 1)), [])
+
+        with open(sched.lock.path, "w") as f:
+            json.dump({"owner": other.owner, "expires": time.time() - 1}, f)
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 8, 1)), ["digest"])
+        self.assertFalse(os.path.exists(sched.lock.path))
+
+    def run_in_processes(self, target, args, count=4):
+        ctx = multiprocessing.get_context("fork")
+        barrier, results = ctx.Barrier(count), ctx.Queue()
+        procs = [ctx.Process(target=target, args=args + (barrier, results)) for _ in range(count)]
+        for proc in procs:
+            proc.start()
+        outcomes = [results.get(timeout=10) for _ in procs]
+        for proc in procs:
+            proc.join(timeout=10)
+        return outcomes
+
+    def test_expired_lease_goes_to_one_process(self):
+        lock_path = os.path.join(self.tmp.name, "scheduler.lock")
+        for _ in range(5):
+            with open(lock_path, "w") as f:
+                json.dump({"owner": "crashed", "expires": time.time() - 1}, f)
+            outcomes = self.run_in_processes(_contend_for_lease, (lock_path,))
+            self.assertEqual(outcomes.count(True), 1)
+
+    def test_concurrent_processes_fire_job_once(self):
+        sched = self.make()
+        set_next_run(sched, "digest", ts(2025, 3, 1, 8, 0))
+        log_path = os.path.join(self.tmp.name, "runs.log")
+
+        outcomes = self.run_in_processes(_run_schedule, (self.state_path, log_path, ts(2025, 3, 1, 8, 1)))
+
+        self.assertEqual(sorted(outcomes), [[], [], [], ["digest"]])
+        with open(log_path) as f:
+            self.assertEqual(len(f.read().splitlines()), 1)
+
+    def test_failing_job_is_rescheduled(self):
+        job = scheduler.Job("alerts", "*/15 * * * *", lambda: 1 / 0)
+        sched = scheduler.Scheduler([job], self.state_path)
+        set_next_run(sched, "alerts", ts(2025, 3, 1, 8, 0))
+        self.assertEqual(sched.run_pending(now=ts(2025, 3, 1, 8, 0)), ["alerts"])
+        self.assertTrue(sched.state["alerts"]["last_status"].startswith("error"))
+        self.assertEqual(sched.next_run(), ts(2025, 3, 1, 8, 15))
+
+if __name__ == '__main__':
+    unittest.main()
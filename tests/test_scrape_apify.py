@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Other test modules replace scrape_apify with a MagicMock; load the real one
+sys.modules.pop('scrape_apify', None)
+import scrape_apify
+from fake_apify import FakeApifyClient
+
+class TestScrapeApify(unittest.TestCase):
+
+    def test_pages_stream_in_as_the_run_progresses(self):
+        client = FakeApifyClient(batch_size=3)
+        handle = scrape_apify.start_scrape("CEO", "New York", limit=7, client=client)
+
+        pages = list(scrape_apify.iter_run_pages(handle, client=client, poll_interval=0))
+
+        self.assertEqual([len(p) for p in pages], [3, 3, 1])
+        self.assertEqual(handle["offset"], 7)
+
+    def test_resume_from_offset(self):
+        client = FakeApifyClient(batch_size=4)
+        handle = scrape_apify.start_scrape("CEO", "London", limit=8, client=client)
+
+        first = scrape_apify.poll_run(handle["run_id"], offset=0, limit=8, client=client)
+        self.assertEqual(len(first["items"]), 4)
+        self.assertFalse(first["done"])
+
+        # A fresh client (e.g. after a restart) picks up where the last poll stopped
+        resumed = {"run_id": handle["run_id"], "offset": first["next_offset"], "limit": 8}
+        rest = list(scrape_apify.iter_run_items(resumed, client=FakeApifyClient(), poll_interval=0))
+        self.assertEqual(len(rest), 4)
+        self.assertEqual(resumed["offset"], 8)
+
+    def test_limit_is_capped_at_safe_limit(self):
+        client = FakeApifyClient(batch_size=5)
+        handle = scrape_apify.start_scrape("CEO", "Austin", limit=50, client=client)
+        items = list(scrape_apify.iter_run_items(handle, client=client, poll_interval=0))
+        self.assertEqual(len(items), scrape_apify.SAFE_LIMIT)
+
+    def test_failed_run_without_items_raises(self):
+        client = FakeApifyClient(fail=True)
+        handle = scrape_apify.start_scrape("CEO", "Paris", client=client)
+        with self.assertRaises(RuntimeError):
+            list(scrape_apify.iter_run_items(handle, client=client, poll_interval=0))
+
+class TestStartLeadsRoute(unittest.TestCase):
+
+    def setUp(self):
+        import server
+        self.client = server.app.test_client()
+        self.scrape = MagicMock(start_scrape=MagicMock(return_value={"run_id": "r1"}))
+        patcher = patch.object(server, 'scrape_apify', self.scrape)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_starts_run(self):
+        response = self.client.post('/api/leads/start', json={"query": "CTO", "limit": "5"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["run"], {"run_id": "r1"})
+        self.assertEqual(self.scrape.start_scrape.call_args.kwargs["limit"], 5)
+
+    def test_bad_limit_is_a_json_400(self):
+        response = self.client.get('/api/leads/start?limit=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["status"], "error")
+        self.scrape.start_scrape.assert_not_called()
+
+    def test_post_without_json_uses_defaults(self):
+        response = self.client.post('/api/leads/start', data="not json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.scrape.start_scrape.call_args.kwargs["limit"], 10)
+
+if __name__ == '__main__':
+    unittest.main()
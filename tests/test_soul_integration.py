@@ -31,6 +31,7 @@ class TestSoulIntegration(unittest.TestCase):
     
     def setUp(self):
         telegram_agent.send_message = MagicMock()
+        telegram_agent.edit_message = MagicMock(return_value=True)
         telegram_agent.chat_agent.get_openai_client.return_value = MagicMock()
         # Mock global memory usage to avoid file writes during tests if not careful, 
         # but handle_command mostly calls helpers.
@@ -53,11 +54,12 @@ class TestSoulIntegration(unittest.TestCase):
         
         telegram_agent.handle_command("/digest", "123")
         
-        # Verify message contains digest info
-        args, _ = telegram_agent.send_message.call_args
-        self.assertIn("Daily Digest", args[1])
-        self.assertIn("Meeting", args[1])
-        self.assertIn("Summary of work emails", args[1])
+        # One status message, replaced in place by the digest
+        telegram_agent.send_message.assert_called_once()
+        args, _ = telegram_agent.edit_message.call_args
+        self.assertIn("Daily Digest", args[2])
+        self.assertIn("Meeting", args[2])
+        self.assertIn("Summary of work emails", args[2])
 
 
     @patch('telegram_agent.parse_intent')
@@ -75,8 +77,8 @@ class TestSoulIntegration(unittest.TestCase):
         call_args = telegram_agent.google_mail.list_emails.call_args
         self.assertTrue("important" in call_args[1].get('query') or "urgent" in call_args[1].get('query'))
         
-        args, _ = telegram_agent.send_message.call_args
-        self.assertIn("Urgent Items", args[1])
+        args, _ = telegram_agent.edit_message.call_args
+        self.assertIn("Urgent Items", args[2])
 
     @patch('telegram_agent.parse_intent')
     def test_draft_enforcement_send(self, mock_parse):
@@ -144,9 +146,9 @@ class TestSoulIntegration(unittest.TestCase):
                 
                 telegram_agent.handle_command("What did I do today?", "123")
                 
-                args, _ = telegram_agent.send_message.call_args
-                self.assertIn("Evening Summary", args[1])
-                self.assertIn("Summary of the day", args[1])
+                args, _ = telegram_agent.edit_message.call_args
+                self.assertIn("Evening Summary", args[2])
+                self.assertIn("Summary of the day", args[2])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import io
+import time
+import threading
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+from telegram_client import TelegramClient, TokenBucket
+
+def response(status=200, body=None):
+    body = body if body is not None else {"ok": True, "result": {"message_id": 1}}
+    return MagicMock(status_code=status, json=MagicMock(return_value=body))
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=1.0, capacity=3)
+        waits = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 1.0, places=1)
+        self.assertAlmostEqual(waits[4], 2.0, places=1)
+
+    def test_pause(self):
+        bucket = TokenBucket(rate=30, capacity=30)
+        bucket.pause(5)
+        self.assertGreater(bucket.reserve(), 4.9)
+
+class TestTelegramClient(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TelegramClient(token="TEST")
+
+    def test_pooled_session_and_queue_keep_chat_order(self):
+        sent = []
+        lock = threading.Lock()
+
+        def post(url, json=None, **kwargs):
+            with lock:
+                sent.append((json["chat_id"], json["text"]))
+            return response()
+
+        with patch.object(self.client.session, "post", side_effect=post), patch("telegram_client.time.sleep"):
+            futures = [self.client.submit("sendMessage", {"chat_id": chat, "text": str(i)}) for i in range(5) for chat in ("1", "2")]
+            results = [f.result(timeout=5) for f in futures]
+
+        self.assertTrue(all(r["ok"] for r in results))
+        for chat in ("1", "2"):
+            self.assertEqual([text for c, text in sent if c == chat], ["0", "1", "2", "3", "4"])
+
+    def test_per_chat_rate_limit(self):
+        with patch.object(self.client.session, "post", return_value=response()), patch("telegram_client.time.sleep") as mock_sleep:
+            for i in range(5):
+                self.client.send_message("42", f"msg {i}")
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        # Burst of 3, then about one per second
+        self.assertEqual(len(waits), 2)
+        self.assertAlmostEqual(waits[0], 1.0, places=1)
+
+    def test_retry_after_is_honoured(self):
+        limited = response(429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 7}})
+        with patch.object(self.client.session, "post", side_effect=[limited, response()]) as mock_post, \
+                patch("telegram_client.time.sleep") as mock_sleep:
+            result = self.client.send_message("42", "hi")
+        self.assertTrue(result["ok"])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertGreater(mock_sleep.call_args.args[0], 6.9)
+
+    def test_upload_is_rewound_on_retry(self):
+        photo = io.BytesIO(b"png-bytes")
+        reads = []
+
+        def post(url, data=None, files=None, **kwargs):
+            reads.append(files["photo"][1].read())
+            return response(429, {"ok": False, "parameters": {"retry_after": 1}}) if len(reads) == 1 else response()
+
+        with patch.object(self.client.session, "post", side_effect=post), patch("telegram_client.time.sleep"):
+            result = self.client.send_photo("42", photo)
+        self.assertTrue(result["ok"])
+        self.assertEqual(reads, [b"png-bytes", b"png-bytes"])
+
+    def test_network_errors_return_not_ok(self):
+        import requests
+        client = TelegramClient(token="TEST", max_retries=1)
+        with patch.object(client.session, "post", side_effect=requests.ConnectionError("down")), patch("telegram_client.time.sleep"):
+            result = client.get_updates(offset=5)
+        self.assertFalse(result["ok"])
+        self.assertIn("down", result["description"])
+
+    def test_sends_not_retried_when_they_may_have_been_delivered(self):
+        import requests
+        for failure in (requests.ReadTimeout("read timed out"), response(502, {"ok": False, "error_code": 502})):
+            with patch.object(self.client.session, "post", side_effect=[failure, response()]) as mock_post, \
+                    patch("telegram_client.time.sleep"):
+                result = self.client.send_message("42", "hi")
+            self.assertFalse(result["ok"])
+            self.assertEqual(mock_post.call_count, 1)
+
+    def test_sends_retried_when_connection_never_opened(self):
+        import requests
+        from urllib3.exceptions import MaxRetryError, NewConnectionError
+        refused = requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "refused")))
+        with patch.object(self.client.session, "post", side_effect=[refused, response()]) as mock_post, \
+                patch("telegram_client.time.sleep"):
+            result = self.client.send_message("42", "hi")
+        self.assertTrue(result["ok"])
+        self.assertEqual(mock_post.call_count, 2)
+
+    def test_idempotent_calls_retried_after_timeout_and_5xx(self):
+        import requests
+        with patch.object(self.client.session, "post", side_effect=[requests.ReadTimeout("slow"), response(503, {"ok": False}), response()]) as mock_post, \
+                patch("telegram_client.time.sleep"):
+            result = self.client.edit_message_text("42", 1, "hi")
+        self.assertTrue(result["ok"])
+        self.assertEqual(mock_post.call_count, 3)
+
+if __name__ == '__main__':
+    unittest.main()
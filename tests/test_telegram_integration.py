@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import sys
 import os
 import json
+import time
 
 # Add implementation folder to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
@@ -27,6 +28,7 @@ class TestTelegramIntegration(unittest.TestCase):
     def setUp(self):
         # Reset mocks
         telegram_agent.send_message = MagicMock()
+        telegram_agent.edit_message = MagicMock(return_value=True)
         telegram_agent.chat_agent.get_openai_client.return_value = MagicMock()
 
     @patch('telegram_agent.parse_intent')
@@ -90,7 +92,50 @@ class TestTelegramIntegration(unittest.TestCase):
         telegram_agent.handle_command("Search for News", "123")
         
         telegram_agent.web_agent.search_web.assert_called_with("News")
-        telegram_agent.send_message.assert_called()
+        # The "Searching..." message is edited into the result
+        telegram_agent.send_message.assert_called_once()
+        message_id = telegram_agent.send_message.return_value
+        telegram_agent.edit_message.assert_called_with("123", message_id, "🌐 *Search Results*:\n\nSome news")
+
+    @patch('telegram_agent.time.time')
+    def test_progress_message_throttles_edits(self, mock_time):
+        mock_time.return_value = 1000.0
+        progress = telegram_agent.ProgressMessage("123", "Working...").start()
+        progress.stage("Step one")  # too soon after the first send
+        telegram_agent.edit_message.assert_not_called()
+
+        mock_time.return_value = 1002.0
+        progress.stage("Step two")
+        telegram_agent.edit_message.assert_called_once_with("123", progress.message_id, "Working...\n\n✅ Step one\n⏳ Step two")
+
+        progress.finish("Done")
+        telegram_agent.edit_message.assert_called_with("123", progress.message_id, "Done")
+        telegram_agent.send_message.assert_called_once()
+
+    @patch('telegram_agent.STREAM_EDIT_INTERVAL', 0.05)
+    def test_progress_message_shows_throttled_stage_later(self):
+        progress = telegram_agent.ProgressMessage("123", "Working...").start()
+        progress.stage("Waiting for the first leads")
+        telegram_agent.edit_message.assert_not_called()
+
+        deadline = time.time() + 5
+        while not telegram_agent.edit_message.called and time.time() < deadline:
+            time.sleep(0.01)
+        telegram_agent.edit_message.assert_called_once_with("123", progress.message_id, "Working...\n\n⏳ Waiting for the first leads")
+
+    @patch('telegram_agent.STREAM_EDIT_INTERVAL', 0.05)
+    def test_progress_message_finish_cancels_pending_edit(self):
+        progress = telegram_agent.ProgressMessage("123", "Working...").start()
+        progress.stage("Step one")
+        progress.finish("Done")
+        time.sleep(0.1)
+        telegram_agent.edit_message.assert_called_once_with("123", progress.message_id, "Done")
+
+    def test_progress_message_falls_back_to_new_message(self):
+        telegram_agent.edit_message.return_value = False
+        progress = telegram_agent.ProgressMessage("123", "Working...").start()
+        progress.finish("Result")
+        telegram_agent.send_message.assert_called_with("123", "Result")
 
     @patch('telegram_agent.parse_intent')
     def test_routing_image_search(self, mock_parse):
@@ -137,6 +182,8 @@ class TestTelegramIntegration(unittest.TestCase):
         # Title defaults to "Telegram Image" if not in params, but mocks return what we put in params. 
         # Wait, if params has title, it uses it. My mock params has "Cat".
         telegram_agent.send_message.assert_called()
+        # The "Generating image..." message doesn't stay up once the image is sent
+        telegram_agent.edit_message.assert_called_with("123", telegram_agent.send_message.return_value, "✅ Image generated for: 'A cat'")
 
     @patch('telegram_agent.parse_intent')
     def test_routing_chat_fallback(self, mock_parse):
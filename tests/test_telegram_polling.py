@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Mock modules
+sys.modules['google_calendar'] = MagicMock()
+sys.modules['google_mail'] = MagicMock()
+sys.modules['google_contacts'] = MagicMock()
+sys.modules['weather_agent'] = MagicMock()
+sys.modules['web_agent'] = MagicMock()
+sys.modules['image_agent'] = MagicMock()
+sys.modules['chat_agent'] = MagicMock()
+sys.modules['search_image_agent'] = MagicMock()
+sys.modules['blog_agent'] = MagicMock()
+sys.modules['faceless_video_agent'] = MagicMock()
+sys.modules['stripe_utils'] = MagicMock()
+sys.modules['scrape_apify'] = MagicMock()
+sys.modules['clickup_agent'] = MagicMock()
+
+import telegram_agent
+
+def text_update(update_id, text, chat_id=1):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": text}}
+
+class FakeTelegram:
+    """getUpdates semantics: asking for an offset confirms (deletes) every update below it."""
+
+    def __init__(self, updates, page_size=100):
+        self.queue = list(updates)
+        self.page_size = page_size
+
+    def get_updates(self, offset=None, timeout=100):
+        if offset is not None:
+            self.queue = [u for u in self.queue if u["update_id"] >= offset]
+        return {"ok": True, "result": self.queue[:self.page_size]}
+
+class TestDurableOffset(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name, value in (
+            ('OFFSET_FILE', os.path.join(self.tmp.name, "telegram_offset.json")),
+            ('ALLOWED_CHAT_ID', None),
+        ):
+            patcher = patch.object(telegram_agent, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_offset_round_trip(self):
+        self.assertIsNone(telegram_agent.load_offset())
+        telegram_agent.save_offset(42)
+        self.assertEqual(telegram_agent.load_offset(), 42)
+
+    def test_collapse_keeps_newest_status_command_per_chat(self):
+        updates = [
+            text_update(1, "/digest"),
+            text_update(2, "send mail to Bob"),
+            text_update(3, "Digest"),
+            text_update(4, "/digest", chat_id=2),
+            text_update(5, "urgent emails"),
+            text_update(6, "/urgent"),
+        ]
+        kept = telegram_agent.collapse_backlog(updates)
+        self.assertEqual([u["update_id"] for u in kept], [2, 3, 4, 6])
+
+    @patch('telegram_agent.handle_command')
+    def test_resume_backlog_processes_and_saves_offset(self, mock_handle_command):
+        telegram = FakeTelegram([text_update(10, "/digest"), text_update(11, "weather in Paris"), text_update(12, "/digest")])
+        with patch('telegram_agent.get_updates', side_effect=telegram.get_updates) as mock_get_updates:
+            offset = telegram_agent.resume_backlog(10)
+
+        self.assertEqual(offset, 13)
+        self.assertEqual(telegram_agent.load_offset(), 13)
+        # The backlog is read without long polling
+        mock_get_updates.assert_called_with(13, timeout=0)
+        self.assertEqual(
+            [c.args for c in mock_handle_command.call_args_list],
+            [("weather in Paris", "1"), ("/digest", "1")]
+        )
+
+    def test_crash_mid_backlog_keeps_remaining_updates(self):
+        telegram = FakeTelegram([text_update(i, f"task {i}") for i in range(1, 6)], page_size=2)
+        handled = []
+        def handle(text, chat_id):
+            if text == "task 3" and text not in handled:
+                handled.append(text)
+                raise RuntimeError("container restarted")
+            handled.append(text)
+
+        with patch('telegram_agent.get_updates', side_effect=telegram.get_updates), \
+             patch('telegram_agent.handle_command', side_effect=handle):
+            with self.assertRaises(RuntimeError):
+                telegram_agent.resume_backlog(telegram_agent.load_offset())
+            # Nothing at or after the failed update was confirmed to Telegram
+            self.assertEqual([u["update_id"] for u in telegram.queue], [3, 4, 5])
+
+            # The next run resumes from the saved offset
+            offset = telegram_agent.resume_backlog(telegram_agent.load_offset())
+
+        self.assertEqual(offset, 6)
+        self.assertEqual(handled, ["task 1", "task 2", "task 3", "task 3", "task 4", "task 5"])
+
+    @patch('telegram_agent.handle_command')
+    @patch('telegram_agent.get_updates', return_value={"ok": True, "result": []})
+    def test_no_backlog_keeps_offset(self, mock_get_updates, mock_handle_command):
+        self.assertEqual(telegram_agent.resume_backlog(7), 7)
+        mock_handle_command.assert_not_called()
+        self.assertIsNone(telegram_agent.load_offset())
+
+    def test_crash_mid_batch_saves_handled_updates(self):
+        batch = {"ok": True, "result": [text_update(i, f"task {i}") for i in range(1, 4)]}
+        def handle(text, chat_id):
+            if text == "task 2":
+                raise KeyboardInterrupt  # the process dies while handling it
+
+        with patch.object(telegram_agent, 'BOT_TOKEN', "test-token"), \
+             patch('telegram_agent.get_updates', side_effect=[{"ok": True, "result": []}, batch]), \
+             patch('telegram_agent.handle_command', side_effect=handle):
+            telegram_agent.main()
+        # Task 1 is not replayed on restart; task 2 is
+        self.assertEqual(telegram_agent.load_offset(), 2)
+
+    @patch('telegram_agent.get_scheduler')
+    @patch('telegram_agent.get_updates', side_effect=[{"ok": True, "result": []}, KeyboardInterrupt])
+    def test_bot_leaves_jobs_to_modal_runner(self, mock_get_updates, mock_get_scheduler):
+        with patch.object(telegram_agent, 'BOT_TOKEN', "test-token"), \
+             patch.object(telegram_agent, 'ALLOWED_CHAT_ID', "1"), \
+             patch.object(telegram_agent, 'RUN_AUTOMATIONS', False):
+            telegram_agent.main()
+        mock_get_scheduler.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
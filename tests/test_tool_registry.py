@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import types
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import tool_registry
+
+class TestLazyImport(unittest.TestCase):
+
+    def setUp(self):
+        self.module = types.ModuleType("fake_heavy_agent")
+        self.module.run = lambda: "real"
+        self.loads = 0
+        original = tool_registry.importlib.import_module
+
+        def import_module(name):
+            if name == "fake_heavy_agent":
+                self.loads += 1
+                return self.module
+            return original(name)
+
+        p = patch.object(tool_registry.importlib, "import_module", side_effect=import_module)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(tool_registry._registry.pop, "fake_heavy_agent", None)
+
+    def test_imports_on_first_use_only(self):
+        agent = tool_registry.lazy_import("fake_heavy_agent")
+        self.assertEqual(self.loads, 0)
+        self.assertFalse(tool_registry.status()["fake_heavy_agent"]["loaded"])
+
+        self.assertEqual(agent.run(), "real")
+        self.assertEqual(agent.run(), "real")
+        self.assertEqual(self.loads, 1)
+        self.assertIs(tool_registry.lazy_import("fake_heavy_agent"), agent)
+        self.assertTrue(tool_registry.status()["fake_heavy_agent"]["loaded"])
+
+    def test_patching_through_the_proxy_reaches_the_module(self):
+        agent = tool_registry.lazy_import("fake_heavy_agent")
+        with patch.object(agent, "run", return_value="mocked"):
+            self.assertEqual(self.module.run(), "mocked")
+        self.assertEqual(agent.run(), "real")
+
+    def test_eager_mode_loads_immediately(self):
+        with patch.object(tool_registry, "EAGER_IMPORTS", True):
+            tool_registry.lazy_import("fake_heavy_agent")
+        self.assertEqual(self.loads, 1)
+
+    def test_resolves_mocks_installed_in_sys_modules(self):
+        mock_agent = MagicMock()
+        with patch.dict(sys.modules, {"fake_mocked_agent": mock_agent}):
+            agent = tool_registry.lazy_import("fake_mocked_agent")
+            agent.do_work(1)
+        mock_agent.do_work.assert_called_once_with(1)
+        tool_registry._registry.pop("fake_mocked_agent", None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import time
+import threading
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+from ttl_cache import TTLCache
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_hit_within_ttl(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+        loader = lambda: calls.append(1) or {"temp": 20}
+
+        self.assertEqual(cache.get_or_load("london", loader), {"temp": 20})
+        self.assertEqual(cache.get_or_load("london", loader), {"temp": 20})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()["hit_ratio"], 0.5)
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+        release = threading.Event()
+
+        def slow_loader():
+            calls.append(1)
+            release.wait(2)
+            return "sunny"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("paris", slow_loader))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["sunny"] * 5)
+        self.assertEqual(cache.stats()["coalesced"], 4)
+
+    def test_uncacheable_results_are_not_stored(self):
+        cache = TTLCache(ttl=60)
+        calls = []
+        loader = lambda: calls.append(1) or {"error": "not found"}
+        is_ok = lambda r: "error" not in r
+
+        cache.get_or_load("atlantis", loader, cacheable=is_ok)
+        cache.get_or_load("atlantis", loader, cacheable=is_ok)
+        self.assertEqual(len(calls), 2)
+
+    def test_stale_while_revalidate_serves_old_value(self):
+        cache = TTLCache(ttl=10, stale_while_revalidate=True)
+        cache.get_or_load("tokyo", lambda: "old")
+        refreshed = threading.Event()
+
+        def new_loader():
+            refreshed.set()
+            return "new"
+
+        later = time.monotonic() + 15
+        with patch('ttl_cache.time.monotonic', return_value=later):
+            self.assertEqual(cache.get_or_load("tokyo", new_loader), "old")
+            self.assertTrue(refreshed.wait(2))
+            time.sleep(0.05)
+            self.assertEqual(cache.get_or_load("tokyo", new_loader), "new")
+
+if __name__ == '__main__':
+    unittest.main()
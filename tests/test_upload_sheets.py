@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import upload_sheets
+
+def make_worksheet(headers, keys=None, rows=None):
+    worksheet = MagicMock()
+    worksheet.row_values.return_value = headers
+    worksheet.col_values.return_value = keys or []
+    worksheet.batch_get.return_value = rows or []
+    worksheet.append_rows.return_value = {"updates": {"updatedRange": "Sheet1!A4:D4"}}
+    return worksheet
+
+class TestSheetSync(unittest.TestCase):
+
+    def test_union_schema_includes_keys_from_later_leads(self):
+        headers, new_columns = upload_sheets.union_headers([], [
+            {"name": "Ann", "icebreaker": "Hi"},
+            {"name": "Bob", "lead_id": "L1", "email": "bob@x.com"}
+        ])
+        self.assertEqual(headers, ["lead_id", "email", "name", "icebreaker"])
+        self.assertEqual(new_columns, headers)
+
+    def test_upsert_keeps_cells_the_lead_does_not_have(self):
+        worksheet = make_worksheet(
+            ["lead_id", "name", "notes"],
+            keys=["lead_id", "L1", "L2"],
+            rows=[[["L2", "Bob", "called him"]]]
+        )
+        sync = upload_sheets.SheetSync(worksheet)
+
+        plan = sync.sync([{"lead_id": "L2", "name": "Robert"}, {"lead_id": "L3", "name": "Cy"}])
+
+        worksheet.get_all_values.assert_not_called()
+        worksheet.batch_get.assert_called_once_with(["3:3"])
+        worksheet.batch_update.assert_called_once_with([{"range": "A3", "values": [["L2", "Robert", "called him"]]}])
+        worksheet.append_rows.assert_called_once_with([["L3", "Cy", ""]], table_range="A1")
+        self.assertEqual(plan["updates"][0]["diff"], {"name": ("Bob", "Robert")})
+        self.assertEqual(sync.rows["L3"], 4)
+
+    def test_dry_run_writes_nothing(self):
+        worksheet = make_worksheet(["lead_id", "name"], keys=["lead_id", "L1"], rows=[[["L1", "Ann"]]])
+        plan = upload_sheets.SheetSync(worksheet).sync([{"lead_id": "L1", "name": "Ann", "email": "a@x.com"}], dry_run=True)
+
+        worksheet.update.assert_not_called()
+        worksheet.batch_update.assert_not_called()
+        worksheet.append_rows.assert_not_called()
+        report = upload_sheets.format_report(plan)
+        self.assertIn("New columns: email", report)
+        self.assertIn("email: '' -> 'a@x.com'", report)
+
+    def test_unchanged_rows_are_skipped(self):
+        worksheet = make_worksheet(["lead_id", "name"], keys=["lead_id", "L1"], rows=[[["L1", "Ann"]]])
+        plan = upload_sheets.SheetSync(worksheet).sync([{"lead_id": "L1", "name": "Ann"}])
+        self.assertEqual(plan["unchanged"], 1)
+        worksheet.batch_update.assert_not_called()
+
+    def test_writes_are_chunked_by_payload_size(self):
+        items = [["x" * 100] for _ in range(10)]
+        chunks = list(upload_sheets.chunk_by_payload(items, max_bytes=500))
+        self.assertEqual(sum(len(c) for c in chunks), 10)
+        self.assertTrue(all(len(c) <= 4 for c in chunks))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import tempfile
+import threading
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+import disk_cache
+import voice_pipeline
+
+class TestVoicePipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        cache = disk_cache.DiskCache("transcripts", ttl=60, max_bytes=100_000, root=self.tmp.name)
+        patcher = patch.object(voice_pipeline, '_cache', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_pipeline(self, **kwargs):
+        self.progress = MagicMock()
+        self.progress.return_value.start.return_value = self.progress.message
+        options = dict(
+            download=MagicMock(return_value=b"ogg"),
+            transcribe=MagicMock(return_value="check my calendar"),
+            handle=MagicMock(),
+            progress=self.progress,
+            workers=2,
+            max_bytes=1000,
+        )
+        options.update(kwargs)
+        return voice_pipeline.VoicePipeline(**options)
+
+    def test_runs_stages_and_records_timings(self):
+        pipeline = self.make_pipeline()
+        result = pipeline.submit("42", {"file_id": "f1", "file_size": 100}).result(timeout=5)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(set(result["timings"]), {"download", "transcribe", "handle"})
+        pipeline.download.assert_called_once_with("f1")
+        pipeline.transcribe.assert_called_once_with(b"ogg")
+        pipeline.handle.assert_called_once_with("check my calendar", "42")
+        self.progress.message.finish.assert_called_once_with('📝 _Transcribed_: "check my calendar"')
+
+        stats = pipeline.stats()
+        self.assertEqual(stats["messages"], 1)
+        self.assertEqual(stats["stages"]["transcribe"]["count"], 1)
+
+    def test_size_cap_skips_download(self):
+        pipeline = self.make_pipeline()
+        result = pipeline.process("42", {"file_id": "f1", "file_size": 5000})
+
+        self.assertEqual(result["status"], "error")
+        pipeline.download.assert_not_called()
+        self.assertIn("too large", self.progress.message.finish.call_args[0][0])
+
+    def test_failed_transcription_is_reported(self):
+        pipeline = self.make_pipeline(transcribe=MagicMock(return_value=None))
+        result = pipeline.process("42", {"file_id": "f1"})
+
+        self.assertEqual(result["status"], "error")
+        pipeline.handle.assert_not_called()
+        self.progress.message.finish.assert_called_once_with("❌ Sorry, I couldn't transcribe your voice message.")
+
+    def test_forwarded_note_skips_download_and_transcription(self):
+        pipeline = self.make_pipeline()
+        pipeline.process("42", {"file_id": "f1", "file_unique_id": "u1"})
+        # A forward has a new file_id but keeps the file_unique_id
+        result = pipeline.process("42", {"file_id": "f2", "file_unique_id": "u1"})
+
+        self.assertEqual(result["message"], "check my calendar")
+        self.assertEqual(set(result["timings"]), {"handle"})
+        pipeline.download.assert_called_once_with("f1")
+        pipeline.transcribe.assert_called_once()
+        self.assertEqual(pipeline.stats()["cache_hits"], 1)
+
+    def test_same_audio_skips_transcription(self):
+        pipeline = self.make_pipeline()
+        pipeline.process("42", {"file_id": "f1", "file_unique_id": "u1"})
+        result = pipeline.process("42", {"file_id": "f2", "file_unique_id": "u2"})
+
+        self.assertEqual(result["message"], "check my calendar")
+        self.assertEqual(pipeline.download.call_count, 2)
+        pipeline.transcribe.assert_called_once()
+        # The re-upload is now known by its own file_unique_id too
+        self.assertEqual(voice_pipeline.cached_transcript("u2"), "check my calendar")
+
+    def test_failed_transcription_is_not_cached(self):
+        pipeline = self.make_pipeline(transcribe=MagicMock(side_effect=[None, "hello"]))
+        pipeline.process("42", {"file_id": "f1", "file_unique_id": "u1"})
+        result = pipeline.process("42", {"file_id": "f1", "file_unique_id": "u1"})
+
+        self.assertEqual(result["message"], "hello")
+        self.assertEqual(pipeline.transcribe.call_count, 2)
+
+    def test_messages_run_in_parallel(self):
+        # Both downloads must be in flight at once for either to finish
+        barrier = threading.Barrier(2, timeout=5)
+        def download(file_id):
+            barrier.wait()
+            return b"ogg"
+
+        pipeline = self.make_pipeline(download=download)
+        futures = [pipeline.submit(f"chat{i}", {"file_id": f"f{i}"}) for i in range(2)]
+        self.assertTrue(pipeline.join(timeout=5))
+        self.assertEqual([f.result()["status"] for f in futures], ["success", "success"])
+
+    def test_one_chat_runs_in_arrival_order(self):
+        order = []
+        release = threading.Event()
+        def download(file_id):
+            release.wait(5)
+            order.append(f"download {file_id}")
+            return file_id.encode()
+
+        pipeline = self.make_pipeline(download=download, transcribe=lambda data: data.decode(), handle=lambda text, chat_id: order.append(f"handle {text}"))
+        pipeline.submit("42", {"file_id": "f1"})
+        pipeline.submit("42", {"file_id": "f2"})
+        # A text command arriving while the notes are in flight waits behind them
+        text = pipeline.run_in_order("42", order.append, "text")
+        self.assertFalse(text.done())
+        release.set()
+        self.assertTrue(pipeline.join(timeout=5))
+        self.assertEqual(order, ["download f1", "handle f1", "download f2", "handle f2", "text"])
+
+    def test_text_runs_inline_when_chat_is_idle(self):
+        pipeline = self.make_pipeline()
+        caller = threading.current_thread()
+        ran_in = []
+        pipeline.run_in_order("42", lambda: ran_in.append(threading.current_thread()))
+        self.assertEqual(ran_in, [caller])
+
+if __name__ == '__main__':
+    unittest.main()
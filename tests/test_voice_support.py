@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, patch
 import sys
 import os
 import io
+import tempfile
 
 # Add implementation folder to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
@@ -23,21 +24,35 @@ sys.modules['scrape_apify'] = MagicMock()
 sys.modules['clickup_agent'] = MagicMock()
 
 import telegram_agent
+import disk_cache
+import voice_pipeline
 
 class TestVoiceSupport(unittest.TestCase):
     
     @patch('telegram_agent.requests.get')
+    @patch('telegram_agent.edit_message', return_value=True)
     @patch('telegram_agent.download_telegram_file')
     @patch('telegram_agent.transcribe_voice')
     @patch('telegram_agent.handle_command')
     @patch('telegram_agent.send_message')
     @patch('telegram_agent.get_updates')
-    def test_voice_message_flow(self, mock_get_updates, mock_send_message, mock_handle_command, mock_transcribe, mock_download, mock_req_get):
+    def test_voice_message_flow(self, mock_get_updates, mock_send_message, mock_handle_command, mock_transcribe, mock_download, mock_edit_message, mock_req_get):
         # Patch telegram_agent.ALLOWED_CHAT_ID to None to bypass security check
         telegram_agent.ALLOWED_CHAT_ID = None
+        telegram_agent.BOT_TOKEN = "test-token"
+        # Keep transcripts out of the real cache so the flow runs end to end every time
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache_patch = patch.object(voice_pipeline, '_cache', disk_cache.DiskCache("transcripts", ttl=60, max_bytes=100_000, root=tmp.name))
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+        offset_patch = patch.object(telegram_agent, 'OFFSET_FILE', os.path.join(tmp.name, "telegram_offset.json"))
+        offset_patch.start()
+        self.addCleanup(offset_patch.stop)
         
         # Setup mock update with voice message
         mock_get_updates.side_effect = [
+            {"ok": True, "result": []}, # No backlog at startup
             {
                 "ok": True,
                 "result": [{
@@ -60,18 +75,34 @@ class TestVoiceSupport(unittest.TestCase):
                 telegram_agent.main()
             except KeyboardInterrupt:
                 pass
+        # Voice messages are handled on the pipeline's workers
+        self.assertTrue(telegram_agent.get_voice_pipeline().join(timeout=5))
         
         # Verify flow
-        mock_download.assert_called_with("voice_123")
+        mock_download.assert_called_with("voice_123", max_bytes=telegram_agent.voice_pipeline.VOICE_MAX_BYTES)
         mock_transcribe.assert_called_with(b"fake_voice_data")
         mock_handle_command.assert_called_with("Hello world", "456")
+        self.assertEqual(telegram_agent.load_offset(), 124)
         
         # Verify user notifications
-        expected_calls = [
-            unittest.mock.call("456", "🎙️ _Transcribing your voice message..._"),
-            unittest.mock.call("456", '📝 _Transcribed_: "Hello world"')
-        ]
-        mock_send_message.assert_has_calls(expected_calls)
+        # The "Transcribing..." message is edited into the transcript
+        mock_send_message.assert_called_once_with("456", "🎙️ _Transcribing your voice message..._")
+        mock_edit_message.assert_called_with("456", mock_send_message.return_value, '📝 _Transcribed_: "Hello world"')
+
+class TestVoiceWebhook(unittest.TestCase):
+
+    def test_voice_handled_before_webhook_returns(self):
+        sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+        import server
+        pipeline = MagicMock()
+        update = {"update_id": 1, "message": {"chat": {"id": 456}, "voice": {"file_id": "voice_123"}}}
+        with patch.object(server, 'get_voice_pipeline', return_value=pipeline), \
+             patch.object(server, 'ALLOWED_CHAT_ID', None):
+            response = server.app.test_client().post('/api/telegram/webhook', json=update)
+
+        self.assertEqual(response.status_code, 200)
+        pipeline.process.assert_called_once_with("456", {"file_id": "voice_123"})
+        pipeline.submit.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main()
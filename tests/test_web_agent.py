@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import json
+import time
+import threading
+
+# Add implementation folder to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'implementation')))
+
+# Other test modules replace web_agent with a MagicMock; load the real one and put theirs back
+_mocked = sys.modules.pop('web_agent', None)
+import web_agent
+if _mocked is not None:
+    sys.modules['web_agent'] = _mocked
+
+def completion(content):
+    return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+
+def result(url, content, score=0.5, title="T"):
+    return {"url": url, "content": content, "score": score, "title": title}
+
+class TestExpandQuery(unittest.TestCase):
+
+    def test_original_first_and_near_duplicates_dropped(self):
+        openai = MagicMock()
+        openai.chat.completions.create.return_value = completion(json.dumps(
+            {"queries": ["What is RAG?", "RAG vs fine-tuning", "rag  vs fine tuning!", "", 42, "RAG benchmarks", "RAG costs"]}
+        ))
+        queries = web_agent.expand_query(openai, "what is rag", num_queries=4)
+        self.assertEqual(queries, ["what is rag", "RAG vs fine-tuning", "RAG benchmarks", "RAG costs"])
+
+    def test_falls_back_to_original_query(self):
+        self.assertEqual(web_agent.expand_query(None, "q"), ["q"])
+        openai = MagicMock()
+        openai.chat.completions.create.side_effect = TimeoutError("slow")
+        self.assertEqual(web_agent.expand_query(openai, "q"), ["q"])
+
+class TestDedupeResults(unittest.TestCase):
+
+    def test_same_url_variants_and_same_content_collapse_to_best_score(self):
+        results = [
+            result("https://www.example.com/post/?utm_source=x", "Body A", score=0.4),
+            result("http://example.com/post#section", "Body B", score=0.9),
+            result("https://other.com/copy", "  body   a ", score=0.7),
+            result("https://third.com", "Body C", score=0.1),
+        ]
+        unique = web_agent.dedupe_results(results)
+        self.assertEqual([r["url"] for r in unique], ["http://example.com/post#section", "https://other.com/copy", "https://third.com"])
+
+    def test_empty_content_is_not_treated_as_duplicate(self):
+        results = [result(f"https://site{i}.com", content) for i, content in enumerate(["", None, "   "])]
+        self.assertEqual(len(web_agent.dedupe_results(results)), 3)
+
+class TestBuildContext(unittest.TestCase):
+
+    def test_respects_token_budget_and_truncates_last_source(self):
+        results = [result(f"https://s{i}.com", "x" * 2000) for i in range(3)]
+        context, used = web_agent.build_context(results, max_tokens=700)
+        self.assertEqual(len(used), 2)
+        self.assertLessEqual(web_agent.estimate_tokens(context), 700)
+        self.assertIn("Source: T (https://s0.com)", context)
+
+    def test_skips_tiny_remainder(self):
+        results = [result("https://a.com", "x" * 1000), result("https://b.com", "y" * 1000)]
+        context, used = web_agent.build_context(results, max_tokens=300)
+        self.assertEqual([r["url"] for r in used], ["https://a.com"])
+
+class TestResearchWeb(unittest.TestCase):
+
+    @patch.object(web_agent, 'get_openai_client', return_value=None)
+    @patch.object(web_agent, 'get_tavily_client', return_value=MagicMock())
+    def test_merges_and_dedupes_sub_query_results(self, mock_tavily, mock_openai):
+        responses = {
+            "rag": {"results": [result("https://a.com", "A", 0.9), result("https://b.com", "", 0.5)]},
+        }
+        with patch.object(web_agent.research_cache, 'cached_search', side_effect=lambda client, q, **kw: responses[q]):
+            response = web_agent.research_web("rag", deadline=5)
+        self.assertEqual(response["sub_queries"], ["rag"])
+        self.assertEqual([r["url"] for r in response["results"]], ["https://a.com", "https://b.com"])
+        self.assertEqual(response["timed_out_queries"], [])
+
+    @patch.object(web_agent, 'get_openai_client', return_value=None)
+    @patch.object(web_agent, 'get_tavily_client', return_value=MagicMock())
+    def test_slow_sub_query_is_dropped_at_deadline(self, mock_tavily, mock_openai):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        def search(client, q, **kw):
+            if q == "rag slow":
+                release.wait(10)
+            return {"results": [result(f"https://{q.replace(' ', '-')}.com", q, 0.5)]}
+
+        started = time.monotonic()
+        with patch.object(web_agent, 'expand_query', return_value=["rag", "rag slow"]), \
+             patch.object(web_agent.research_cache, 'cached_search', side_effect=search):
+            response = web_agent.research_web("rag", deadline=1)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(response["timed_out_queries"], ["rag slow"])
+        self.assertEqual([r["url"] for r in response["results"]], ["https://rag.com"])
+        self.assertLessEqual(response["elapsed_seconds"], 1)
+        self.assertLess(elapsed, 1)
+
+if __name__ == '__main__':
+    unittest.main()